@@ -137,6 +137,31 @@ else:
     }
 
 
+# Cache
+# Shared by the web processes, the announcement scheduler and the delivery
+# workers, so an invalidation in one process (audiences, reliability reports,
+# the job board) reaches the others. Set REDIS_URL to use Redis (needs the
+# redis package); otherwise the database is used (run createcachetable).
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -181,7 +206,34 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hand file transfers from /downloads/ to the front proxy: '' (serve from Django),
+# 'x-accel-redirect' (nginx, internal location at DOWNLOAD_ACCEL_REDIRECT_PREFIX
+# aliased to MEDIA_ROOT) or 'x-sendfile' (Apache mod_xsendfile, lighttpd)
+DOWNLOAD_OFFLOAD = os.getenv('DOWNLOAD_OFFLOAD', '')
+DOWNLOAD_ACCEL_REDIRECT_PREFIX = os.getenv('DOWNLOAD_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Chunked uploads (/api/uploads/): largest chunk accepted per request, largest
+# file, and how long an unfinished upload is kept before purge_upload_sessions
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', str(4 * 1024 * 1024 * 1024)))
+UPLOAD_SESSION_HOURS = int(os.getenv('UPLOAD_SESSION_HOURS', '48'))
+# Applicant documents are uploaded without an account: PDF/JPEG/PNG only,
+# smaller files, and a few unfinished uploads per applicant at a time
+APPLICANT_UPLOAD_MAX_SIZE = int(os.getenv('APPLICANT_UPLOAD_MAX_SIZE', str(20 * 1024 * 1024)))
+APPLICANT_UPLOAD_MAX_ACTIVE = int(os.getenv('APPLICANT_UPLOAD_MAX_ACTIVE', '3'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Email (announcement delivery uses the default connection settings)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', 'False') == 'True'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '30'))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
@@ -11,8 +11,12 @@ admin.site.index_title = "Welcome to ETUSL WEB Portal"
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/news/', include('news.urls')),
+    path('api/announcements/', include('announcements.urls')),
     path('api/visits/', include('visits.urls')),
+    path('api/jobs/', include('jobs.urls')),
     path('staff/', include('staff.urls')),
+    path('downloads/', include('media.urls')),
+    path('api/uploads/', include('media.upload_urls')),
 ]
 
 if settings.DEBUG:
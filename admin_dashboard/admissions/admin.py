@@ -1,5 +1,7 @@
-from django.contrib import admin
-from .models import AdmissionCycle, Requirement, Applicant, UploadedDocument
+from django.contrib import admin, messages
+
+from . import completeness
+from .models import AdmissionCycle, Requirement, Applicant, UploadedDocument, ProgramQuota
 
 
 @admin.register(AdmissionCycle)
@@ -16,13 +18,46 @@ class RequirementAdmin(admin.ModelAdmin):
     search_fields = ('title', 'program__name')
 
 
+class MissingRequirementFilter(admin.SimpleListFilter):
+    """Applicants still missing a given mandatory document"""
+    title = 'missing document'
+    parameter_name = 'missing_requirement'
+
+    def lookups(self, request, model_admin):
+        requirements = Requirement.objects.filter(is_mandatory=True).select_related('program')
+        return [(requirement.pk, f'{requirement.program.name}: {requirement.title}') for requirement in requirements]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        requirement = Requirement.objects.filter(pk=self.value()).first()
+        if requirement is None:
+            return queryset.none()
+        return queryset.filter(program_id=requirement.program_id).exclude(documents__requirement=requirement)
+
+
 @admin.register(Applicant)
 class ApplicantAdmin(admin.ModelAdmin):
-    list_display = ('first_name', 'last_name', 'email', 'program', 'status', 'applied_at')
-    list_filter = ('status', 'program', 'admission_cycle', 'applied_at')
+    list_display = ('first_name', 'last_name', 'email', 'program', 'status', 'documents_uploaded', 'applied_at')
+    list_filter = ('status', 'documents_uploaded', MissingRequirementFilter, 'program', 'admission_cycle', 'applied_at')
     search_fields = ('first_name', 'last_name', 'email', 'phone')
     date_hierarchy = 'applied_at'
-    readonly_fields = ('applied_at', 'updated_at')
+    readonly_fields = ('documents_uploaded', 'applied_at', 'updated_at')
+    actions = ['send_document_reminders', 'recheck_documents']
+
+    def send_document_reminders(self, request, queryset):
+        try:
+            sent = completeness.send_reminders(queryset)
+        except OSError as exc:
+            self.message_user(request, f'Reminders could not be sent: {exc}', level=messages.ERROR)
+            return
+        self.message_user(request, f'{sent} reminder(s) sent to applicants with missing documents.')
+    send_document_reminders.short_description = 'Email reminders about missing documents'
+
+    def recheck_documents(self, request, queryset):
+        completed, reopened = completeness.sync(queryset)
+        self.message_user(request, f'{completed} applicant(s) now complete, {reopened} now missing documents.')
+    recheck_documents.short_description = 'Recheck document completeness'
 
 
 @admin.register(UploadedDocument)
@@ -30,3 +65,11 @@ class UploadedDocumentAdmin(admin.ModelAdmin):
     list_display = ('applicant', 'requirement', 'uploaded_at')
     list_filter = ('requirement', 'uploaded_at')
     search_fields = ('applicant__first_name', 'applicant__last_name')
+
+
+@admin.register(ProgramQuota)
+class ProgramQuotaAdmin(admin.ModelAdmin):
+    list_display = ('program', 'admission_cycle', 'quota', 'min_gpa')
+    list_editable = ('quota', 'min_gpa')
+    list_filter = ('admission_cycle', 'program')
+    list_select_related = ('program', 'admission_cycle')
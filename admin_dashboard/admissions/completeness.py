@@ -0,0 +1,96 @@
+"""
+Mandatory-document completeness for applicants.
+
+Which mandatory requirements an applicant is missing is worked out for any
+number of applicants with two queries: the mandatory requirements of their
+programs, and the applicants joined to the requirements they have uploaded.
+The rest is set arithmetic in Python. ``sync`` writes the result back to
+``Applicant.documents_uploaded`` with at most two ``update()`` calls per
+chunk, and is run by the document/requirement signals, the CSV import and
+the ``sync_document_completeness`` command. Applicants without a program,
+or whose program has no mandatory requirements, have nothing to evaluate
+and keep the flag as it was set by hand.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.utils import timezone
+
+from .models import Applicant, Requirement
+
+UPDATE_CHUNK = 900
+
+
+def missing_requirements(applicants):
+    """
+    ``{applicant_id: set(requirement ids)}`` of the mandatory requirements each
+    applicant of the ``applicants`` queryset has not uploaded (complete ones map
+    to an empty set, those with nothing to evaluate to ``None``), plus
+    ``{applicant_id: documents_uploaded}`` as stored.
+    """
+    uploaded = defaultdict(set)
+    program_of, stored = {}, {}
+    rows = applicants.order_by().values_list('pk', 'program_id', 'documents_uploaded', 'documents__requirement_id')
+    for pk, program_id, documents_uploaded, requirement_id in rows:
+        program_of[pk] = program_id
+        stored[pk] = documents_uploaded
+        if requirement_id is not None:
+            uploaded[pk].add(requirement_id)
+
+    mandatory = defaultdict(set)
+    program_ids = {program_id for program_id in program_of.values() if program_id is not None}
+    for program_id, requirement_id in (
+        Requirement.objects.filter(program_id__in=program_ids, is_mandatory=True).values_list('program_id', 'pk')
+    ):
+        mandatory[program_id].add(requirement_id)
+
+    missing = {
+        pk: mandatory[program_id] - uploaded[pk] if program_id in mandatory else None
+        for pk, program_id in program_of.items()
+    }
+    return missing, stored
+
+
+def sync(applicants):
+    """Bring ``documents_uploaded`` in line for a queryset of applicants; returns ``(completed, reopened)``"""
+    missing, stored = missing_requirements(applicants)
+    complete = [pk for pk, requirements in missing.items() if requirements == set() and not stored[pk]]
+    incomplete = [pk for pk, requirements in missing.items() if requirements and stored[pk]]
+    now = timezone.now()
+    for pks, value in ((complete, True), (incomplete, False)):
+        for start in range(0, len(pks), UPDATE_CHUNK):
+            Applicant.objects.filter(pk__in=pks[start:start + UPDATE_CHUNK]).update(
+                documents_uploaded=value, updated_at=now,
+            )
+    return len(complete), len(incomplete)
+
+
+def send_reminders(applicants):
+    """
+    Email each applicant of the queryset who is missing mandatory documents
+    the list of what to upload, over one SMTP connection. Returns how many
+    were emailed.
+    """
+    missing, _ = missing_requirements(applicants)
+    missing = {pk: requirements for pk, requirements in missing.items() if requirements}
+    if not missing:
+        return 0
+    titles = dict(
+        Requirement.objects
+        .filter(pk__in={pk for requirements in missing.values() for pk in requirements})
+        .values_list('pk', 'title')
+    )
+    messages = []
+    for applicant in Applicant.objects.filter(pk__in=list(missing)).select_related('program').only(
+        'pk', 'first_name', 'email', 'program__name',
+    ):
+        items = '\n'.join(f'  - {titles[pk]}' for pk in sorted(missing[applicant.pk], key=titles.get))
+        body = (
+            f'Dear {applicant.first_name},\n\n'
+            f'Your application for {applicant.program.name} is missing the following required documents:\n\n'
+            f'{items}\n\n'
+            'Please upload them as soon as possible so we can review your application.\n'
+        )
+        messages.append(('Documents missing from your application', body, settings.DEFAULT_FROM_EMAIL, [applicant.email]))
+    return send_mass_mail(messages, fail_silently=False)
@@ -0,0 +1,231 @@
+"""
+Bulk applicant import from partner-portal CSV exports.
+
+Files are read row by row and written in chunks with
+``bulk_create(update_conflicts=True)`` keyed on ``Applicant.email``, so an
+import is a few hundred statements however large the file is, and running
+the same file twice updates instead of duplicating. Programs and admission
+cycles are resolved through dictionaries built once per import.
+
+Only the columns present in the file are updated on existing applicants, and
+an empty cell in an optional column leaves the stored value unchanged. Rows
+that fail validation (including values longer than their column) are
+skipped and reported with their line number.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from academics.models import Program
+from . import completeness
+from .models import AdmissionCycle, Applicant
+
+REQUIRED_COLUMNS = ('email', 'first_name', 'last_name', 'date_of_birth')
+OPTIONAL_COLUMNS = ('phone', 'nationality', 'program', 'admission_cycle', 'status', 'gpa', 'notes')
+
+# Header spellings seen in partner exports, mapped to our column names
+COLUMN_ALIASES = {
+    'e-mail': 'email', 'email address': 'email',
+    'first name': 'first_name', 'firstname': 'first_name', 'given name': 'first_name',
+    'last name': 'last_name', 'lastname': 'last_name', 'surname': 'last_name',
+    'dob': 'date_of_birth', 'date of birth': 'date_of_birth', 'birth date': 'date_of_birth',
+    'phone number': 'phone', 'mobile': 'phone',
+    'programme': 'program', 'program code': 'program',
+    'cycle': 'admission_cycle', 'admission year': 'admission_cycle', 'year': 'admission_cycle',
+    'score': 'gpa',
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d')
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, email, message):
+        self.errors.append((line, email, message))
+
+
+def normalize_header(name):
+    key = (name or '').strip().lower().lstrip('\ufeff')
+    key = COLUMN_ALIASES.get(key, key)
+    return key.replace(' ', '_')
+
+
+def program_map():
+    """Lower-cased slug and name -> program id"""
+    mapping = {}
+    for pk, slug, name in Program.objects.values_list('pk', 'slug', 'name'):
+        mapping.setdefault(name.strip().lower(), pk)
+        mapping[slug.lower()] = pk
+    return mapping
+
+
+def cycle_map():
+    return {str(year): pk for pk, year in AdmissionCycle.objects.values_list('pk', 'year')}
+
+
+def parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Unrecognised date "{value}"')
+
+
+class RowParser:
+    """Turns CSV rows into unsaved Applicant instances, using the lookup maps"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.programs = program_map() if 'program' in columns else {}
+        self.cycles = cycle_map() if 'admission_cycle' in columns else {}
+        self.statuses = {}
+        for value, label in Applicant.STATUS_CHOICES:
+            self.statuses[value] = value
+            self.statuses[label.lower()] = value
+        # Text columns checked here, so an over-long value fails its row rather than the import
+        self.max_lengths = {}
+        for column in columns:
+            model_field = Applicant._meta.get_field(column)
+            if model_field.max_length and not model_field.is_relation and not model_field.choices:
+                self.max_lengths[column] = model_field.max_length
+
+    def parse(self, row):
+        values = {column: (row.get(column) or '').strip() for column in self.columns}
+        email = values['email'].lower()
+        validate_email(email)
+        for column in REQUIRED_COLUMNS:
+            if not values[column]:
+                raise ValueError(f'Missing {column}')
+        for column, max_length in self.max_lengths.items():
+            if len(values[column]) > max_length:
+                raise ValueError(f'{column} is longer than {max_length} characters')
+
+        applicant = Applicant(
+            email=email,
+            first_name=values['first_name'],
+            last_name=values['last_name'],
+            date_of_birth=parse_date(values['date_of_birth']),
+            phone=values.get('phone', ''),
+            nationality=values.get('nationality', ''),
+            notes=values.get('notes', ''),
+            status='submitted',
+        )
+        if values.get('program'):
+            applicant.program_id = self.programs.get(values['program'].lower())
+            if applicant.program_id is None:
+                raise ValueError(f'Unknown program "{values["program"]}"')
+        if values.get('admission_cycle'):
+            applicant.admission_cycle_id = self.cycles.get(values['admission_cycle'])
+            if applicant.admission_cycle_id is None:
+                raise ValueError(f'Unknown admission cycle "{values["admission_cycle"]}"')
+        if values.get('status'):
+            applicant.status = self.statuses.get(values['status'].lower())
+            if applicant.status is None:
+                raise ValueError(f'Unknown status "{values["status"]}"')
+        if values.get('gpa'):
+            try:
+                gpa = Decimal(values['gpa'])
+                if not gpa.is_finite():
+                    raise InvalidOperation
+                applicant.gpa = gpa.quantize(Decimal('0.01'))
+            except InvalidOperation:
+                raise ValueError(f'Invalid GPA "{values["gpa"]}"')
+            if not Decimal('0') <= applicant.gpa < Decimal('10'):
+                raise ValueError(f'GPA out of range "{values["gpa"]}"')
+        applicant._blank_columns = [column for column in OPTIONAL_COLUMNS if column in values and not values[column]]
+        return applicant
+
+
+def import_applicants(source, chunk_size=2000, dry_run=False):
+    """
+    Import applicants from ``source`` (a path, text stream or binary stream).
+
+    Returns an ``ImportResult``. With ``dry_run`` rows are validated but
+    nothing is written.
+    """
+    if isinstance(source, str):
+        with open(source, encoding='utf-8-sig', newline='') as handle:
+            return import_applicants(handle, chunk_size, dry_run)
+    if isinstance(source.read(0), bytes):
+        source = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+
+    result = ImportResult()
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        result.add_error(1, '', 'Empty file')
+        return result
+    columns = [normalize_header(name) for name in header]
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        result.add_error(1, '', f'Missing column(s): {", ".join(missing)}')
+        return result
+    known = [column for column in columns if column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS]
+    parser = RowParser(known)
+    update_fields = [column for column in known if column != 'email'] + ['updated_at']
+
+    chunk = {}
+    for line, values in enumerate(reader, start=2):
+        if not any(values):
+            continue
+        result.rows += 1
+        row = dict(zip(columns, values))
+        try:
+            applicant = parser.parse(row)
+        except (ValidationError, ValueError) as exc:
+            message = '; '.join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+            result.add_error(line, row.get('email', ''), message)
+            continue
+        # The last row for an email wins; one statement may not touch a row twice
+        chunk[applicant.email] = applicant
+        if len(chunk) >= chunk_size:
+            result.imported += _flush(chunk, update_fields, dry_run)
+    result.imported += _flush(chunk, update_fields, dry_run)
+    return result
+
+
+def _flush(chunk, update_fields, dry_run):
+    count = len(chunk)
+    if chunk and not dry_run:
+        with transaction.atomic():
+            _keep_stored_values(chunk)
+            Applicant.objects.bulk_create(
+                list(chunk.values()),
+                update_conflicts=True,
+                unique_fields=['email'],
+                update_fields=update_fields,
+                batch_size=500,
+            )
+            # bulk_create sends no signals; a new program can change the required documents
+            completeness.sync(Applicant.objects.filter(email__in=list(chunk)))
+    chunk.clear()
+    return count
+
+
+def _keep_stored_values(chunk):
+    """Copy the stored values of existing applicants into the columns their rows left empty"""
+    blank = {email: applicant._blank_columns for email, applicant in chunk.items() if applicant._blank_columns}
+    if not blank:
+        return
+    attnames = {column: Applicant._meta.get_field(column).attname for columns in blank.values() for column in columns}
+    for stored in Applicant.objects.filter(email__in=list(blank)).values('email', *set(attnames.values())):
+        applicant = chunk[stored['email']]
+        for column in applicant._blank_columns:
+            setattr(applicant, attnames[column], stored[attnames[column]])
+
+
+def write_error_report(result, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['line', 'email', 'error'])
+    writer.writerows(result.errors)
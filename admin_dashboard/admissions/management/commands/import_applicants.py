@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admissions.importer import import_applicants, write_error_report
+
+
+class Command(BaseCommand):
+    help = 'Import (or update, matched on email) applicants from a partner-portal CSV export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument('--errors', help='Where to write the error report (default: <path>.errors.csv)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows written per upsert')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without writing anything')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            result = import_applicants(options['path'], options['chunk_size'], options['dry_run'])
+        except OSError as exc:
+            raise CommandError(exc)
+        elapsed = time.monotonic() - started
+
+        verb = 'validated' if options['dry_run'] else 'imported'
+        self.stdout.write(f'{result.rows} rows read, {result.imported} applicants {verb} in {elapsed:.1f}s')
+        if result.errors:
+            report = options['errors'] or f"{options['path']}.errors.csv"
+            with open(report, 'w', newline='', encoding='utf-8') as handle:
+                write_error_report(result, handle)
+            self.stdout.write(self.style.WARNING(f'{len(result.errors)} rows rejected; see {report}'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import Program
+from admissions.models import AdmissionCycle
+from admissions.ranking import apply, rank
+
+
+class Command(BaseCommand):
+    help = 'Rank applicants of an admission cycle by GPA and shortlist up to each program quota'
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help='Admission cycle year')
+        parser.add_argument('--program', action='append', help='Program slug to limit the run to (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Show the outcome without changing any applicant')
+
+    def handle(self, *args, **options):
+        try:
+            cycle = AdmissionCycle.objects.get(year=options['year'])
+        except AdmissionCycle.DoesNotExist:
+            raise CommandError(f"No admission cycle for {options['year']}")
+        programs = None
+        if options['program']:
+            programs = Program.objects.filter(slug__in=options['program'])
+
+        outcomes = rank(cycle, programs)
+        if not outcomes:
+            self.stdout.write(self.style.WARNING('No program quotas are set for this cycle'))
+            return
+        for outcome in sorted(outcomes.values(), key=lambda o: o.quota.program.name):
+            line = (
+                f'{outcome.quota.program.name}: {len(outcome.shortlisted)}/{outcome.quota.quota} shortlisted, '
+                f'{len(outcome.rejected)} rejected'
+            )
+            if outcome.cutoff_gpa is not None:
+                line += f', cut-off GPA {outcome.cutoff_gpa}'
+            if outcome.below_minimum:
+                line += f', {outcome.below_minimum} below minimum GPA'
+            if outcome.unranked:
+                line += f', {outcome.unranked} without GPA left unchanged'
+            self.stdout.write(line)
+
+        if options['dry_run']:
+            self.stdout.write('Dry run: no applicants were changed')
+            return
+        shortlisted, rejected = apply(outcomes)
+        self.stdout.write(self.style.SUCCESS(f'{shortlisted} applicants shortlisted, {rejected} rejected'))
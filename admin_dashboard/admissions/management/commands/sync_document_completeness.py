@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from admissions import completeness
+from admissions.models import AdmissionCycle, Applicant
+
+
+class Command(BaseCommand):
+    help = 'Recompute documents_uploaded from mandatory requirements for all applicants (or one cycle)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cycle', type=int, help='Admission cycle year to limit the run to')
+
+    def handle(self, *args, **options):
+        applicants = Applicant.objects.all()
+        if options['cycle']:
+            cycle = AdmissionCycle.objects.filter(year=options['cycle']).first()
+            if cycle is None:
+                raise CommandError(f"No admission cycle for {options['cycle']}")
+            applicants = applicants.filter(admission_cycle=cycle)
+        completed, reopened = completeness.sync(applicants)
+        self.stdout.write(f'{completed} applicants marked complete, {reopened} marked as missing documents')
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0001_initial'),
+        ('admissions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quota', models.PositiveIntegerField(help_text='Number of applicants to shortlist')),
+                ('min_gpa', models.DecimalField(blank=True, decimal_places=2, help_text='Applicants below this GPA are rejected regardless of quota', max_digits=3, null=True)),
+                ('admission_cycle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quotas', to='admissions.admissioncycle')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='admission_quotas', to='academics.program')),
+            ],
+            options={
+                'ordering': ['admission_cycle', 'program'],
+                'unique_together': {('program', 'admission_cycle')},
+            },
+        ),
+    ]
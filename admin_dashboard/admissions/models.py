@@ -81,3 +81,18 @@ class UploadedDocument(models.Model):
     def __str__(self):
         return f"{self.applicant.first_name} - {self.requirement.title if self.requirement else 'Other'}"
 
+
+class ProgramQuota(models.Model):
+    """How many applicants a program shortlists in an admission cycle"""
+    program = models.ForeignKey('academics.Program', on_delete=models.CASCADE, related_name='admission_quotas')
+    admission_cycle = models.ForeignKey(AdmissionCycle, on_delete=models.CASCADE, related_name='quotas')
+    quota = models.PositiveIntegerField(help_text="Number of applicants to shortlist")
+    min_gpa = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True,
+                                  help_text="Applicants below this GPA are rejected regardless of quota")
+
+    class Meta:
+        ordering = ['admission_cycle', 'program']
+        unique_together = ('program', 'admission_cycle')
+
+    def __str__(self):
+        return f"{self.program.name} ({self.admission_cycle.year}): {self.quota}"
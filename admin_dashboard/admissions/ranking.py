@@ -0,0 +1,101 @@
+"""
+Applicant ranking and shortlisting per program quota.
+
+The applicants of a cycle are loaded once as parallel columns (one
+``values_list`` query), grouped by program and ranked with a single sort
+per program. Applicants below the program's minimum GPA are rejected, the
+top ``quota`` of the rest are shortlisted and the others rejected. The
+outcome is written back with one ``update()`` per status and chunk.
+
+Ties on GPA are broken by uploaded documents first, then the earlier
+application, then the lower id, so a run is fully deterministic.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Applicant, ProgramQuota
+
+# Applicants the engine may (re)decide; accepted, enrolled, rejected and draft ones are left alone
+RANKED_STATUSES = ('submitted', 'under_review', 'shortlisted')
+UPDATE_CHUNK = 900
+
+
+@dataclass
+class ProgramOutcome:
+    quota: ProgramQuota
+    shortlisted: list = field(default_factory=list)
+    rejected: list = field(default_factory=list)
+    below_minimum: int = 0
+    unranked: int = 0
+    cutoff_gpa: object = None
+
+
+def _columns(cycle, program_ids):
+    """``(pk, program_id, gpa, documents_uploaded, applied_at)`` columns of the rankable applicants"""
+    rows = (
+        Applicant.objects
+        .filter(admission_cycle=cycle, program_id__in=program_ids, status__in=RANKED_STATUSES)
+        .values_list('pk', 'program_id', 'gpa', 'documents_uploaded', 'applied_at')
+    )
+    columns = tuple(zip(*rows))
+    return columns if columns else ((), (), (), (), ())
+
+
+def rank(cycle, programs=None):
+    """
+    Work out the shortlist for ``cycle`` without writing anything.
+
+    Only programs with a ``ProgramQuota`` for the cycle are ranked (optionally
+    limited to ``programs``). Applicants without a GPA are counted as
+    unranked and left unchanged. Returns ``{program_id: ProgramOutcome}``.
+    """
+    quotas = ProgramQuota.objects.filter(admission_cycle=cycle).select_related('program')
+    if programs is not None:
+        quotas = quotas.filter(program__in=programs)
+    outcomes = {quota.program_id: ProgramOutcome(quota) for quota in quotas}
+    pks, program_ids, gpas, documents, applied = _columns(cycle, list(outcomes))
+
+    by_program = defaultdict(list)
+    for index, program_id in enumerate(program_ids):
+        by_program[program_id].append(index)
+
+    for program_id, indexes in by_program.items():
+        outcome = outcomes[program_id]
+        minimum = outcome.quota.min_gpa
+        ranked = []
+        for index in indexes:
+            if gpas[index] is None:
+                outcome.unranked += 1
+            elif minimum is not None and gpas[index] < minimum:
+                outcome.below_minimum += 1
+                outcome.rejected.append(pks[index])
+            else:
+                ranked.append(index)
+        ranked.sort(key=lambda i: (-gpas[i], not documents[i], applied[i], pks[i]))
+        selected = ranked[:outcome.quota.quota]
+        outcome.shortlisted = [pks[i] for i in selected]
+        outcome.rejected.extend(pks[i] for i in ranked[outcome.quota.quota:])
+        if selected:
+            outcome.cutoff_gpa = gpas[selected[-1]]
+    return outcomes
+
+
+def apply(outcomes):
+    """Write a ``rank`` result back; returns ``(shortlisted, rejected)`` counts"""
+    now = timezone.now()
+    totals = {}
+    with transaction.atomic():
+        for status in ('shortlisted', 'rejected'):
+            pks = [pk for outcome in outcomes.values() for pk in getattr(outcome, status)]
+            totals[status] = 0
+            for start in range(0, len(pks), UPDATE_CHUNK):
+                totals[status] += (
+                    Applicant.objects
+                    .filter(pk__in=pks[start:start + UPDATE_CHUNK], status__in=RANKED_STATUSES)
+                    .exclude(status=status)
+                    .update(status=status, updated_at=now)
+                )
+    return totals['shortlisted'], totals['rejected']
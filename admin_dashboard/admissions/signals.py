@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import completeness
+from .models import Applicant, Requirement, UploadedDocument
+
+
+@receiver([post_save, post_delete], sender=UploadedDocument)
+def sync_applicant_documents(sender, instance, **kwargs):
+    completeness.sync(Applicant.objects.filter(pk=instance.applicant_id))
+
+
+@receiver(post_save, sender=Applicant)
+def sync_applicant(sender, instance, **kwargs):
+    # The program (and so the required documents) may have changed
+    completeness.sync(Applicant.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_save, sender=Requirement)
+def remember_requirement_program(sender, instance, **kwargs):
+    instance._stored_program_id = (
+        Requirement.objects.filter(pk=instance.pk).values_list('program_id', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver([post_save, post_delete], sender=Requirement)
+def sync_program_applicants(sender, instance, **kwargs):
+    program_ids = {instance.program_id, getattr(instance, '_stored_program_id', None)} - {None}
+    completeness.sync(Applicant.objects.filter(program_id__in=program_ids))
@@ -0,0 +1,136 @@
+"""
+Bulk acknowledgment ingestion and acknowledgment-rate reporting.
+
+``AnnouncementAnalytics.total_acknowledgments`` holds how many recipients
+were asked to acknowledge (set when the announcement is fanned out to
+inboxes) and ``acknowledged_count`` how many have done so; both are kept
+current with ``F()`` increments instead of being recounted.
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import counters, inbox
+from .counters import ensure_analytics, increments
+from .models import Announcement, AnnouncementAcknowledgment, AnnouncementAnalytics, AnnouncementInboxItem
+
+
+def adjust_acknowledged(counts, create=True):
+    """
+    Add ``{announcement_id: delta}`` to ``acknowledged_count``; with
+    ``create=False`` only existing analytics rows are adjusted.
+    """
+    counts = {pk: delta for pk, delta in counts.items() if delta}
+    if not counts:
+        return
+    if create:
+        ensure_analytics(counts)
+    AnnouncementAnalytics.objects.filter(announcement_id__in=list(counts)).update(
+        acknowledged_count=F('acknowledged_count') + increments(counts, 'announcement_id'),
+    )
+
+
+def unknown_ids(pairs):
+    """Ids from ``(announcement_id, user_id)`` pairs that do not exist, by ``'announcements'`` and ``'users'``"""
+    announcement_ids = {announcement_id for announcement_id, _ in pairs}
+    user_ids = {user_id for _, user_id in pairs}
+    return {
+        'announcements': sorted(
+            announcement_ids - set(Announcement.objects.filter(pk__in=announcement_ids).values_list('pk', flat=True))
+        ),
+        'users': sorted(user_ids - set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))),
+    }
+
+
+def acknowledge_bulk(pairs, notes=''):
+    """
+    Record many ``(announcement_id, user_id)`` acknowledgments at once.
+
+    Pairs for announcements that are not published are ignored. Rows are
+    written with one ``bulk_create(ignore_conflicts=True)``, so repeats are
+    harmless, and the analytics and inbox counters are adjusted once per
+    announcement / per distinct delta. Returns the number of new acknowledgments.
+    """
+    wanted = defaultdict(set)
+    for announcement_id, user_id in pairs:
+        wanted[int(announcement_id)].add(int(user_id))
+    if not wanted:
+        return 0
+    live = set(
+        Announcement.objects
+        .filter(pk__in=list(wanted), status='published')
+        .values_list('pk', flat=True)
+    )
+    wanted = {pk: users for pk, users in wanted.items() if pk in live}
+    if not wanted:
+        return 0
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = set(
+            AnnouncementAcknowledgment.objects
+            .filter(announcement_id__in=list(wanted), user_id__in=list({u for users in wanted.values() for u in users}))
+            .values_list('announcement_id', 'user_id')
+        )
+        new = [
+            (announcement_id, user_id)
+            for announcement_id, users in wanted.items()
+            for user_id in users
+            if (announcement_id, user_id) not in existing
+        ]
+        objs = AnnouncementAcknowledgment.objects.bulk_create(
+            [AnnouncementAcknowledgment(announcement_id=a, user_id=u, notes=notes) for a, u in new],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+        # A concurrent writer may have inserted some pairs first; the conflicting
+        # rows were skipped, so only rows carrying our timestamps are ours
+        attempted = {(obj.announcement_id, obj.user_id): obj.acknowledged_at for obj in objs}
+        new = [
+            (announcement_id, user_id)
+            for announcement_id, user_id, acknowledged_at in (
+                AnnouncementAcknowledgment.objects
+                .filter(announcement_id__in=list(wanted), user_id__in={u for _, u in new})
+                .values_list('announcement_id', 'user_id', 'acknowledged_at')
+            )
+            if attempted.get((announcement_id, user_id)) == acknowledged_at
+        ]
+        per_announcement = Counter(announcement_id for announcement_id, _ in new)
+        adjust_acknowledged(per_announcement)
+        inbox.acknowledge_many(new, now)
+    for announcement_id, amount in per_announcement.items():
+        counters.record_daily(announcement_id, 'acknowledgments', amount)
+    return len(new)
+
+
+def department_rates(announcement_ids=None):
+    """
+    Acknowledgment rate per department in one grouped query over the inboxes.
+
+    Recipients without a faculty record are reported under ``None``.
+    """
+    items = AnnouncementInboxItem.objects.filter(requires_acknowledgment=True)
+    if announcement_ids is not None:
+        items = items.filter(announcement_id__in=list(announcement_ids))
+    rows = (
+        items
+        .values(department=Coalesce('user__faculty__department__name', Value('')))
+        .annotate(
+            expected=Count('pk'),
+            acknowledged=Count('pk', filter=Q(acknowledged_at__isnull=False)),
+        )
+        .order_by('department')
+    )
+    return [
+        {
+            'department': row['department'] or None,
+            'expected': row['expected'],
+            'acknowledged': row['acknowledged'],
+            'rate': round(row['acknowledged'] * 100 / row['expected'], 1) if row['expected'] else None,
+        }
+        for row in rows
+    ]
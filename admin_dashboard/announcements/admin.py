@@ -1,11 +1,16 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from django.utils import timezone
 from .models import (
     AnnouncementCategory, Announcement, AnnouncementAcknowledgment,
     AnnouncementComment, AnnouncementAttachment, AnnouncementDistribution,
-    AnnouncementTemplate, AnnouncementAnalytics
+    AnnouncementTemplate, AnnouncementAnalytics, AnnouncementDeliveryBatch, AnnouncementTag
 )
+from . import inbox
+from .comments import set_approval
+from .distribution import plan_distribution
+from .templating import compiled
 
 
 @admin.register(AnnouncementCategory)
@@ -31,7 +36,7 @@ class AnnouncementAdmin(admin.ModelAdmin):
         'title', 'category', 'status_badge', 'priority_badge', 'is_featured_icon',
         'view_count', 'published_at', 'created_by'
     ]
-    list_filter = ['status', 'priority', 'category', 'is_featured', 'is_sticky', 'published_at']
+    list_filter = ['status', 'priority', 'category', 'is_featured', 'is_sticky', 'tag_set', 'published_at']
     search_fields = ['title', 'content', 'summary', 'tags']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ['created_at', 'updated_at', 'view_count', 'slug']
@@ -103,17 +108,23 @@ class AnnouncementAdmin(admin.ModelAdmin):
     is_featured_icon.short_description = 'Featured'
 
     def publish_announcements(self, request, queryset):
+        ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(status='published', published_at=timezone.now())
+        inbox.fan_out(ids)
         self.message_user(request, f'{updated} announcements published.')
     publish_announcements.short_description = 'Publish selected announcements'
 
     def expire_announcements(self, request, queryset):
+        ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(status='expired')
+        inbox.withdraw(ids)
         self.message_user(request, f'{updated} announcements marked as expired.')
     expire_announcements.short_description = 'Mark selected as expired'
 
     def archive_announcements(self, request, queryset):
+        ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(status='archived')
+        inbox.withdraw(ids)
         self.message_user(request, f'{updated} announcements archived.')
     archive_announcements.short_description = 'Archive selected announcements'
 
@@ -133,6 +144,24 @@ class AnnouncementAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(AnnouncementTag)
+class AnnouncementTagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'announcement_count']
+    search_fields = ['name', 'slug']
+    readonly_fields = ['name', 'slug']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(announcement_total=Count('taggings'))
+
+    def announcement_count(self, obj):
+        return obj.announcement_total
+    announcement_count.short_description = 'Announcements'
+    announcement_count.admin_order_field = 'announcement_total'
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(AnnouncementAcknowledgment)
 class AnnouncementAcknowledgmentAdmin(admin.ModelAdmin):
     list_display = ['announcement', 'user', 'acknowledged_at']
@@ -160,6 +189,8 @@ class AnnouncementCommentAdmin(admin.ModelAdmin):
     search_fields = ['announcement__title', 'commenter__first_name', 'commenter__last_name', 'content']
     readonly_fields = ['created_at', 'updated_at']
     actions = ['approve_comments', 'disapprove_comments']
+    list_select_related = ['announcement', 'commenter']
+    show_full_result_count = False
     
     ordering = ['-created_at']
 
@@ -170,12 +201,12 @@ class AnnouncementCommentAdmin(admin.ModelAdmin):
     approval_badge.short_description = 'Status'
 
     def approve_comments(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        updated = set_approval(queryset, True)
         self.message_user(request, f'{updated} comments approved.')
     approve_comments.short_description = 'Approve selected comments'
 
     def disapprove_comments(self, request, queryset):
-        updated = queryset.update(is_approved=False)
+        updated = set_approval(queryset, False)
         self.message_user(request, f'{updated} comments disapproved.')
     disapprove_comments.short_description = 'Disapprove selected comments'
 
@@ -200,6 +231,18 @@ class AnnouncementAttachmentAdmin(admin.ModelAdmin):
     ordering = ['-uploaded_at']
 
 
+class AnnouncementDeliveryBatchInline(admin.TabularInline):
+    model = AnnouncementDeliveryBatch
+    fields = ['channel', 'size', 'status', 'attempts', 'sent_at']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(AnnouncementDistribution)
 class AnnouncementDistributionAdmin(admin.ModelAdmin):
     list_display = [
@@ -212,7 +255,7 @@ class AnnouncementDistributionAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Distribution Information', {
-            'fields': ('announcement', 'distribution_method', 'recipient_group')
+            'fields': ('announcement', 'distribution_method', 'recipient_group', 'template')
         }),
         ('Scheduling', {
             'fields': ('status', 'scheduled_for', 'sent_at')
@@ -225,6 +268,8 @@ class AnnouncementDistributionAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    inlines = [AnnouncementDeliveryBatchInline]
+    actions = ['plan_recipients']
 
     def status_badge(self, obj):
         colors = {
@@ -240,27 +285,40 @@ class AnnouncementDistributionAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Status'
 
+    def plan_recipients(self, request, queryset):
+        total = 0
+        for distribution in queryset.select_related('announcement'):
+            total += plan_distribution(distribution)
+        self.message_user(request, f'{queryset.count()} distributions planned for {total} recipients.')
+    plan_recipients.short_description = 'Resolve recipients and create delivery batches'
+
 
 @admin.register(AnnouncementTemplate)
 class AnnouncementTemplateAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'is_active', 'created_by', 'created_at']
     list_filter = ['is_active', 'category', 'created_at']
     search_fields = ['name', 'description', 'content_template']
-    readonly_fields = ['created_at']
+    readonly_fields = ['placeholders', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Template Information', {
             'fields': ('name', 'description', 'category', 'is_active')
         }),
         ('Content', {
-            'fields': ('content_template',)
+            'fields': ('content_template', 'placeholders')
         }),
         ('Metadata', {
-            'fields': ('created_by', 'created_at'),
+            'fields': ('created_by', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
 
+    def placeholders(self, obj):
+        if not obj.pk:
+            return '-'
+        return ', '.join(compiled(obj).placeholders) or '-'
+    placeholders.short_description = 'Placeholders'
+
     def save_model(self, request, obj, form, change):
         if not change:
             obj.created_by = request.user
@@ -271,7 +329,7 @@ class AnnouncementTemplateAdmin(admin.ModelAdmin):
 class AnnouncementAnalyticsAdmin(admin.ModelAdmin):
     list_display = [
         'announcement', 'total_views', 'unique_viewers', 'total_comments',
-        'total_acknowledgments', 'attachment_downloads', 'last_updated'
+        'total_acknowledgments', 'acknowledgment_rate', 'attachment_downloads', 'last_updated'
     ]
     list_filter = ['last_updated']
     search_fields = ['announcement__title']
@@ -300,6 +358,12 @@ class AnnouncementAnalyticsAdmin(admin.ModelAdmin):
         }),
     )
 
+    def acknowledgment_rate(self, obj):
+        if not obj.total_acknowledgments:
+            return '-'
+        return f'{obj.acknowledged_count * 100 / obj.total_acknowledgments:.1f}%'
+    acknowledgment_rate.short_description = 'Ack Rate'
+
     def has_delete_permission(self, request, obj=None):
         return False
 
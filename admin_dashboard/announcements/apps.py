@@ -5,3 +5,6 @@ class AnnouncementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'announcements'
     verbose_name = 'Announcements & Notifications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
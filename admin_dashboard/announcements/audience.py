@@ -0,0 +1,97 @@
+import hashlib
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+
+CACHE_TIMEOUT = 60 * 60
+VERSION_KEY = 'announcements:audience:version'
+
+# Audience names backed by auth groups of the same role
+ROLE_GROUPS = {
+    'students': 'Students',
+    'staff': 'Staff',
+    'faculty': 'Faculty',
+}
+
+
+def target_filter(target):
+    """
+    ``Q`` selecting the users of a single audience target.
+
+    Supported targets are the ``Announcement.target_audience`` choices
+    (``all``, ``students``, ``staff``, ``faculty``, ``admin``) plus
+    ``group:<auth group name>`` and ``department:<academics department slug>``.
+    A bare name is matched against group names and department slugs/names.
+    """
+    target = target.strip()
+    key = target.lower()
+    if key in ('all', ''):
+        return Q()
+    if key == 'admin':
+        return Q(is_superuser=True)
+    if key == 'staff':
+        return Q(is_staff=True) | Q(groups__name=ROLE_GROUPS['staff'])
+    if key == 'faculty':
+        return Q(faculty__isnull=False) | Q(groups__name=ROLE_GROUPS['faculty'])
+    if key == 'students':
+        return Q(groups__name=ROLE_GROUPS['students'])
+    if key.startswith('group:'):
+        return Q(groups__name=target.split(':', 1)[1].strip())
+    if key.startswith('department:'):
+        return Q(faculty__department__slug=target.split(':', 1)[1].strip())
+    return (
+        Q(groups__name=target)
+        | Q(faculty__department__slug=target)
+        | Q(faculty__department__name__iexact=target)
+    )
+
+
+def audience_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate():
+    """Forget every cached audience (called when users, groups or faculty change)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def resolve(spec):
+    """
+    Resolve a comma-separated audience spec to a sorted list of active user ids.
+
+    All targets are OR-ed into one set-based query. Results are cached per
+    audience version, so membership changes are picked up immediately.
+    """
+    targets = sorted({part.strip() for part in (spec or '').split(',') if part.strip()})
+    if not targets:
+        return []
+    digest = hashlib.sha1(','.join(targets).encode()).hexdigest()
+    key = f'announcements:audience:v{audience_version()}:{digest}'
+    user_ids = cache.get(key)
+    if user_ids is None:
+        condition = Q()
+        if 'all' not in (t.lower() for t in targets):
+            condition = Q(pk__in=[])
+            for target in targets:
+                condition |= target_filter(target)
+        user_ids = list(
+            User.objects.filter(condition, is_active=True)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+            .distinct()
+        )
+        cache.set(key, user_ids, CACHE_TIMEOUT)
+    return user_ids
+
+
+def audience_spec(announcement, recipient_group=''):
+    """Audience for a distribution: its recipient group, else the announcement's target (empty if none)"""
+    if recipient_group:
+        return recipient_group
+    if announcement.target_audience == 'specific':
+        return ''
+    return announcement.target_audience
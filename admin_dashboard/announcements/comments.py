@@ -0,0 +1,67 @@
+"""
+Comment counters and moderation.
+
+``AnnouncementAnalytics.total_comments`` and ``approved_comments`` are kept
+current with ``F()`` increments from the comment signals and from
+``set_approval``, which moves a whole selection in one grouped read and
+one counter update instead of recounting.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .counters import ensure_analytics, increments
+from .models import AnnouncementAnalytics, AnnouncementComment
+
+
+def adjust_comment_counts(total=None, approved=None, create=True):
+    """
+    Add ``{announcement_id: delta}`` mappings to the total and approved comment
+    counters; with ``create=False`` only existing analytics rows are adjusted.
+    """
+    total = {pk: delta for pk, delta in (total or {}).items() if delta}
+    approved = {pk: delta for pk, delta in (approved or {}).items() if delta}
+    ids = set(total) | set(approved)
+    if not ids:
+        return
+    if create:
+        ensure_analytics(ids)
+    AnnouncementAnalytics.objects.filter(announcement_id__in=ids).update(
+        total_comments=F('total_comments') + increments(total, 'announcement_id'),
+        approved_comments=F('approved_comments') + increments(approved, 'announcement_id'),
+    )
+
+
+def set_approval(queryset, approved):
+    """Approve or unapprove the selected comments; returns how many changed state"""
+    with transaction.atomic():
+        changing = queryset.filter(is_approved=not approved)
+        per_announcement = Counter({
+            row['announcement_id']: row['n']
+            for row in changing.values('announcement_id').annotate(n=Count('pk')).order_by()
+        })
+        updated = changing.update(is_approved=approved)
+        sign = 1 if approved else -1
+        adjust_comment_counts(approved={pk: sign * n for pk, n in per_announcement.items()})
+    return updated
+
+
+def moderation_queue(after=None, limit=50):
+    """
+    Oldest pending comments first, paged by ``(created_at, id)`` keyset.
+
+    ``after`` is the id of the last comment of the previous page. Each page
+    is one range scan on the ``(is_approved, created_at)`` index.
+    """
+    queryset = (
+        AnnouncementComment.objects
+        .filter(is_approved=False)
+        .select_related('announcement', 'commenter')
+        .order_by('created_at', 'id')
+    )
+    if after is not None:
+        anchor = AnnouncementComment.objects.filter(pk=after).values_list('created_at', flat=True).first()
+        if anchor is not None:
+            queryset = queryset.filter(Q(created_at__gt=anchor) | Q(created_at=anchor, pk__gt=after))
+    return list(queryset[:limit])
@@ -0,0 +1,247 @@
+"""
+Write-buffered engagement counters for announcements.
+
+Views and attachment downloads are accumulated in process memory and written
+out at most every ``ANNOUNCEMENT_COUNTER_FLUSH_SECONDS`` (default 10) with one
+batched ``F()`` update per table, instead of one row-level UPDATE per hit.
+Counts still in the buffer when a worker dies are lost, so the loss window is
+bounded by the flush interval.
+
+Distinct viewers are buffered the same way as per-day HyperLogLog sketches
+and merged into the stored sketches on flush, and every event is also
+tallied into per-day buckets (see ``timeseries``).
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from . import timeseries
+from .hll import HyperLogLog
+from .models import Announcement, AnnouncementAnalytics, AnnouncementAttachment, AnnouncementViewerSketch
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """Thread-safe accumulator of pending increments keyed by row id"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def add(self, key, amount=1):
+        with self._lock:
+            self._counts[key] += amount
+
+    def merge(self, counts):
+        with self._lock:
+            self._counts.update(counts)
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class SketchBuffer:
+    """Thread-safe per-(announcement, day) HyperLogLog sketches awaiting a flush"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sketches = {}
+
+    def add(self, key, value):
+        with self._lock:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = HyperLogLog()
+            sketch.add(value)
+
+    def merge(self, sketches):
+        with self._lock:
+            for key, sketch in sketches.items():
+                if key in self._sketches:
+                    self._sketches[key].merge(sketch)
+                else:
+                    self._sketches[key] = sketch
+
+    def drain(self):
+        with self._lock:
+            sketches, self._sketches = self._sketches, {}
+        return sketches
+
+    def __len__(self):
+        return len(self._sketches)
+
+
+views = CounterBuffer()
+downloads = CounterBuffer()
+viewers = SketchBuffer()
+daily = CounterBuffer()
+
+_flush_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def flush_interval():
+    return getattr(settings, 'ANNOUNCEMENT_COUNTER_FLUSH_SECONDS', 10)
+
+
+def increments(counts, field='pk'):
+    """``CASE`` expression adding each row's pending count, for use in ``update()``"""
+    return Case(
+        *[When(**{field: key, 'then': Value(amount)}) for key, amount in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def ensure_analytics(announcement_ids):
+    """Create missing AnnouncementAnalytics rows for existing announcements"""
+    existing = Announcement.objects.filter(pk__in=list(announcement_ids)).values_list('pk', flat=True)
+    AnnouncementAnalytics.objects.bulk_create(
+        [AnnouncementAnalytics(announcement_id=pk) for pk in existing],
+        ignore_conflicts=True,
+    )
+
+
+def apply_view_counts(counts):
+    if not counts:
+        return
+    ensure_analytics(counts)
+    Announcement.objects.filter(pk__in=list(counts)).update(
+        view_count=F('view_count') + increments(counts),
+    )
+    AnnouncementAnalytics.objects.filter(announcement_id__in=list(counts)).update(
+        total_views=F('total_views') + increments(counts, 'announcement_id'),
+    )
+
+
+def apply_download_counts(counts):
+    if not counts:
+        return
+    per_announcement = Counter()
+    for attachment_id, announcement_id in AnnouncementAttachment.objects.filter(
+        pk__in=list(counts),
+    ).values_list('pk', 'announcement_id'):
+        per_announcement[announcement_id] += counts[attachment_id]
+
+    AnnouncementAttachment.objects.filter(pk__in=list(counts)).update(
+        download_count=F('download_count') + increments(counts),
+    )
+    ensure_analytics(per_announcement)
+    AnnouncementAnalytics.objects.filter(announcement_id__in=list(per_announcement)).update(
+        attachment_downloads=F('attachment_downloads') + increments(per_announcement, 'announcement_id'),
+    )
+
+
+def apply_viewer_sketches(sketches):
+    """
+    Merge buffered sketches into the stored daily and lifetime sketches.
+
+    Rows are locked while merging so concurrent flushes from other workers
+    cannot overwrite each other's registers.
+    """
+    if not sketches:
+        return
+    announcement_ids = {announcement_id for announcement_id, _ in sketches}
+    days = {day for _, day in sketches}
+    existing = set(Announcement.objects.filter(pk__in=announcement_ids).values_list('pk', flat=True))
+    sketches = {key: sketch for key, sketch in sketches.items() if key[0] in existing}
+
+    AnnouncementViewerSketch.objects.bulk_create(
+        [AnnouncementViewerSketch(announcement_id=aid, day=day) for aid, day in sketches],
+        ignore_conflicts=True,
+    )
+    daily = [
+        row for row in (
+            AnnouncementViewerSketch.objects
+            .select_for_update()
+            .filter(announcement_id__in=existing, day__in=days)
+        )
+        if (row.announcement_id, row.day) in sketches
+    ]
+    lifetime = {}
+    for row in daily:
+        pending = sketches[(row.announcement_id, row.day)]
+        row.sketch = HyperLogLog.from_bytes(row.sketch).merge(pending).to_bytes()
+        lifetime.setdefault(row.announcement_id, HyperLogLog()).merge(pending)
+    AnnouncementViewerSketch.objects.bulk_update(daily, ['sketch'])
+
+    ensure_analytics(lifetime)
+    analytics = list(AnnouncementAnalytics.objects.select_for_update().filter(announcement_id__in=list(lifetime)))
+    for row in analytics:
+        merged = HyperLogLog.from_bytes(row.viewer_sketch).merge(lifetime[row.announcement_id])
+        row.viewer_sketch = merged.to_bytes()
+        row.unique_viewers = merged.count()
+    AnnouncementAnalytics.objects.bulk_update(analytics, ['viewer_sketch', 'unique_viewers'])
+
+
+def flush():
+    """Write all buffered counts to the database; counts are put back if the write fails"""
+    global _last_flush
+    _last_flush = time.monotonic()
+    pending_views = views.drain()
+    pending_downloads = downloads.drain()
+    pending_viewers = viewers.drain()
+    pending_daily = daily.drain()
+    if not pending_views and not pending_downloads and not pending_viewers and not pending_daily:
+        return
+    try:
+        with transaction.atomic():
+            apply_view_counts(pending_views)
+            apply_download_counts(pending_downloads)
+            apply_viewer_sketches(pending_viewers)
+            timeseries.apply_daily_counts(pending_daily)
+    except Exception:
+        views.merge(pending_views)
+        downloads.merge(pending_downloads)
+        viewers.merge(pending_viewers)
+        daily.merge(pending_daily)
+        logger.exception('Could not flush announcement counters; will retry')
+
+
+def maybe_flush():
+    """Flush if the interval has elapsed and no other thread is already flushing"""
+    if time.monotonic() - _last_flush < flush_interval():
+        return
+    if _flush_lock.acquire(blocking=False):
+        try:
+            flush()
+        finally:
+            _flush_lock.release()
+
+
+def record_view(announcement_id, viewer=None):
+    """Count a view; ``viewer`` is any stable identifier used for unique-viewer estimates"""
+    today = timezone.localdate()
+    views.add(announcement_id)
+    daily.add((announcement_id, today, 'views'))
+    if viewer is not None:
+        viewers.add((announcement_id, today), viewer)
+    maybe_flush()
+
+
+def record_download(attachment_id):
+    downloads.add(attachment_id)
+    daily.add((('attachment', attachment_id), timezone.localdate(), 'downloads'))
+    maybe_flush()
+
+
+def record_daily(announcement_id, metric, amount=1):
+    """Tally an event that is stored elsewhere (acknowledgment, comment) into today's bucket"""
+    daily.add((announcement_id, timezone.localdate(), metric), amount)
+    maybe_flush()
+
+
+atexit.register(flush)
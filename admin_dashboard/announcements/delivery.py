@@ -0,0 +1,388 @@
+"""
+Asyncio delivery worker for announcement distributions.
+
+Pending delivery batches are claimed from the database and their recipients
+are sent to concurrently, with a per-channel semaphore bounding how many
+sends are in flight. Blocking sends (SMTP, HTTP gateways) run in worker
+threads; the email sender keeps a pool of open SMTP connections so each
+message reuses an existing session instead of reconnecting.
+
+Transient failures are retried with exponential backoff. Success and
+failure tallies are written to ``AnnouncementDistribution`` in periodic
+batched updates rather than once per message.
+
+Settings (all optional):
+
+``ANNOUNCEMENT_DELIVERY_SENDERS``
+    ``{channel: 'dotted.path.SenderClass'}`` overriding the built-in senders.
+``ANNOUNCEMENT_DELIVERY_CONCURRENCY``
+    ``{channel: int}`` overriding each sender's default concurrency.
+``ANNOUNCEMENT_DELIVERY_RETRIES`` (3) and ``ANNOUNCEMENT_DELIVERY_BACKOFF`` (1.0 s)
+    Extra attempts per message and the base delay, doubled on each retry.
+``ANNOUNCEMENT_DELIVERY_FLUSH_SECONDS`` (2.0)
+    How often counters are written while a run is in progress.
+``ANNOUNCEMENT_DELIVERY_CLAIM_TIMEOUT`` (900 s) and ``ANNOUNCEMENT_DELIVERY_MAX_CLAIMS`` (5)
+    A batch still ``sending`` this long after it was claimed belongs to a
+    worker that died; it is put back to ``pending`` (recipients already
+    reached may get the message twice), or marked ``failed`` once it has
+    been claimed ``MAX_CLAIMS`` times.
+"""
+import asyncio
+import logging
+import queue
+import random
+from collections import Counter
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+
+from . import templating
+from .counters import increments
+from .models import AnnouncementDeliveryBatch, AnnouncementDistribution
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentDeliveryError(Exception):
+    """A send that will never succeed (no address, rejected recipient); not retried"""
+
+
+class Sender:
+    """
+    Base class for channel senders.
+
+    ``send`` is a blocking call made from a worker thread; at most
+    ``concurrency`` calls run at once for a channel. ``open`` and ``close``
+    bracket a delivery run.
+    """
+    concurrency = 10
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, user, message):
+        raise NotImplementedError
+
+
+class EmailSender(Sender):
+    """Sends through Django's email backend, reusing a pool of open connections"""
+    concurrency = 10
+
+    def __init__(self):
+        self._pool = queue.SimpleQueue()
+        self._connections = []
+
+    def _connection(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self._connections.append(connection)
+            return connection
+
+    def send(self, user, message):
+        if not user.email:
+            raise PermanentDeliveryError(f'{user.username} has no email address')
+        connection = self._connection()
+        try:
+            EmailMessage(
+                subject=message['subject'],
+                body=message['body'],
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[user.email],
+                connection=connection,
+            ).send()
+        except Exception:
+            # Drop the connection; the retry opens a fresh one
+            connection.close()
+            self._connections.remove(connection)
+            raise
+        self._pool.put(connection)
+
+    def close(self):
+        for connection in self._connections:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning('Error closing email connection', exc_info=True)
+        self._connections = []
+        self._pool = queue.SimpleQueue()
+
+
+class DashboardSender(Sender):
+    """Dashboard display needs no outbound message; every recipient counts as delivered"""
+    concurrency = 100
+
+    def send(self, user, message):
+        pass
+
+
+class UnconfiguredSender(Sender):
+    """Fails every recipient of a channel that has no gateway configured"""
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    def send(self, user, message):
+        raise PermanentDeliveryError(f'No sender configured for {self.channel}')
+
+
+DEFAULT_SENDERS = {
+    'email': EmailSender,
+    'dashboard': DashboardSender,
+}
+
+
+def get_sender(channel):
+    path = getattr(settings, 'ANNOUNCEMENT_DELIVERY_SENDERS', {}).get(channel)
+    if path:
+        sender = import_string(path)()
+    elif channel in DEFAULT_SENDERS:
+        sender = DEFAULT_SENDERS[channel]()
+    else:
+        sender = UnconfiguredSender(channel)
+    limits = getattr(settings, 'ANNOUNCEMENT_DELIVERY_CONCURRENCY', {})
+    if channel in limits:
+        sender.concurrency = limits[channel]
+    return sender
+
+
+def build_message(announcement):
+    return {
+        'subject': announcement.title,
+        'body': announcement.summary or strip_tags(announcement.content),
+    }
+
+
+def personalize(distribution, user_ids):
+    """Per-recipient messages rendered from the distribution's template, keyed by user id"""
+    announcement = distribution.announcement
+    contexts = list(templating.recipient_contexts(user_ids, templating.base_context(announcement)))
+    bodies = templating.render_many(distribution.template, contexts)
+    return {
+        context['user_id']: {'subject': announcement.title, 'body': body}
+        for context, body in zip(contexts, bodies)
+    }
+
+
+class Tally:
+    """Per-distribution success/failure counts awaiting a database write"""
+
+    def __init__(self):
+        self.success = Counter()
+        self.failure = Counter()
+        self.reasons = {}
+
+    def drain(self):
+        drained = (self.success, self.failure, self.reasons)
+        self.success, self.failure, self.reasons = Counter(), Counter(), {}
+        return drained
+
+
+def write_counts(success, failure, reasons):
+    """Add pending counts to their distributions with one update"""
+    ids = set(success) | set(failure)
+    if not ids:
+        return
+    AnnouncementDistribution.objects.filter(pk__in=ids).update(
+        success_count=F('success_count') + increments(success),
+        failure_count=F('failure_count') + increments(failure),
+    )
+    for distribution_id, reason in reasons.items():
+        AnnouncementDistribution.objects.filter(pk=distribution_id).update(failure_reason=reason[:1000])
+
+
+def requeue_stale_batches(now=None):
+    """Return batches abandoned in ``sending`` by a crashed worker; returns ``(requeued, failed)``"""
+    now = now or timezone.now()
+    timeout = getattr(settings, 'ANNOUNCEMENT_DELIVERY_CLAIM_TIMEOUT', 15 * 60)
+    max_claims = getattr(settings, 'ANNOUNCEMENT_DELIVERY_MAX_CLAIMS', 5)
+    stale = AnnouncementDeliveryBatch.objects.filter(
+        Q(claimed_at__lt=now - timedelta(seconds=timeout)) | Q(claimed_at__isnull=True),
+        status='sending',
+    )
+    given_up = list(stale.filter(attempts__gte=max_claims).values_list('pk', 'distribution_id', 'size'))
+    failed = AnnouncementDeliveryBatch.objects.filter(
+        pk__in=[pk for pk, _, _ in given_up], status='sending',
+    ).update(status='failed')
+    requeued = stale.update(status='pending')
+    if failed:
+        # Their recipients count as failures so the distributions can be closed
+        lost = Counter()
+        for _, distribution_id, size in given_up:
+            lost[distribution_id] += size
+        write_counts({}, lost, {pk: 'Delivery worker stopped while sending' for pk in lost})
+        finish_batches([], set(lost), now)
+    if requeued or failed:
+        logger.warning('Recovered stale delivery batches: %s requeued, %s failed', requeued, failed)
+    return requeued, failed
+
+
+def claim_batches(limit=None, now=None):
+    """Mark due pending batches as sending and return them with their recipients loaded"""
+    now = now or timezone.now()
+    requeue_stale_batches(now)
+    with transaction.atomic():
+        queryset = (
+            AnnouncementDeliveryBatch.objects
+            # Lock the batches only, not the joined distribution and announcement rows
+            .select_for_update(skip_locked=True, of=('self',))
+            .filter(status='pending', distribution__announcement__status='published')
+            .filter(Q(distribution__scheduled_for__isnull=True) | Q(distribution__scheduled_for__lte=now))
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        if limit:
+            queryset = queryset[:limit]
+        ids = list(queryset)
+        AnnouncementDeliveryBatch.objects.filter(pk__in=ids).update(
+            status='sending', attempts=F('attempts') + 1, claimed_at=now,
+        )
+    batches = list(
+        AnnouncementDeliveryBatch.objects
+        .filter(pk__in=ids)
+        .select_related('distribution__announcement__category', 'distribution__template')
+    )
+    user_ids = {pk for batch in batches for pk in batch.recipient_ids}
+    users = User.objects.filter(is_active=True).only('pk', 'username', 'email').in_bulk(list(user_ids))
+    return batches, users
+
+
+def release_batches(batch_ids):
+    AnnouncementDeliveryBatch.objects.filter(pk__in=batch_ids, status='sending').update(status='pending')
+
+
+def finish_batches(sent_ids, distribution_ids, now=None):
+    """Mark batches sent and close distributions that have nothing left to send"""
+    now = now or timezone.now()
+    AnnouncementDeliveryBatch.objects.filter(pk__in=sent_ids).update(status='sent', sent_at=now)
+    done = (
+        AnnouncementDistribution.objects
+        .filter(pk__in=distribution_ids)
+        .exclude(batches__status__in=['pending', 'sending'])
+    )
+    done.filter(Q(success_count__gt=0) | Q(failure_count=0)).update(status='sent', sent_at=now)
+    done.filter(success_count=0, failure_count__gt=0).update(status='failed', sent_at=now)
+
+
+class Dispatcher:
+    """Runs one delivery pass over a set of claimed batches"""
+
+    def __init__(self, senders=None):
+        self.senders = senders or {}
+        self.semaphores = {}
+        self.tally = Tally()
+        self.delivered = 0
+        self.failed = 0
+        self.retries = getattr(settings, 'ANNOUNCEMENT_DELIVERY_RETRIES', 3)
+        self.backoff = getattr(settings, 'ANNOUNCEMENT_DELIVERY_BACKOFF', 1.0)
+        self.flush_seconds = getattr(settings, 'ANNOUNCEMENT_DELIVERY_FLUSH_SECONDS', 2.0)
+
+    def sender(self, channel):
+        if channel not in self.senders:
+            self.senders[channel] = get_sender(channel)
+            self.senders[channel].open()
+        if channel not in self.semaphores:
+            self.semaphores[channel] = asyncio.Semaphore(self.senders[channel].concurrency)
+        return self.senders[channel]
+
+    async def deliver(self, batch, user, message):
+        sender = self.sender(batch.channel)
+        distribution_id = batch.distribution_id
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.semaphores[batch.channel]:
+                    await asyncio.to_thread(sender.send, user, message)
+            except PermanentDeliveryError as exc:
+                self.record_failure(distribution_id, str(exc))
+                return False
+            except Exception as exc:
+                if attempt == self.retries:
+                    self.record_failure(distribution_id, f'{type(exc).__name__}: {exc}')
+                    logger.warning('Delivery to user %s failed after %d attempts', user.pk, attempt + 1)
+                    return False
+                delay = self.backoff * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            else:
+                self.tally.success[distribution_id] += 1
+                self.delivered += 1
+                return True
+
+    def record_failure(self, distribution_id, reason, count=1):
+        self.tally.failure[distribution_id] += count
+        self.tally.reasons[distribution_id] = reason
+        self.failed += count
+
+    async def deliver_batch(self, batch, users):
+        distribution = batch.distribution
+        present = [pk for pk in batch.recipient_ids if pk in users]
+        missing = len(batch.recipient_ids) - len(present)
+        if missing:
+            self.record_failure(distribution.pk, f'{missing} recipients no longer active', missing)
+        if distribution.template_id:
+            messages = await sync_to_async(personalize)(distribution, present)
+        else:
+            message = build_message(distribution.announcement)
+            messages = dict.fromkeys(present, message)
+        await asyncio.gather(*[self.deliver(batch, users[pk], messages[pk]) for pk in present])
+
+    async def flush(self):
+        success, failure, reasons = self.tally.drain()
+        try:
+            await sync_to_async(write_counts)(success, failure, reasons)
+        except Exception:
+            self.tally.success.update(success)
+            self.tally.failure.update(failure)
+            self.tally.reasons = {**reasons, **self.tally.reasons}
+            logger.exception('Could not write delivery counters; will retry')
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def run(self, batches, users):
+        flusher = asyncio.create_task(self.flush_periodically())
+        try:
+            await asyncio.gather(*[self.deliver_batch(batch, users) for batch in batches])
+        finally:
+            flusher.cancel()
+            await self.flush()
+            for sender in self.senders.values():
+                await asyncio.to_thread(sender.close)
+        await sync_to_async(finish_batches)(
+            [batch.pk for batch in batches],
+            {batch.distribution_id for batch in batches},
+        )
+
+
+async def deliver_pending(limit=None, senders=None):
+    """Claim due batches and deliver them; returns ``(batches, successes, failures)``"""
+    batches, users = await sync_to_async(claim_batches)(limit)
+    if not batches:
+        return 0, 0, 0
+    dispatcher = Dispatcher(senders)
+    try:
+        await dispatcher.run(batches, users)
+    except BaseException:
+        # Put unfinished batches back so the next run picks them up
+        await sync_to_async(release_batches)([batch.pk for batch in batches])
+        raise
+    return len(batches), dispatcher.delivered, dispatcher.failed
+
+
+def run(limit=None, senders=None):
+    """Synchronous entry point for management commands and admin actions"""
+    return asyncio.run(deliver_pending(limit, senders))
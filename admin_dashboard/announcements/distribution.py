@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import audience
+from .models import AnnouncementDeliveryBatch, AnnouncementDistribution
+
+BATCH_SIZE = 500
+
+
+def channels_for(method):
+    """Concrete channels for a distribution method ('all' fans out to every channel)"""
+    if method == 'all':
+        return [channel for channel, _ in AnnouncementDeliveryBatch.CHANNEL_CHOICES]
+    return [method]
+
+
+def plan_distribution(distribution, batch_size=BATCH_SIZE):
+    """
+    Resolve a distribution's audience and split it into per-channel delivery batches.
+
+    Any batches that have not started sending are replaced. The recipients
+    are resolved with one cached set query and all batch rows are written with
+    a single ``bulk_create``. Returns the number of recipients.
+    """
+    spec = audience.audience_spec(distribution.announcement, distribution.recipient_group)
+    user_ids = audience.resolve(spec)
+    chunks = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+
+    with transaction.atomic():
+        distribution.batches.filter(status='pending').delete()
+        AnnouncementDeliveryBatch.objects.bulk_create([
+            AnnouncementDeliveryBatch(
+                distribution=distribution,
+                channel=channel,
+                recipient_ids=chunk,
+                size=len(chunk),
+            )
+            for channel in channels_for(distribution.distribution_method)
+            for chunk in chunks
+        ])
+        AnnouncementDistribution.objects.filter(pk=distribution.pk).update(
+            recipient_count=len(user_ids),
+            scheduled_for=distribution.scheduled_for or timezone.now(),
+        )
+        distribution.recipient_count = len(user_ids)
+    return len(user_ids)
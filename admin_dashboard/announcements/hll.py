@@ -0,0 +1,68 @@
+import hashlib
+import math
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION  # 4096 one-byte registers, ~1.6% standard error
+_HASH_BITS = 64
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+class HyperLogLog:
+    """
+    Fixed-size cardinality sketch.
+
+    Each sketch is ``REGISTERS`` bytes regardless of how many values were
+    added. Sketches built in different workers or on different days merge by
+    taking the register-wise maximum, so they can be combined freely.
+    """
+
+    __slots__ = ('registers',)
+
+    def __init__(self, registers=None):
+        if registers:
+            if len(registers) != REGISTERS:
+                raise ValueError(f'Expected {REGISTERS} registers, got {len(registers)}')
+            self.registers = bytearray(registers)
+        else:
+            self.registers = bytearray(REGISTERS)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(bytes(data) if data else None)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (_HASH_BITS - PRECISION)
+        remainder = hashed & ((1 << (_HASH_BITS - PRECISION)) - 1)
+        rank = (_HASH_BITS - PRECISION) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        estimate = _ALPHA * REGISTERS * REGISTERS / sum(2.0 ** -r for r in self.registers)
+        if estimate <= 2.5 * REGISTERS:
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+
+def merge_all(sketches):
+    """Union of several sketches (raw bytes or HyperLogLog instances)"""
+    result = HyperLogLog()
+    for sketch in sketches:
+        if not isinstance(sketch, HyperLogLog):
+            sketch = HyperLogLog.from_bytes(sketch)
+        result.merge(sketch)
+    return result
@@ -0,0 +1,234 @@
+"""
+Per-user announcement inbox.
+
+Publishing an announcement writes one AnnouncementInboxItem per recipient
+and bumps each recipient's AnnouncementInboxCounter, so reading the unread
+count is a primary-key lookup and an inbox page is one indexed range scan,
+with no audience or acknowledgment joins at read time.
+
+Counters are adjusted with grouped ``F()`` updates: recipients that change
+by the same amount share one UPDATE, so fanning an announcement out to
+thousands of users costs a handful of queries.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import audience
+from .counters import ensure_analytics
+from .models import (
+    Announcement, AnnouncementAcknowledgment, AnnouncementAnalytics, AnnouncementInboxCounter,
+    AnnouncementInboxItem,
+)
+
+
+def recipients(announcement):
+    """User ids an announcement is addressed to ('specific' uses its distributions' groups)"""
+    if announcement.target_audience == 'specific':
+        groups = announcement.distributions.exclude(recipient_group='').values_list('recipient_group', flat=True)
+        return audience.resolve(','.join(groups))
+    return audience.resolve(audience.audience_spec(announcement))
+
+
+def adjust_counters(deltas):
+    """Apply ``{user_id: (unread_delta, pending_delta)}``, one UPDATE per distinct delta"""
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta != (0, 0):
+            by_delta[delta].append(user_id)
+    if not by_delta:
+        return
+    AnnouncementInboxCounter.objects.bulk_create(
+        [AnnouncementInboxCounter(user_id=user_id) for user_ids in by_delta.values() for user_id in user_ids],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+    now = timezone.now()
+    for (unread, pending), user_ids in by_delta.items():
+        AnnouncementInboxCounter.objects.filter(user_id__in=user_ids).update(
+            unread=F('unread') + unread,
+            pending_acknowledgments=F('pending_acknowledgments') + pending,
+            updated_at=now,
+        )
+
+
+def fan_out(announcement_ids):
+    """
+    Deliver published announcements to their recipients' inboxes.
+
+    Idempotent: users who already have an item are skipped, so this is safe
+    to call again after the audience grows. Returns the number of items added.
+    """
+    added = 0
+    announcements = Announcement.objects.filter(pk__in=list(announcement_ids), status='published')
+    for announcement in announcements:
+        with transaction.atomic():
+            existing = set(announcement.inbox_items.values_list('user_id', flat=True))
+            new_users = [pk for pk in recipients(announcement) if pk not in existing]
+            if announcement.require_acknowledgment:
+                record_expected(announcement.pk, len(existing) + len(new_users))
+            if not new_users:
+                continue
+            acknowledged = dict(
+                AnnouncementAcknowledgment.objects
+                .filter(announcement=announcement, user_id__in=new_users)
+                .values_list('user_id', 'acknowledged_at')
+            ) if announcement.require_acknowledgment else {}
+            AnnouncementInboxItem.objects.bulk_create([
+                AnnouncementInboxItem(
+                    user_id=user_id,
+                    announcement=announcement,
+                    published_at=announcement.published_at or announcement.created_at,
+                    requires_acknowledgment=announcement.require_acknowledgment,
+                    acknowledged_at=acknowledged.get(user_id),
+                    is_read=user_id in acknowledged,
+                )
+                for user_id in new_users
+            ], batch_size=1000)
+            pending = int(announcement.require_acknowledgment)
+            adjust_counters({
+                user_id: (0, 0) if user_id in acknowledged else (1, pending)
+                for user_id in new_users
+            })
+            added += len(new_users)
+    return added
+
+
+def record_expected(announcement_id, expected):
+    """Raise the analytics' expected acknowledgments to ``expected`` (never lowered by withdrawals)"""
+    ensure_analytics([announcement_id])
+    AnnouncementAnalytics.objects.filter(announcement_id=announcement_id).update(
+        total_acknowledgments=Greatest(F('total_acknowledgments'), Value(expected)),
+    )
+
+
+def withdraw(announcement_ids):
+    """Remove announcements that are no longer published from every inbox"""
+    items = AnnouncementInboxItem.objects.filter(announcement_id__in=list(announcement_ids))
+    with transaction.atomic():
+        deltas = {
+            row['user_id']: (-row['unread'], -row['pending'])
+            for row in (
+                items.values('user_id')
+                .annotate(
+                    unread=Count('pk', filter=Q(is_read=False)),
+                    pending=Count('pk', filter=Q(requires_acknowledgment=True, acknowledged_at__isnull=True)),
+                )
+                .order_by()
+            )
+        }
+        removed, _ = items.delete()
+        adjust_counters(deltas)
+    return removed
+
+
+def mark_read(user, announcement_ids=None):
+    """Mark some (or all) of a user's inbox items read; returns how many changed"""
+    items = AnnouncementInboxItem.objects.filter(user=user, is_read=False)
+    if announcement_ids is not None:
+        items = items.filter(announcement_id__in=list(announcement_ids))
+    with transaction.atomic():
+        changed = items.update(is_read=True, read_at=timezone.now())
+        adjust_counters({user.pk: (-changed, 0)})
+    return changed
+
+
+def acknowledge(user_id, announcement_ids, when=None):
+    """Record one user's acknowledgments in the inbox (also marking the items read)"""
+    return acknowledge_many([(announcement_id, user_id) for announcement_id in announcement_ids], when)
+
+
+def acknowledge_many(pairs, when=None):
+    """Record ``(announcement_id, user_id)`` acknowledgments in the inboxes with grouped updates"""
+    when = when or timezone.now()
+    users_by_announcement = defaultdict(list)
+    for announcement_id, user_id in pairs:
+        users_by_announcement[announcement_id].append(user_id)
+    if not users_by_announcement:
+        return 0
+    condition = Q(pk__in=[])
+    for announcement_id, user_ids in users_by_announcement.items():
+        condition |= Q(announcement_id=announcement_id, user_id__in=user_ids)
+
+    with transaction.atomic():
+        rows = list(
+            AnnouncementInboxItem.objects
+            .select_for_update()
+            .filter(condition)
+            .filter(Q(is_read=False) | Q(requires_acknowledgment=True, acknowledged_at__isnull=True))
+            .values_list('pk', 'user_id', 'is_read', 'requires_acknowledgment', 'acknowledged_at')
+        )
+        unread_ids, pending_ids = [], []
+        deltas = defaultdict(lambda: (0, 0))
+        for pk, user_id, is_read, requires_ack, acknowledged_at in rows:
+            unread, pending = deltas[user_id]
+            if not is_read:
+                unread_ids.append(pk)
+                unread -= 1
+            if requires_ack and acknowledged_at is None:
+                pending_ids.append(pk)
+                pending -= 1
+            deltas[user_id] = (unread, pending)
+        AnnouncementInboxItem.objects.filter(pk__in=unread_ids).update(is_read=True, read_at=when)
+        AnnouncementInboxItem.objects.filter(pk__in=pending_ids).update(acknowledged_at=when)
+        adjust_counters(deltas)
+    return len(pending_ids)
+
+
+def unacknowledge(user_id, announcement_ids):
+    """Reopen acknowledgments that were withdrawn"""
+    items = AnnouncementInboxItem.objects.filter(
+        user_id=user_id, announcement_id__in=list(announcement_ids),
+        requires_acknowledgment=True, acknowledged_at__isnull=False,
+    )
+    with transaction.atomic():
+        reopened = items.update(acknowledged_at=None)
+        adjust_counters({user_id: (0, reopened)})
+    return reopened
+
+
+def counts(user):
+    """``(unread, pending_acknowledgments)`` for a user from the counter row"""
+    row = (
+        AnnouncementInboxCounter.objects
+        .filter(user_id=user.pk)
+        .values_list('unread', 'pending_acknowledgments')
+        .first()
+    )
+    return row or (0, 0)
+
+
+def recount(user_ids=None):
+    """Rebuild counters from the inbox items (repair after manual data changes)"""
+    items = AnnouncementInboxItem.objects.all()
+    rows = AnnouncementInboxCounter.objects.select_for_update()
+    if user_ids is not None:
+        items = items.filter(user_id__in=list(user_ids))
+        rows = rows.filter(user_id__in=list(user_ids))
+    totals = {
+        row['user_id']: row
+        for row in (
+            items.values('user_id')
+            .annotate(
+                unread=Count('pk', filter=Q(is_read=False)),
+                pending=Count('pk', filter=Q(requires_acknowledgment=True, acknowledged_at__isnull=True)),
+            )
+            .order_by()
+        )
+    }
+    with transaction.atomic():
+        AnnouncementInboxCounter.objects.bulk_create(
+            [AnnouncementInboxCounter(user_id=user_id) for user_id in totals],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+        rows = list(rows)
+        for row in rows:
+            total = totals.get(row.user_id)
+            row.unread = total['unread'] if total else 0
+            row.pending_acknowledgments = total['pending'] if total else 0
+        AnnouncementInboxCounter.objects.bulk_update(rows, ['unread', 'pending_acknowledgments'], batch_size=1000)
+    return len(rows)
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from announcements import delivery
+
+
+class Command(BaseCommand):
+    help = 'Send pending announcement delivery batches (run once from cron, or with --loop as a worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Maximum batches to claim per pass')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling every --interval seconds')
+        parser.add_argument('--interval', type=int, default=30, help='Seconds between passes when looping')
+
+    def handle(self, *args, **options):
+        while True:
+            batches, delivered, failed = delivery.run(limit=options['limit'])
+            if batches or options['verbosity'] > 1:
+                self.stdout.write(f'{batches} batches: {delivered} delivered, {failed} failed')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from announcements import timeseries
+
+
+class Command(BaseCommand):
+    help = 'Fold daily announcement stat buckets older than --keep-days into weekly buckets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=timeseries.KEEP_DAILY_DAYS,
+                            help='Daily buckets newer than this many days are kept as they are')
+
+    def handle(self, *args, **options):
+        removed = timeseries.downsample(keep_days=options['keep_days'])
+        self.stdout.write(f'{removed} daily buckets folded into weekly buckets')
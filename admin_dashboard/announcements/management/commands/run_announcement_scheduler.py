@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from announcements.scheduler import tick
+
+
+class Command(BaseCommand):
+    help = 'Publish scheduled and expire outdated announcements (run once from cron, or with --loop as a worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, ticking every --interval seconds')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between ticks when looping')
+
+    def handle(self, *args, **options):
+        while True:
+            published, expired = tick()
+            if published or expired or options['verbosity'] > 1:
+                self.stdout.write(f'{published} published, {expired} expired')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from announcements import inbox
+from announcements.models import Announcement, AnnouncementInboxItem
+
+
+class Command(BaseCommand):
+    help = 'Deliver published announcements to any missing inboxes, drop unpublished ones and rebuild the counters'
+
+    def handle(self, *args, **options):
+        published = Announcement.objects.filter(status='published').values_list('pk', flat=True)
+        added = inbox.fan_out(published)
+        stale = (
+            AnnouncementInboxItem.objects
+            .exclude(announcement__status='published')
+            .values_list('announcement_id', flat=True)
+            .distinct()
+        )
+        removed = inbox.withdraw(set(stale))
+        counters = inbox.recount()
+        self.stdout.write(f'{added} inbox items added, {removed} removed, {counters} counters rebuilt')
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcementanalytics',
+            name='viewer_sketch',
+            field=models.BinaryField(blank=True, default=b'', help_text='HyperLogLog sketch of all viewers'),
+        ),
+        migrations.CreateModel(
+            name='AnnouncementViewerSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sketch', models.BinaryField(default=b'')),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewer_sketches', to='announcements.announcement')),
+            ],
+            options={
+                'verbose_name': 'Announcement Viewer Sketch',
+                'verbose_name_plural': 'Announcement Viewer Sketches',
+                'ordering': ['announcement', 'day'],
+                'unique_together': {('announcement', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0003_status_expiry_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementDeliveryBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS'), ('push', 'Push Notification'), ('dashboard', 'Dashboard Display')], max_length=20)),
+                ('recipient_ids', models.JSONField(default=list, help_text='User ids in this batch')),
+                ('size', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('distribution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='announcements.announcementdistribution')),
+            ],
+            options={
+                'verbose_name': 'Announcement Delivery Batch',
+                'verbose_name_plural': 'Announcement Delivery Batches',
+                'ordering': ['distribution', 'channel', 'pk'],
+                'indexes': [models.Index(fields=['status', 'channel'], name='announcemen_status_39a11a_idx')],
+            },
+        ),
+    ]
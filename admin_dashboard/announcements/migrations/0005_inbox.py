@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0004_delivery_batches'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementInboxCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='announcement_inbox_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+                ('pending_acknowledgments', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Announcement Inbox Counter',
+                'verbose_name_plural': 'Announcement Inbox Counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='AnnouncementInboxItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_at', models.DateTimeField(help_text='Copied from the announcement for inbox ordering')),
+                ('delivered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_read', models.BooleanField(default=False)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('requires_acknowledgment', models.BooleanField(default=False)),
+                ('acknowledged_at', models.DateTimeField(blank=True, null=True)),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to='announcements.announcement')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='announcement_inbox', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Announcement Inbox Item',
+                'verbose_name_plural': 'Announcement Inbox Items',
+                'ordering': ['user', '-published_at', '-pk'],
+                'indexes': [models.Index(fields=['user', '-published_at', '-id'], name='announcemen_user_id_43f483_idx'), models.Index(fields=['user', 'is_read'], name='announcemen_user_id_0fbf9e_idx')],
+                'unique_together': {('user', 'announcement')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0005_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcementtemplate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='announcementdistribution',
+            name='template',
+            field=models.ForeignKey(blank=True, help_text='Personalize each message with this template instead of the announcement text', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='distributions', to='announcements.announcementtemplate'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def split_existing_tags(apps, schema_editor):
+    Announcement = apps.get_model('announcements', 'Announcement')
+    AnnouncementTag = apps.get_model('announcements', 'AnnouncementTag')
+    AnnouncementTagging = apps.get_model('announcements', 'AnnouncementTagging')
+
+    per_announcement = {}
+    names = {}
+    for pk, value in Announcement.objects.exclude(tags='').values_list('pk', 'tags').iterator():
+        slugs = []
+        for part in value.split(','):
+            name = ' '.join(part.split())[:100]
+            slug = slugify(name, allow_unicode=True)[:100]
+            if slug and slug not in slugs:
+                slugs.append(slug)
+                names.setdefault(slug, name)
+        per_announcement[pk] = slugs
+
+    AnnouncementTag.objects.bulk_create(
+        [AnnouncementTag(slug=slug, name=name) for slug, name in names.items()],
+        ignore_conflicts=True,
+    )
+    tag_ids = dict(AnnouncementTag.objects.values_list('slug', 'pk'))
+    AnnouncementTagging.objects.bulk_create(
+        [
+            AnnouncementTagging(announcement_id=pk, tag_id=tag_ids[slug])
+            for pk, slugs in per_announcement.items()
+            for slug in slugs
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0006_template_rendering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(allow_unicode=True, max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Announcement Tag',
+                'verbose_name_plural': 'Announcement Tags',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AnnouncementTagging',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taggings', to='announcements.announcement')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taggings', to='announcements.announcementtag')),
+            ],
+            options={
+                'verbose_name': 'Announcement Tagging',
+                'verbose_name_plural': 'Announcement Taggings',
+            },
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, help_text='Normalized index of the comma-separated tags, kept in sync on save', related_name='announcements', through='announcements.AnnouncementTagging', to='announcements.announcementtag'),
+        ),
+        migrations.AddIndex(
+            model_name='announcementtagging',
+            index=models.Index(fields=['tag', 'announcement'], name='announcemen_tag_id_f3c55b_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='announcementtagging',
+            unique_together={('announcement', 'tag')},
+        ),
+        migrations.RunPython(split_existing_tags, migrations.RunPython.noop),
+    ]
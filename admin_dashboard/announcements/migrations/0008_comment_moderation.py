@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_comment_counts(apps, schema_editor):
+    Announcement = apps.get_model('announcements', 'Announcement')
+    AnnouncementAnalytics = apps.get_model('announcements', 'AnnouncementAnalytics')
+
+    totals = {
+        row['pk']: row
+        for row in (
+            Announcement.objects
+            .annotate(total=Count('comments'), approved=Count('comments', filter=Q(comments__is_approved=True)))
+            .filter(total__gt=0)
+            .values('pk', 'total', 'approved')
+        )
+    }
+    AnnouncementAnalytics.objects.bulk_create(
+        [AnnouncementAnalytics(announcement_id=pk) for pk in totals],
+        ignore_conflicts=True,
+    )
+    rows = list(AnnouncementAnalytics.objects.filter(announcement_id__in=list(totals)))
+    for row in rows:
+        row.total_comments = totals[row.announcement_id]['total']
+        row.approved_comments = totals[row.announcement_id]['approved']
+    AnnouncementAnalytics.objects.bulk_update(rows, ['total_comments', 'approved_comments'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0007_tag_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcementcomment',
+            index=models.Index(fields=['is_approved', 'created_at'], name='announcemen_is_appr_dc2257_idx'),
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0008_comment_moderation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='The day, or the Monday of the week for weekly buckets')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], default='day', max_length=4)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('downloads', models.PositiveIntegerField(default=0)),
+                ('acknowledgments', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='announcements.announcement')),
+            ],
+            options={
+                'verbose_name': 'Announcement Daily Stat',
+                'verbose_name_plural': 'Announcement Daily Stats',
+                'ordering': ['announcement', 'day'],
+                'unique_together': {('announcement', 'day', 'period')},
+            },
+        ),
+    ]
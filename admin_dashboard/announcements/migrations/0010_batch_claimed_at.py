@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0009_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcementdeliverybatch',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker last took the batch', null=True),
+        ),
+    ]
@@ -90,6 +90,13 @@ class Announcement(models.Model):
     
     # Metadata
     tags = models.CharField(max_length=500, blank=True, help_text='Comma-separated tags')
+    tag_set = models.ManyToManyField(
+        'AnnouncementTag',
+        through='AnnouncementTagging',
+        blank=True,
+        related_name='announcements',
+        help_text='Normalized index of the comma-separated tags, kept in sync on save'
+    )
     keywords = models.TextField(blank=True, help_text='SEO keywords')
     
     class Meta:
@@ -98,6 +105,7 @@ class Announcement(models.Model):
         ordering = ['-published_at', '-created_at']
         indexes = [
             models.Index(fields=['status', '-published_at']),
+            models.Index(fields=['status', 'expiry_at']),
             models.Index(fields=['category']),
             models.Index(fields=['is_featured']),
             models.Index(fields=['priority']),
@@ -107,11 +115,24 @@ class Announcement(models.Model):
         if not self.slug:
             from django.utils.text import slugify
             self.slug = slugify(self.title)
+        self.sync_status()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
+    def sync_status(self, now=None):
+        """Align scheduled/published/expired with the publishing dates (the scheduler does this in bulk)"""
+        now = now or timezone.now()
+        if self.status == 'published' and not self.published_at:
+            self.published_at = now
+        if self.status == 'published' and self.published_at > now:
+            self.status = 'scheduled'
+        elif self.status == 'scheduled' and self.published_at and self.published_at <= now:
+            self.status = 'published'
+        if self.status == 'published' and self.expiry_at and self.expiry_at <= now:
+            self.status = 'expired'
+
     def is_published(self):
         """Check if announcement is currently published"""
         now = timezone.now()
@@ -124,6 +145,37 @@ class Announcement(models.Model):
         return True
 
 
+class AnnouncementTag(models.Model):
+    """Normalized announcement tag"""
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True, allow_unicode=True)
+
+    class Meta:
+        verbose_name = 'Announcement Tag'
+        verbose_name_plural = 'Announcement Tags'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class AnnouncementTagging(models.Model):
+    """Link between an announcement and one of its tags"""
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='taggings')
+    tag = models.ForeignKey(AnnouncementTag, on_delete=models.CASCADE, related_name='taggings')
+
+    class Meta:
+        verbose_name = 'Announcement Tagging'
+        verbose_name_plural = 'Announcement Taggings'
+        unique_together = ['announcement', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'announcement']),
+        ]
+
+    def __str__(self):
+        return f"{self.announcement.title} - {self.tag.name}"
+
+
 class AnnouncementAcknowledgment(models.Model):
     """Track user acknowledgments of announcements"""
     announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='acknowledgments')
@@ -158,6 +210,9 @@ class AnnouncementComment(models.Model):
         verbose_name = 'Announcement Comment'
         verbose_name_plural = 'Announcement Comments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_approved', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Comment by {self.commenter.get_full_name()} on {self.announcement.title}"
@@ -217,6 +272,15 @@ class AnnouncementDistribution(models.Model):
     recipient_group = models.CharField(max_length=100, help_text='Target group/department')
     recipient_count = models.IntegerField(default=0)
     
+    template = models.ForeignKey(
+        'AnnouncementTemplate',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='distributions',
+        help_text='Personalize each message with this template instead of the announcement text'
+    )
+    
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     
     scheduled_for = models.DateTimeField(null=True, blank=True)
@@ -237,6 +301,47 @@ class AnnouncementDistribution(models.Model):
         return f"{self.announcement.title} - {self.get_distribution_method_display()}"
 
 
+class AnnouncementDeliveryBatch(models.Model):
+    """A chunk of resolved recipients for one channel of a distribution"""
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+        ('push', 'Push Notification'),
+        ('dashboard', 'Dashboard Display'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    distribution = models.ForeignKey(AnnouncementDistribution, on_delete=models.CASCADE, related_name='batches')
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES)
+    
+    recipient_ids = models.JSONField(default=list, help_text='User ids in this batch')
+    size = models.IntegerField(default=0)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text='When a worker last took the batch')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Announcement Delivery Batch'
+        verbose_name_plural = 'Announcement Delivery Batches'
+        ordering = ['distribution', 'channel', 'pk']
+        indexes = [
+            models.Index(fields=['status', 'channel']),
+        ]
+
+    def __str__(self):
+        return f"{self.distribution} - {self.get_channel_display()} ({self.size})"
+
+
 class AnnouncementTemplate(models.Model):
     """Reusable announcement templates"""
     name = models.CharField(max_length=255, unique=True)
@@ -247,6 +352,7 @@ class AnnouncementTemplate(models.Model):
     
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='announcement_templates_created')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     is_active = models.BooleanField(default=True)
 
@@ -276,6 +382,8 @@ class AnnouncementAnalytics(models.Model):
     
     average_time_spent_seconds = models.IntegerField(default=0)
     
+    viewer_sketch = models.BinaryField(blank=True, default=b'', editable=False, help_text='HyperLogLog sketch of all viewers')
+    
     last_updated = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -284,3 +392,98 @@ class AnnouncementAnalytics(models.Model):
 
     def __str__(self):
         return f"Analytics - {self.announcement.title}"
+
+
+class AnnouncementViewerSketch(models.Model):
+    """Daily HyperLogLog sketch of distinct viewers of an announcement"""
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='viewer_sketches')
+    day = models.DateField()
+    sketch = models.BinaryField(default=b'')
+
+    class Meta:
+        verbose_name = 'Announcement Viewer Sketch'
+        verbose_name_plural = 'Announcement Viewer Sketches'
+        ordering = ['announcement', 'day']
+        unique_together = ['announcement', 'day']
+
+    def __str__(self):
+        return f"{self.announcement.title} - {self.day}"
+
+    def estimate(self):
+        from .hll import HyperLogLog
+        return HyperLogLog.from_bytes(self.sketch).count()
+
+
+class AnnouncementDailyStat(models.Model):
+    """Engagement counts for one announcement over one day (or one week once downsampled)"""
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+    ]
+
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField(help_text='The day, or the Monday of the week for weekly buckets')
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES, default='day')
+    
+    views = models.PositiveIntegerField(default=0)
+    downloads = models.PositiveIntegerField(default=0)
+    acknowledgments = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Announcement Daily Stat'
+        verbose_name_plural = 'Announcement Daily Stats'
+        ordering = ['announcement', 'day']
+        unique_together = ['announcement', 'day', 'period']
+
+    def __str__(self):
+        return f"{self.announcement.title} - {self.day} ({self.period})"
+
+
+class AnnouncementInboxItem(models.Model):
+    """A published announcement delivered to one user's inbox, with its read/acknowledged state"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='announcement_inbox')
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='inbox_items')
+    
+    published_at = models.DateTimeField(help_text='Copied from the announcement for inbox ordering')
+    delivered_at = models.DateTimeField(default=timezone.now)
+    
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    
+    requires_acknowledgment = models.BooleanField(default=False)
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Announcement Inbox Item'
+        verbose_name_plural = 'Announcement Inbox Items'
+        ordering = ['user', '-published_at', '-pk']
+        unique_together = ['user', 'announcement']
+        indexes = [
+            models.Index(fields=['user', '-published_at', '-id']),
+            models.Index(fields=['user', 'is_read']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.announcement.title}"
+
+    @property
+    def pending_acknowledgment(self):
+        return self.requires_acknowledgment and self.acknowledged_at is None
+
+
+class AnnouncementInboxCounter(models.Model):
+    """Denormalized per-user inbox totals, kept in step with the inbox items"""
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='announcement_inbox_counter'
+    )
+    unread = models.IntegerField(default=0)
+    pending_acknowledgments = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Announcement Inbox Counter'
+        verbose_name_plural = 'Announcement Inbox Counters'
+
+    def __str__(self):
+        return f"{self.user.username}: {self.unread} unread, {self.pending_acknowledgments} to acknowledge"
@@ -0,0 +1,31 @@
+from django.utils import timezone
+
+from . import inbox
+from .models import Announcement
+
+
+def tick(now=None):
+    """
+    Advance announcement lifecycles with two indexed range updates.
+
+    Scheduled announcements whose ``published_at`` has passed become
+    published, then published ones past ``expiry_at`` become expired. The
+    affected ids are read first so inboxes can be updated for exactly those
+    rows. Returns ``(published, expired)`` row counts.
+    """
+    now = now or timezone.now()
+    due = list(Announcement.objects.filter(
+        status='scheduled', published_at__lte=now,
+    ).values_list('pk', flat=True))
+    published = Announcement.objects.filter(pk__in=due, status='scheduled').update(
+        status='published', updated_at=now,
+    )
+    stale = list(Announcement.objects.filter(
+        status='published', expiry_at__lte=now,
+    ).values_list('pk', flat=True))
+    expired = Announcement.objects.filter(pk__in=stale, status='published').update(
+        status='expired', updated_at=now,
+    )
+    inbox.fan_out(set(due) - set(stale))
+    inbox.withdraw(stale)
+    return published, expired
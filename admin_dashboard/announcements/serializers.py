@@ -0,0 +1,59 @@
+from django.urls import reverse
+from rest_framework import serializers
+from .models import Announcement, AnnouncementAttachment, AnnouncementComment, AnnouncementInboxItem
+
+
+class AnnouncementAttachmentSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AnnouncementAttachment
+        fields = ['id', 'filename', 'file_type', 'uploaded_at', 'download_url']
+
+    def get_download_url(self, obj):
+        url = reverse('download', kwargs={'kind': 'attachment', 'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class AnnouncementListSerializer(serializers.ModelSerializer):
+    category = serializers.ReadOnlyField(source='category.name')
+
+    class Meta:
+        model = Announcement
+        fields = [
+            'id', 'title', 'slug', 'summary', 'category', 'priority',
+            'is_featured', 'is_sticky', 'published_at', 'expiry_at'
+        ]
+
+
+class AnnouncementSerializer(AnnouncementListSerializer):
+    attachments = AnnouncementAttachmentSerializer(many=True, read_only=True)
+
+    class Meta(AnnouncementListSerializer.Meta):
+        fields = AnnouncementListSerializer.Meta.fields + [
+            'content', 'featured_image', 'tags', 'view_count',
+            'allow_comments', 'require_acknowledgment', 'attachments'
+        ]
+
+
+class InboxItemSerializer(serializers.ModelSerializer):
+    announcement = AnnouncementListSerializer(read_only=True)
+    pending_acknowledgment = serializers.ReadOnlyField()
+
+    class Meta:
+        model = AnnouncementInboxItem
+        fields = [
+            'id', 'announcement', 'published_at', 'is_read', 'read_at',
+            'requires_acknowledgment', 'acknowledged_at', 'pending_acknowledgment'
+        ]
+
+
+class ModerationCommentSerializer(serializers.ModelSerializer):
+    announcement = serializers.ReadOnlyField(source='announcement.slug')
+    announcement_title = serializers.ReadOnlyField(source='announcement.title')
+    commenter = serializers.ReadOnlyField(source='commenter.username')
+
+    class Meta:
+        model = AnnouncementComment
+        fields = ['id', 'announcement', 'announcement_title', 'commenter', 'content', 'created_at']
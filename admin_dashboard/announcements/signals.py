@@ -0,0 +1,112 @@
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from academics.models import Faculty
+from . import acknowledgments, audience, comments, counters, inbox, tags
+from .models import Announcement, AnnouncementAcknowledgment, AnnouncementComment, AnnouncementDistribution
+
+
+@receiver([post_save, post_delete], sender=Group)
+@receiver([post_save, post_delete], sender=Faculty)
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_audiences(sender, **kwargs):
+    audience.invalidate()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_audiences_for_user(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login and do not change anyone's audience
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    audience.invalidate()
+
+
+@receiver(post_save, sender=Announcement)
+def sync_tag_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'tags' in update_fields:
+        tags.sync_tags(instance)
+
+
+@receiver(pre_save, sender=Announcement)
+def remember_inbox_state(sender, instance, **kwargs):
+    instance._stored_inbox_state = Announcement.objects.filter(pk=instance.pk).values_list(
+        'status', 'target_audience', 'require_acknowledgment',
+    ).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Announcement)
+def sync_inbox(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_inbox_state', None)
+    was_published = stored is not None and stored[0] == 'published'
+    if instance.status == 'published':
+        # Resolving the audience is the expensive part; only redo it when the recipients may differ
+        if not was_published or stored[1:] != (instance.target_audience, instance.require_acknowledgment):
+            transaction.on_commit(lambda: inbox.fan_out([instance.pk]))
+    elif was_published:
+        inbox.withdraw([instance.pk])
+
+
+@receiver(pre_delete, sender=Announcement)
+def withdraw_deleted(sender, instance, **kwargs):
+    # The cascade removes the inbox items but would leave the users' counters behind
+    inbox.withdraw([instance.pk])
+
+
+@receiver(post_save, sender=AnnouncementDistribution)
+def fan_out_distribution(sender, instance, **kwargs):
+    # 'specific' announcements are addressed to their distributions' groups
+    announcement = instance.announcement
+    if announcement.status == 'published' and announcement.target_audience == 'specific':
+        transaction.on_commit(lambda: inbox.fan_out([announcement.pk]))
+
+
+@receiver(post_save, sender=AnnouncementAcknowledgment)
+def acknowledge_in_inbox(sender, instance, created, **kwargs):
+    if created:
+        inbox.acknowledge(instance.user_id, [instance.announcement_id], instance.acknowledged_at)
+        acknowledgments.adjust_acknowledged({instance.announcement_id: 1})
+        counters.record_daily(instance.announcement_id, 'acknowledgments')
+
+
+@receiver(post_delete, sender=AnnouncementAcknowledgment)
+def reopen_in_inbox(sender, instance, origin=None, **kwargs):
+    # The announcement's own deletion removes its inbox items and analytics with it
+    if isinstance(origin, Announcement) or getattr(origin, 'model', None) is Announcement:
+        return
+    inbox.unacknowledge(instance.user_id, [instance.announcement_id])
+    acknowledgments.adjust_acknowledged({instance.announcement_id: -1}, create=False)
+
+
+@receiver([pre_save, pre_delete], sender=AnnouncementComment)
+def remember_approval(sender, instance, **kwargs):
+    # Read the stored state: the instance may be stale after a bulk approval
+    instance._was_approved = AnnouncementComment.objects.filter(
+        pk=instance.pk,
+    ).values_list('is_approved', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=AnnouncementComment)
+def count_comment(sender, instance, created, **kwargs):
+    announcement_id = instance.announcement_id
+    if created:
+        comments.adjust_comment_counts(
+            total={announcement_id: 1},
+            approved={announcement_id: int(instance.is_approved)},
+        )
+        counters.record_daily(announcement_id, 'comments')
+    elif instance._was_approved is not None and instance.is_approved != instance._was_approved:
+        comments.adjust_comment_counts(approved={announcement_id: 1 if instance.is_approved else -1})
+
+
+@receiver(post_delete, sender=AnnouncementComment)
+def uncount_comment(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Announcement) or getattr(origin, 'model', None) is Announcement:
+        return
+    announcement_id = instance.announcement_id
+    comments.adjust_comment_counts(
+        total={announcement_id: -1},
+        approved={announcement_id: -int(bool(instance._was_approved))},
+        create=False,
+    )
@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.db.models import Count
+from django.utils.text import slugify
+
+from .models import AnnouncementTag, AnnouncementTagging
+
+
+def parse_tags(value):
+    """
+    Split a comma-separated tag string into ``{slug: name}``.
+
+    Whitespace is collapsed and duplicates that differ only in case or
+    punctuation are dropped, keeping the first spelling.
+    """
+    tags = {}
+    for part in (value or '').split(','):
+        name = ' '.join(part.split())[:100]
+        slug = slugify(name, allow_unicode=True)[:100]
+        if slug and slug not in tags:
+            tags[slug] = name
+    return tags
+
+
+def get_or_create_tags(tags):
+    """Tag rows for a ``{slug: name}`` mapping, creating missing ones in one insert"""
+    if not tags:
+        return {}
+    AnnouncementTag.objects.bulk_create(
+        [AnnouncementTag(slug=slug, name=name) for slug, name in tags.items()],
+        ignore_conflicts=True,
+    )
+    return AnnouncementTag.objects.in_bulk(list(tags), field_name='slug')
+
+
+def sync_tags(announcement):
+    """Make the announcement's tag links match its ``tags`` text"""
+    tags = get_or_create_tags(parse_tags(announcement.tags))
+    wanted = {tag.pk for tag in tags.values()}
+    with transaction.atomic():
+        current = set(announcement.taggings.values_list('tag_id', flat=True))
+        if current - wanted:
+            announcement.taggings.filter(tag_id__in=current - wanted).delete()
+        AnnouncementTagging.objects.bulk_create(
+            [AnnouncementTagging(announcement=announcement, tag_id=pk) for pk in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def tag_cloud(announcements=None, limit=None):
+    """Tags with the number of matching announcements, most used first, from one grouped query"""
+    taggings = AnnouncementTagging.objects.all()
+    if announcements is not None:
+        taggings = taggings.filter(announcement__in=announcements)
+    rows = (
+        taggings
+        .values('tag__name', 'tag__slug')
+        .annotate(count=Count('announcement_id'))
+        .order_by('-count', 'tag__name')
+    )
+    if limit:
+        rows = rows[:limit]
+    return [{'name': row['tag__name'], 'slug': row['tag__slug'], 'count': row['count']} for row in rows]
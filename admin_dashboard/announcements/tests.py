@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import Group, User
+from django.core import mail
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import delivery
+from .distribution import plan_distribution
+from .models import Announcement, AnnouncementCategory, AnnouncementDeliveryBatch, AnnouncementDistribution
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    ANNOUNCEMENT_DELIVERY_BACKOFF=0,
+    ANNOUNCEMENT_DELIVERY_FLUSH_SECONDS=0.05,
+)
+class DeliveryTests(TransactionTestCase):
+    """Delivery runs against Django's in-memory email backend (a local SMTP stand-in)"""
+
+    def setUp(self):
+        students = Group.objects.create(name='Students')
+        for index in range(25):
+            user = User.objects.create(username=f'student{index}', email=f'student{index}@example.org')
+            user.groups.add(students)
+        self.nomail = User.objects.create(username='nomail')
+        self.nomail.groups.add(students)
+        category = AnnouncementCategory.objects.create(name='General', slug='general')
+        self.announcement = Announcement.objects.create(
+            title='Exams', slug='exams', content='Timetable is out', category=category, status='published',
+        )
+        self.distribution = AnnouncementDistribution.objects.create(
+            announcement=self.announcement, distribution_method='email', recipient_group='students',
+        )
+        plan_distribution(self.distribution, batch_size=10)
+
+    def test_delivers_each_recipient_once(self):
+        batches, delivered, failed = delivery.run()
+
+        self.assertEqual((batches, delivered, failed), (3, 25, 1))
+        self.assertEqual(
+            sorted(address for message in mail.outbox for address in message.to),
+            sorted(f'student{index}@example.org' for index in range(25)),
+        )
+        self.assertEqual(mail.outbox[0].subject, 'Exams')
+        self.distribution.refresh_from_db()
+        self.assertEqual((self.distribution.success_count, self.distribution.failure_count), (25, 1))
+        self.assertEqual(self.distribution.status, 'sent')
+        self.assertFalse(self.distribution.batches.exclude(status='sent').exists())
+
+    def test_transient_failures_are_retried(self):
+        class FlakySender(delivery.Sender):
+            def __init__(self):
+                self.failed = set()
+                self.sent = []
+
+            def send(self, user, message):
+                if user.pk not in self.failed:
+                    self.failed.add(user.pk)
+                    raise ConnectionError('temporary')
+                self.sent.append(user.pk)
+
+        sender = FlakySender()
+        batches, delivered, failed = delivery.run(senders={'email': sender})
+
+        self.assertEqual((delivered, failed), (26, 0))
+        self.assertEqual(len(sender.sent), 26)
+
+    def test_batches_of_a_crashed_worker_are_requeued(self):
+        delivery.claim_batches()
+        stale = timezone.now() - timedelta(hours=1)
+        AnnouncementDeliveryBatch.objects.update(claimed_at=stale)
+
+        batches, delivered, failed = delivery.run()
+
+        self.assertEqual((batches, delivered), (3, 25))
+        self.assertEqual(len(mail.outbox), 25)
+
+    def test_recently_claimed_batches_are_left_alone(self):
+        delivery.claim_batches()
+
+        self.assertEqual(delivery.run(), (0, 0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(ANNOUNCEMENT_DELIVERY_MAX_CLAIMS=1)
+    def test_batches_claimed_too_often_fail(self):
+        delivery.claim_batches()
+        AnnouncementDeliveryBatch.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(delivery.requeue_stale_batches(), (0, 3))
+        self.distribution.refresh_from_db()
+        self.assertEqual(self.distribution.status, 'failed')
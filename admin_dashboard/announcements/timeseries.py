@@ -0,0 +1,131 @@
+"""
+Per-day engagement buckets for announcements.
+
+Events are aggregated in memory by ``counters`` and written here on flush:
+one insert for missing buckets and one ``CASE`` update per metric. Buckets
+are keyed by ``(announcement, day, period)``, so a chart for one
+announcement is a single range scan of the unique index.
+
+Daily buckets older than ``KEEP_DAILY_DAYS`` are folded into weekly ones
+(keyed by the Monday of the week) to keep the table compact.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from .models import Announcement, AnnouncementAttachment, AnnouncementDailyStat
+
+METRICS = ('views', 'downloads', 'acknowledgments', 'comments')
+KEEP_DAILY_DAYS = 90
+
+
+def apply_daily_counts(counts):
+    """
+    Add ``{(announcement_id, day, metric): amount}`` to the daily buckets.
+
+    ``downloads`` entries may be keyed by ``('attachment', attachment_id)``
+    instead of an announcement id; they are mapped with one query.
+    """
+    if not counts:
+        return
+    attachment_ids = {aid[1] for aid, _, _ in counts if isinstance(aid, tuple)}
+    owners = dict(
+        AnnouncementAttachment.objects.filter(pk__in=attachment_ids).values_list('pk', 'announcement_id')
+    ) if attachment_ids else {}
+
+    per_metric = defaultdict(lambda: defaultdict(int))
+    for (announcement_id, day, metric), amount in counts.items():
+        if isinstance(announcement_id, tuple):
+            announcement_id = owners.get(announcement_id[1])
+            if announcement_id is None:
+                continue
+        per_metric[metric][(announcement_id, day)] += amount
+    # Buckets of announcements deleted since the event was buffered are dropped
+    existing = set(
+        Announcement.objects
+        .filter(pk__in={aid for amounts in per_metric.values() for aid, _ in amounts})
+        .values_list('pk', flat=True)
+    )
+    per_metric = {
+        metric: {key: amount for key, amount in amounts.items() if key[0] in existing}
+        for metric, amounts in per_metric.items()
+    }
+    keys = {key for amounts in per_metric.values() for key in amounts}
+    if not keys:
+        return
+
+    AnnouncementDailyStat.objects.bulk_create(
+        [AnnouncementDailyStat(announcement_id=aid, day=day) for aid, day in keys],
+        ignore_conflicts=True,
+    )
+    for metric, amounts in per_metric.items():
+        if not amounts:
+            continue
+        match = Q(pk__in=[])
+        for aid, day in amounts:
+            match |= Q(announcement_id=aid, day=day)
+        AnnouncementDailyStat.objects.filter(match, period='day').update(**{
+            metric: F(metric) + Case(
+                *[When(announcement_id=aid, day=day, then=Value(amount)) for (aid, day), amount in amounts.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        })
+
+
+def series(announcement_id, since=None, until=None):
+    """Buckets for one announcement between two dates, oldest first (weekly rows mark downsampled history)"""
+    rows = AnnouncementDailyStat.objects.filter(announcement_id=announcement_id)
+    if since:
+        rows = rows.filter(day__gte=since)
+    if until:
+        rows = rows.filter(day__lte=until)
+    return list(rows.order_by('day').values('day', 'period', *METRICS))
+
+
+def downsample(today=None, keep_days=KEEP_DAILY_DAYS):
+    """
+    Fold daily buckets older than ``keep_days`` into weekly buckets.
+
+    Weeks that straddle the cutoff are folded in across runs: each run adds
+    its days to the existing weekly row. Returns the number of daily rows removed.
+    """
+    today = today or timezone.localdate()
+    cutoff = today - timedelta(days=keep_days)
+    old = AnnouncementDailyStat.objects.filter(period='day', day__lt=cutoff)
+
+    with transaction.atomic():
+        # Lock first: FOR UPDATE cannot be combined with the GROUP BY below on PostgreSQL
+        if not list(old.select_for_update().values_list('pk', flat=True)):
+            return 0
+        weekly = {
+            (row['announcement_id'], row['week']): row
+            for row in (
+                old
+                .annotate(week=TruncWeek('day'))
+                .values('announcement_id', 'week')
+                .annotate(**{f'sum_{metric}': Sum(metric) for metric in METRICS})
+                .order_by()
+            )
+        }
+        if not weekly:
+            return 0
+        AnnouncementDailyStat.objects.bulk_create(
+            [AnnouncementDailyStat(announcement_id=aid, day=week, period='week') for aid, week in weekly],
+            ignore_conflicts=True,
+        )
+        match = Q(pk__in=[])
+        for aid, week in weekly:
+            match |= Q(announcement_id=aid, day=week)
+        targets = list(AnnouncementDailyStat.objects.select_for_update().filter(match, period='week'))
+        for target in targets:
+            totals = weekly[(target.announcement_id, target.day)]
+            for metric in METRICS:
+                setattr(target, metric, getattr(target, metric) + (totals[f'sum_{metric}'] or 0))
+        AnnouncementDailyStat.objects.bulk_update(targets, list(METRICS), batch_size=500)
+        removed, _ = old.delete()
+    return removed
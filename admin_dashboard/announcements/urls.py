@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import AnnouncementViewSet, InboxViewSet, ModerationViewSet
+
+router = DefaultRouter()
+router.register(r'inbox', InboxViewSet, basename='announcement-inbox')
+router.register(r'moderation', ModerationViewSet, basename='announcement-moderation')
+router.register(r'', AnnouncementViewSet, basename='announcement')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,230 @@
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from . import acknowledgments, comments, counters, inbox, tags, timeseries
+from .hll import merge_all
+from .models import Announcement, AnnouncementComment, AnnouncementInboxItem, AnnouncementViewerSketch
+from .serializers import (
+    AnnouncementListSerializer, AnnouncementSerializer, InboxItemSerializer, ModerationCommentSerializer,
+)
+
+
+def window_days(request, maximum):
+    """``?days=`` clamped to ``1..maximum`` (default 30); raises ``ValueError`` unless it is a whole number"""
+    return max(1, min(int(request.query_params.get('days', 30)), maximum))
+
+
+class AnnouncementViewSet(viewsets.ReadOnlyModelViewSet):
+    """Public listing and detail of live announcements"""
+    lookup_field = 'slug'
+
+    def get_queryset(self):
+        # Lifecycle dates are applied by the scheduler, so the status alone decides visibility
+        queryset = (
+            Announcement.objects
+            .filter(status='published')
+            .select_related('category')
+            .order_by('-is_sticky', '-published_at', '-created_at')
+        )
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('attachments')
+        tag = self.request.query_params.get('tag')
+        if tag and self.action == 'list':
+            queryset = queryset.filter(tag_set__slug=tag)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return AnnouncementSerializer
+        return AnnouncementListSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        counters.record_view(instance.pk, viewer=viewer_id(request))
+        return Response(self.get_serializer(instance).data)
+
+    @action(detail=False, methods=['get'], url_path='tags')
+    def tag_cloud(self, request):
+        """Tags of live announcements with usage counts; ``?limit=`` keeps the top N"""
+        limit = request.query_params.get('limit')
+        live = Announcement.objects.filter(status='published')
+        return Response(tags.tag_cloud(live, int(limit) if limit and limit.isdigit() else None))
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def viewers(self, request, slug=None):
+        """Estimated distinct viewers per day plus the union over the requested window"""
+        announcement = self.get_object()
+        try:
+            days = window_days(request, 365)
+        except ValueError:
+            return Response({'detail': 'days must be a whole number between 1 and 365.'}, status=400)
+        since = timezone.localdate() - timedelta(days=days - 1)
+        rows = list(
+            AnnouncementViewerSketch.objects
+            .filter(announcement=announcement, day__gte=since)
+            .order_by('day')
+            .values_list('day', 'sketch')
+        )
+        return Response({
+            'daily': [{'day': day, 'unique_viewers': merge_all([sketch]).count()} for day, sketch in rows],
+            'window_unique_viewers': merge_all(sketch for _, sketch in rows).count(),
+        })
+
+    @action(detail=False, methods=['post'], url_path='acknowledgments', permission_classes=[permissions.IsAdminUser])
+    def ingest_acknowledgments(self, request):
+        """Bulk-ingest ``[{"announcement": id, "user": id}, ...]`` acknowledgments"""
+        try:
+            pairs = [(int(row['announcement']), int(row['user'])) for row in request.data.get('acknowledgments', [])]
+        except (KeyError, TypeError, ValueError):
+            return Response({'detail': 'Expected a list of {"announcement": id, "user": id} objects.'}, status=400)
+        rejected = acknowledgments.unknown_ids(pairs)
+        if rejected['announcements'] or rejected['users']:
+            return Response(
+                {'detail': 'Unknown announcement or user ids; nothing was recorded.', 'rejected': rejected}, status=400,
+            )
+        created = acknowledgments.acknowledge_bulk(pairs, notes=request.data.get('notes', ''))
+        return Response({'received': len(pairs), 'created': created})
+
+    @action(detail=False, methods=['get'], url_path='acknowledgment-rates', permission_classes=[permissions.IsAdminUser])
+    def acknowledgment_rates(self, request):
+        """Acknowledgment rate per department, optionally for ``?announcements=1,2,3``"""
+        ids = request.query_params.get('announcements')
+        ids = [int(pk) for pk in ids.split(',') if pk.strip().isdigit()] if ids else None
+        return Response(acknowledgments.department_rates(ids))
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def stats(self, request, slug=None):
+        """Engagement series for the last ``?days=`` days (default 30); older history comes back weekly"""
+        announcement = self.get_object()
+        try:
+            days = window_days(request, 730)
+        except ValueError:
+            return Response({'detail': 'days must be a whole number between 1 and 730.'}, status=400)
+        since = timezone.localdate() - timedelta(days=days - 1)
+        return Response({
+            'metrics': timeseries.METRICS,
+            'series': timeseries.series(announcement.pk, since=since),
+        })
+
+
+class InboxViewSet(viewsets.GenericViewSet):
+    """The signed-in user's announcement inbox"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = InboxItemSerializer
+    default_limit = 20
+    max_limit = 100
+
+    def get_queryset(self):
+        return (
+            AnnouncementInboxItem.objects
+            .filter(user=self.request.user)
+            .select_related('announcement__category')
+            .order_by('-published_at', '-id')
+        )
+
+    def list(self, request):
+        """One page of the inbox; ``?unread=1`` limits it to unread items, ``before=<id>`` pages back"""
+        queryset = self.get_queryset()
+        if request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(is_read=False)
+        before = request.query_params.get('before')
+        if before and before.isdigit():
+            anchor = queryset.filter(pk=before).values_list('published_at', flat=True).first()
+            if anchor is not None:
+                queryset = queryset.filter(
+                    Q(published_at__lt=anchor) | Q(published_at=anchor, pk__lt=before)
+                )
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        items = list(queryset[:limit])
+        return Response({
+            'results': self.get_serializer(items, many=True).data,
+            'next_before': items[-1].pk if len(items) == limit else None,
+        })
+
+    @action(detail=False, methods=['get'])
+    def count(self, request):
+        unread, pending = inbox.counts(request.user)
+        return Response({'unread': unread, 'pending_acknowledgments': pending})
+
+    @action(detail=False, methods=['post'])
+    def read(self, request):
+        """Mark the posted ``announcements`` ids read, or everything when none are given"""
+        ids = request.data.get('announcements')
+        changed = inbox.mark_read(request.user, ids if ids else None)
+        unread, pending = inbox.counts(request.user)
+        return Response({'marked_read': changed, 'unread': unread, 'pending_acknowledgments': pending})
+
+    @action(detail=False, methods=['post'])
+    def acknowledge(self, request):
+        """Acknowledge the posted ``announcements`` ids for the signed-in user"""
+        try:
+            ids = [int(pk) for pk in request.data.get('announcements', [])]
+        except (TypeError, ValueError):
+            return Response({'detail': 'Expected a list of announcement ids.'}, status=400)
+        created = acknowledgments.acknowledge_bulk(
+            [(pk, request.user.pk) for pk in ids], notes=request.data.get('notes', ''),
+        )
+        unread, pending = inbox.counts(request.user)
+        return Response({'acknowledged': created, 'unread': unread, 'pending_acknowledgments': pending})
+
+
+class ModerationViewSet(viewsets.GenericViewSet):
+    """Queue of comments awaiting approval, oldest first"""
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ModerationCommentSerializer
+    default_limit = 50
+    max_limit = 200
+
+    def list(self, request):
+        """One page of pending comments; pass ``after=<id>`` from ``next_after`` for the next page"""
+        after = request.query_params.get('after')
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        page = comments.moderation_queue(int(after) if after and after.isdigit() else None, limit)
+        return Response({
+            'results': self.get_serializer(page, many=True).data,
+            'next_after': page[-1].pk if len(page) == limit else None,
+        })
+
+    def _selected(self, request):
+        try:
+            ids = [int(pk) for pk in request.data.get('comments', [])]
+        except (TypeError, ValueError):
+            return None
+        return AnnouncementComment.objects.filter(pk__in=ids)
+
+    @action(detail=False, methods=['post'])
+    def approve(self, request):
+        selected = self._selected(request)
+        if selected is None:
+            return Response({'detail': 'Expected a list of comment ids.'}, status=400)
+        return Response({'approved': comments.set_approval(selected, True)})
+
+    @action(detail=False, methods=['post'])
+    def reject(self, request):
+        """Delete the posted pending comments (signals keep the counters in step)"""
+        selected = self._selected(request)
+        if selected is None:
+            return Response({'detail': 'Expected a list of comment ids.'}, status=400)
+        deleted, _ = selected.filter(is_approved=False).delete()
+        return Response({'rejected': deleted})
+
+
+def viewer_id(request):
+    """Stable identifier for unique-viewer counting: user, then session, then client address"""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    session_key = getattr(request, 'session', None) and request.session.session_key
+    if session_key:
+        return f'session:{session_key}'
+    return f"addr:{request.META.get('REMOTE_ADDR', '')}"
@@ -21,15 +21,37 @@ class AssetLocationAdmin(admin.ModelAdmin):
     ordering = ['department', 'name']
 
 
+class MaintenanceSpendFilter(admin.SimpleListFilter):
+    """Repair-versus-replace candidates by maintenance spend vs depreciated value"""
+    title = 'maintenance spend vs value'
+    parameter_name = 'maintenance_spend'
+
+    def lookups(self, request, model_admin):
+        return [
+            ('50', 'Over 50% of value'),
+            ('75', 'Over 75% of value'),
+            ('100', 'Exceeds value'),
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(maintenance_cost_ratio__gte=int(self.value()))
+        return queryset
+
+
 @admin.register(Asset)
 class AssetAdmin(admin.ModelAdmin):
     list_display = [
         'asset_tag', 'name', 'category', 'status_badge',
-        'condition', 'current_location', 'assigned_to', 'purchase_price'
+        'condition', 'current_location', 'assigned_to', 'purchase_price',
+        'lifetime_maintenance_cost', 'maintenance_spend'
     ]
-    list_filter = ['status', 'condition', 'category', 'current_location', 'acquisition_date']
+    list_filter = ['status', 'condition', 'category', MaintenanceSpendFilter, 'current_location', 'acquisition_date']
     search_fields = ['asset_tag', 'name', 'serial_number', 'description']
-    readonly_fields = ['created_at', 'updated_at', 'depreciated_value', 'years_in_service', 'created_by']
+    readonly_fields = [
+        'created_at', 'updated_at', 'depreciated_value', 'years_in_service', 'created_by',
+        'lifetime_maintenance_cost', 'maintenance_cost_ratio'
+    ]
     
     fieldsets = (
         ('Asset Information', {
@@ -45,7 +67,7 @@ class AssetAdmin(admin.ModelAdmin):
             'fields': ('current_location', 'assigned_to')
         }),
         ('Maintenance', {
-            'fields': ('last_maintenance_date', 'maintenance_notes')
+            'fields': ('last_maintenance_date', 'lifetime_maintenance_cost', 'maintenance_cost_ratio', 'maintenance_notes')
         }),
         ('Tracking', {
             'fields': ('created_at', 'updated_at', 'created_by'),
@@ -73,6 +95,15 @@ class AssetAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Status'
 
+    def maintenance_spend(self, obj):
+        ratio = obj.maintenance_cost_ratio
+        if ratio is None:
+            return format_html('<span style="color: #999;">-</span>')
+        color = '#dc3545' if ratio >= 100 else '#fd7e14' if ratio >= 50 else '#28a745'
+        return format_html('<span style="color: {}; font-weight: bold;">{}%</span>', color, ratio)
+    maintenance_spend.short_description = 'Spend vs Value'
+    maintenance_spend.admin_order_field = 'maintenance_cost_ratio'
+
     def save_model(self, request, obj, form, change):
         if not change:
             obj.created_by = request.user
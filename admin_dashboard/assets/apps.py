@@ -5,3 +5,6 @@ class AssetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'assets'
     verbose_name = 'Asset Management & Inventory'
+
+    def ready(self):
+        from . import signals  # noqa: F401
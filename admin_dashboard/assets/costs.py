@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from django.db.models import F, Max, Sum
+
+from maintenance.models import MaintenanceCompletion, MaintenanceHistory
+from .models import Asset, MaintenanceRecord
+
+RATIO_CAP = Decimal('99999.99')
+
+
+def _grouped(queryset, asset_field, cost_field, date_field):
+    return {
+        row['rollup_asset']: row
+        for row in (
+            queryset
+            .values(rollup_asset=F(asset_field))
+            .annotate(cost=Sum(cost_field), last=Max(date_field))
+            .order_by()
+        )
+    }
+
+
+def refresh_asset_costs(asset_ids):
+    """
+    Recompute the denormalized maintenance columns for the given assets.
+
+    Costs come from asset maintenance records, maintenance job completions and
+    maintenance history; history rows that belong to a completed work order
+    are skipped so the same job is not counted twice. Uses one grouped query
+    per source and a single bulk update.
+    """
+    asset_ids = [pk for pk in set(asset_ids) if pk is not None]
+    if not asset_ids:
+        return 0
+
+    sources = [
+        _grouped(
+            MaintenanceRecord.objects.filter(asset_id__in=asset_ids),
+            'asset_id', 'cost', 'completion_date',
+        ),
+        _grouped(
+            MaintenanceCompletion.objects.filter(work_order__maintenance_request__asset_id__in=asset_ids),
+            'work_order__maintenance_request__asset_id', 'total_cost', 'completion_date__date',
+        ),
+        _grouped(
+            MaintenanceHistory.objects.filter(asset_id__in=asset_ids).exclude(
+                work_order__completion_record__isnull=False,
+            ),
+            'asset_id', 'cost', 'maintenance_date',
+        ),
+    ]
+
+    assets = list(Asset.objects.filter(pk__in=asset_ids).only(
+        'pk', 'purchase_price', 'acquisition_date', 'depreciation_rate', 'last_maintenance_date',
+    ))
+    for asset in assets:
+        rows = [source[asset.pk] for source in sources if asset.pk in source]
+        asset.lifetime_maintenance_cost = sum((row['cost'] or Decimal('0') for row in rows), Decimal('0'))
+        dates = [row['last'] for row in rows if row['last']]
+        if dates:
+            asset.last_maintenance_date = max(dates)
+        asset.maintenance_cost_ratio = cost_ratio(asset.lifetime_maintenance_cost, asset.depreciated_value())
+
+    Asset.objects.bulk_update(
+        assets,
+        ['lifetime_maintenance_cost', 'last_maintenance_date', 'maintenance_cost_ratio'],
+        batch_size=500,
+    )
+    return len(assets)
+
+
+def cost_ratio(cost, value):
+    """Maintenance spend as a percentage of value, capped to fit the column"""
+    if not cost:
+        return Decimal('0')
+    if not value or value <= 0:
+        return RATIO_CAP
+    return min(RATIO_CAP, (cost / Decimal(value) * 100).quantize(Decimal('0.01')))
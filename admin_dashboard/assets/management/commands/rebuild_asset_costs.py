@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from assets.costs import refresh_asset_costs
+from assets.models import Asset
+
+
+class Command(BaseCommand):
+    help = 'Recompute lifetime maintenance cost, last maintenance date and cost ratio for all assets (run nightly so ratios follow depreciation)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        asset_ids = list(Asset.objects.order_by('pk').values_list('pk', flat=True))
+        updated = 0
+        for start in range(0, len(asset_ids), batch_size):
+            updated += refresh_asset_costs(asset_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt maintenance costs for {updated} assets'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:52
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='lifetime_maintenance_cost',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), editable=False, help_text='Total spent on maintenance, kept up to date automatically', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='maintenance_cost_ratio',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Lifetime maintenance cost as % of depreciated value', max_digits=7, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['maintenance_cost_ratio'], name='assets_asse_mainten_c21c0e_idx'),
+        ),
+    ]
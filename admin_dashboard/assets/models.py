@@ -79,6 +79,8 @@ class Asset(models.Model):
     # Maintenance & History
     last_maintenance_date = models.DateField(null=True, blank=True)
     maintenance_notes = models.TextField(blank=True)
+    lifetime_maintenance_cost = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'), editable=False, help_text='Total spent on maintenance, kept up to date automatically')
+    maintenance_cost_ratio = models.DecimalField(max_digits=7, decimal_places=2, null=True, blank=True, editable=False, help_text='Lifetime maintenance cost as % of depreciated value')
     serial_number = models.CharField(max_length=100, blank=True)
     
     # Tracking
@@ -95,6 +97,7 @@ class Asset(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['category']),
             models.Index(fields=['current_location']),
+            models.Index(fields=['maintenance_cost_ratio']),
         ]
 
     def __str__(self):
@@ -111,7 +114,7 @@ class Asset(models.Model):
     def depreciated_value(self):
         """Calculate current depreciated value"""
         if self.acquisition_date:
-            years = self.years_in_service()
+            years = Decimal(str(self.years_in_service()))
             depreciated = self.purchase_price * ((100 - self.depreciation_rate) / 100) ** years
             return max(Decimal('0'), depreciated)
         return self.purchase_price
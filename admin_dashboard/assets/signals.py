@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .costs import refresh_asset_costs
+from .models import MaintenanceRecord
+
+
+@receiver([post_save, post_delete], sender=MaintenanceRecord)
+def refresh_costs_for_record(sender, instance, **kwargs):
+    refresh_asset_costs([instance.asset_id])
@@ -1,10 +1,16 @@
-from django.contrib import admin
-from .models import JobPosting, JobApplication
+from django.contrib import admin, messages
+from django.core.exceptions import ObjectDoesNotExist
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import CandidateNotification, JobApplication, JobApplicationHistory, JobPosting, JobPostingStats
+from .resumes import search
+from .stats import STATUSES, pipeline_totals
+from .transitions import record_transition, transition_queryset
 
 
 @admin.register(JobPosting)
 class JobPostingAdmin(admin.ModelAdmin):
-    list_display = ('title', 'department', 'job_type', 'deadline', 'is_active', 'application_count')
+    list_display = ('title', 'department', 'job_type', 'deadline', 'is_active', 'application_count', 'pipeline')
     prepopulated_fields = {'slug': ('title',)}
     search_fields = ('title', 'department', 'position')
     list_filter = ('job_type', 'is_active', 'posted_date', 'deadline')
@@ -28,18 +34,78 @@ class JobPostingAdmin(admin.ModelAdmin):
     )
     readonly_fields = ('posted_date', 'created_at', 'updated_at')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('stats')
+
+    def get_urls(self):
+        urls = [
+            path('dashboard/', self.admin_site.admin_view(self.dashboard_view), name='jobs_recruitment_dashboard'),
+        ]
+        return urls + super().get_urls()
+
+    def dashboard_view(self, request):
+        stats = (
+            JobPostingStats.objects
+            .select_related('job')
+            .filter(job__is_active=True)
+            .order_by('job__deadline')
+        )
+        totals = pipeline_totals(stats)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Recruitment Dashboard',
+            'opts': self.model._meta,
+            'statuses': [(status, label) for status, label in JobApplication.STATUS_CHOICES],
+            'totals': totals,
+            'total_counts': [totals[status] for status in STATUSES],
+            'rows': [
+                {'job': row.job, 'total': row.total, 'counts': [getattr(row, status) for status in STATUSES]}
+                for row in stats
+            ],
+        }
+        return TemplateResponse(request, 'admin/jobs/recruitment_dashboard.html', context)
+
+    def _stats(self, obj):
+        try:
+            return obj.stats
+        except ObjectDoesNotExist:
+            return None
+
     def application_count(self, obj):
-        count = obj.applications.count()
+        stats = self._stats(obj)
+        count = stats.total if stats else 0
         return f"{count} application{'s' if count != 1 else ''}"
     application_count.short_description = 'Applications'
+    application_count.admin_order_field = 'stats__total'
+
+    def pipeline(self, obj):
+        stats = self._stats(obj)
+        if not stats:
+            return '-'
+        return f"{stats.in_progress} in progress / {stats.offered} offered / {stats.rejected} rejected"
+    pipeline.short_description = 'Pipeline'
+
+
+class JobApplicationHistoryInline(admin.TabularInline):
+    model = JobApplicationHistory
+    extra = 0
+    can_delete = False
+    fields = ('changed_at', 'from_status', 'to_status', 'changed_by', 'note')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'job', 'email', 'status', 'applied_at')
+    list_select_related = ('job',)
+    inlines = [JobApplicationHistoryInline]
+    actions = ['mark_under_review', 'mark_shortlisted', 'mark_interviewed', 'mark_offered', 'mark_rejected']
     search_fields = ('first_name', 'last_name', 'email', 'job__title')
     list_filter = ('status', 'job', 'applied_at')
-    readonly_fields = ('applied_at', 'updated_at', 'job')
+    readonly_fields = ('applied_at', 'updated_at', 'resume_indexed_at', 'job')
     fieldsets = (
         ('Applicant Information', {
             'fields': ('first_name', 'last_name', 'email', 'phone')
@@ -51,11 +117,91 @@ class JobApplicationAdmin(admin.ModelAdmin):
             'fields': ('cover_letter', 'status', 'notes')
         }),
         ('Timestamps', {
-            'fields': ('applied_at', 'updated_at'),
+            'fields': ('applied_at', 'updated_at', 'resume_indexed_at'),
             'classes': ('collapse',)
         }),
     )
 
+    def get_urls(self):
+        urls = [
+            path('resume-search/', self.admin_site.admin_view(self.resume_search_view), name='jobs_resume_search'),
+        ]
+        return urls + super().get_urls()
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            matched = [application.pk for application, _, _ in search(search_term, queryset, limit=500)]
+            results = results | queryset.filter(pk__in=matched)
+        return results, may_have_duplicates
+
+    def resume_search_view(self, request):
+        query = request.GET.get('q', '').strip()
+        job_id = request.GET.get('job', '')
+        candidates = JobApplication.objects.all()
+        if job_id.isdigit():
+            candidates = candidates.filter(job_id=job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Resume Search',
+            'opts': self.model._meta,
+            'query': query,
+            'job_id': job_id,
+            'jobs': JobPosting.objects.order_by('title').values_list('pk', 'title'),
+            'results': search(query, candidates) if query else [],
+            'pending': JobApplication.objects.exclude(resume='').filter(resume_indexed_at__isnull=True).count(),
+        }
+        return TemplateResponse(request, 'admin/jobs/resume_search.html', context)
+
     def full_name(self, obj):
         return obj.full_name
     full_name.short_description = 'Applicant'
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            record_transition(obj, form.initial.get('status'), user=request.user, note='Edited in admin')
+
+    def _transition(self, request, queryset, to_status):
+        moved = transition_queryset(queryset, to_status, user=request.user, note='Bulk admin action')
+        label = dict(JobApplication.STATUS_CHOICES)[to_status]
+        self.message_user(request, f'{moved} application(s) moved to {label}; candidate emails queued.')
+        if not moved:
+            self.message_user(request, f'All selected applications were already {label}.', level=messages.WARNING)
+
+    def mark_under_review(self, request, queryset):
+        self._transition(request, queryset, 'under_review')
+    mark_under_review.short_description = 'Mark as Under Review'
+
+    def mark_shortlisted(self, request, queryset):
+        self._transition(request, queryset, 'shortlisted')
+    mark_shortlisted.short_description = 'Mark as Shortlisted'
+
+    def mark_interviewed(self, request, queryset):
+        self._transition(request, queryset, 'interviewed')
+    mark_interviewed.short_description = 'Mark as Interviewed'
+
+    def mark_offered(self, request, queryset):
+        self._transition(request, queryset, 'offered')
+    mark_offered.short_description = 'Mark as Offered'
+
+    def mark_rejected(self, request, queryset):
+        self._transition(request, queryset, 'rejected')
+    mark_rejected.short_description = 'Mark as Rejected'
+
+
+@admin.register(CandidateNotification)
+class CandidateNotificationAdmin(admin.ModelAdmin):
+    list_display = ('application', 'to_status', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'to_status', 'created_at')
+    search_fields = ('application__email', 'application__last_name')
+    list_select_related = ('application__job',)
+    readonly_fields = (
+        'application', 'to_status', 'attempts', 'next_attempt_at', 'claimed_at', 'last_error', 'created_at', 'sent_at',
+    )
+    actions = ['retry_notifications']
+
+    def retry_notifications(self, request, queryset):
+        updated = queryset.filter(status='failed').update(status='pending', attempts=0, next_attempt_at=None)
+        self.message_user(request, f'{updated} notification(s) queued again.')
+    retry_notifications.short_description = 'Retry failed notifications'
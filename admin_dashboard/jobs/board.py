@@ -0,0 +1,65 @@
+"""
+Public jobs board.
+
+Open postings are selected in the database (``is_active`` and ``deadline >=
+today``, served by a composite index) instead of calling ``is_open()`` per
+object. Serialized responses are cached under a version bumped on every
+posting change, and keyed by the date with a timeout that ends at midnight,
+so a posting whose deadline passes drops off the board the next day.
+"""
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import JobPosting
+
+VERSION_KEY = 'jobs:board:version'
+
+
+def open_postings(today=None):
+    today = today or timezone.localdate()
+    return JobPosting.objects.filter(is_active=True, deadline__gte=today)
+
+
+def invalidate():
+    """Drop every cached board response (called when postings change)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def seconds_until_midnight(now=None):
+    now = timezone.localtime(now)
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def cached(name, params, build):
+    """
+    Return ``build()`` cached until the next posting change or midnight.
+
+    ``params`` (e.g. the query string) is part of the key, so each filter
+    combination is cached separately.
+    """
+    version = cache.get_or_set(VERSION_KEY, 1, None)
+    digest = hashlib.sha1(params.encode()).hexdigest()
+    key = f'jobs:board:v{version}:{timezone.localdate()}:{name}:{digest}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, seconds_until_midnight())
+    return data
+
+
+def expire(today=None):
+    """Deactivate postings whose deadline has passed with one UPDATE; returns how many"""
+    today = today or timezone.localdate()
+    expired = JobPosting.objects.filter(is_active=True, deadline__lt=today).update(
+        is_active=False, updated_at=timezone.now(),
+    )
+    if expired:
+        invalidate()
+    return expired
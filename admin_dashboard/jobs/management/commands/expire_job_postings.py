@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs import board
+
+
+class Command(BaseCommand):
+    help = 'Deactivate job postings whose deadline has passed (run nightly from cron)'
+
+    def handle(self, *args, **options):
+        expired = board.expire()
+        self.stdout.write(f'{expired} postings expired')
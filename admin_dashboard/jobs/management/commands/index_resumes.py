@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import JobApplication
+from jobs.resumes import index_applications
+
+
+class Command(BaseCommand):
+    help = 'Extract text from uploaded resumes into the search index (pending ones, or all with --all)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-index every resume, not only pending ones')
+        parser.add_argument('--processes', type=int, default=None, help='Worker processes (default: CPU count)')
+
+    def handle(self, *args, **options):
+        applications = JobApplication.objects.all()
+        if not options['all']:
+            applications = applications.filter(resume_indexed_at__isnull=True)
+        count = index_applications(applications, processes=options['processes'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} resumes'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recount per-posting application statistics from the applications table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help='Limit to these posting ids')
+
+    def handle(self, *args, **options):
+        count = rebuild(options['job_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {count} job postings'))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import transitions
+
+
+class Command(BaseCommand):
+    help = 'Send queued candidate status emails (run once from cron, or with --loop as a worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help='Maximum notifications to send per pass')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling every --interval seconds')
+        parser.add_argument('--interval', type=int, default=30, help='Seconds between passes when looping')
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        while True:
+            sent = failed = 0
+            while True:
+                batch_sent, batch_failed = transitions.send_pending(limit=limit)
+                sent, failed = sent + batch_sent, failed + batch_failed
+                if batch_sent + batch_failed < limit:
+                    break
+            if sent or failed or options['verbosity'] > 1:
+                self.stdout.write(f'{sent} sent, {failed} failed')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
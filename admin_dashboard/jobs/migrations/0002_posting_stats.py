@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stats(apps, schema_editor):
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    JobPosting = apps.get_model('jobs', 'JobPosting')
+    JobPostingStats = apps.get_model('jobs', 'JobPostingStats')
+
+    counts = {}
+    for row in JobApplication.objects.values('job_id', 'status').annotate(n=Count('pk')).order_by():
+        counts.setdefault(row['job_id'], {})[row['status']] = row['n']
+    JobPostingStats.objects.bulk_create(
+        [
+            JobPostingStats(job_id=job_id, total=sum(counts.get(job_id, {}).values()), **counts.get(job_id, {}))
+            for job_id in JobPosting.objects.values_list('pk', flat=True)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPostingStats',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='jobs.jobposting')),
+                ('total', models.IntegerField(default=0)),
+                ('submitted', models.IntegerField(default=0)),
+                ('under_review', models.IntegerField(default=0)),
+                ('shortlisted', models.IntegerField(default=0)),
+                ('interviewed', models.IntegerField(default=0)),
+                ('offered', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('withdrawn', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Job Posting Stats',
+                'verbose_name_plural': 'Job Posting Stats',
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
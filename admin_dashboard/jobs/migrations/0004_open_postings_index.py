@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_resume_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_active', 'deadline'], name='jobs_jobpos_is_acti_07e708_idx'),
+        ),
+    ]
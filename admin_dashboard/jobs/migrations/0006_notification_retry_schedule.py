@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_status_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatenotification',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker last took the notification', null=True),
+        ),
+        migrations.AddField(
+            model_name='candidatenotification',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, help_text='Not retried before this time', null=True),
+        ),
+    ]
@@ -31,6 +31,9 @@ class JobPosting(models.Model):
         verbose_name = 'Job Posting'
         verbose_name_plural = 'Job Postings'
         ordering = ['-posted_date']
+        indexes = [
+            models.Index(fields=['is_active', 'deadline']),
+        ]
 
     def __str__(self):
         return self.title
@@ -59,6 +62,8 @@ class JobApplication(models.Model):
     resume = models.FileField(upload_to='jobs/resumes/')
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='submitted')
     notes = models.TextField(blank=True, help_text='Internal notes for recruitment team')
+    resume_text = models.TextField(blank=True, editable=False, help_text='Text extracted from the resume for search')
+    resume_indexed_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -74,3 +79,93 @@ class JobApplication(models.Model):
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
+
+
+class ResumeTerm(models.Model):
+    """Inverted index entry: a term found in an applicant's resume and how often it occurs"""
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='resume_terms')
+    term = models.CharField(max_length=64)
+    frequency = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('term', 'application')
+
+    def __str__(self):
+        return f"{self.term} ({self.frequency}) - {self.application}"
+
+
+class JobPostingStats(models.Model):
+    """Application counts per status for a posting, kept current by JobApplication signals"""
+    job = models.OneToOneField(JobPosting, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total = models.IntegerField(default=0)
+    submitted = models.IntegerField(default=0)
+    under_review = models.IntegerField(default=0)
+    shortlisted = models.IntegerField(default=0)
+    interviewed = models.IntegerField(default=0)
+    offered = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    withdrawn = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Job Posting Stats'
+        verbose_name_plural = 'Job Posting Stats'
+
+    def __str__(self):
+        return f"{self.job.title}: {self.total} applications"
+
+    @property
+    def in_progress(self):
+        return self.submitted + self.under_review + self.shortlisted + self.interviewed
+
+
+class JobApplicationHistory(models.Model):
+    """A status change of an application, written by admin edits and bulk transitions"""
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='history')
+    from_status = models.CharField(max_length=50, choices=JobApplication.STATUS_CHOICES)
+    to_status = models.CharField(max_length=50, choices=JobApplication.STATUS_CHOICES)
+    changed_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True)
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = 'Application Status Change'
+        verbose_name_plural = 'Application Status Changes'
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['application', 'changed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.application}: {self.from_status} -> {self.to_status}"
+
+
+class CandidateNotification(models.Model):
+    """Queued email telling a candidate about a status change; sent by the send_candidate_notifications worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='notifications')
+    to_status = models.CharField(max_length=50, choices=JobApplication.STATUS_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, help_text='Not retried before this time')
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text='When a worker last took the notification')
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Candidate Notification'
+        verbose_name_plural = 'Candidate Notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.application.email}: {self.get_to_status_display()} ({self.status})"
@@ -0,0 +1,217 @@
+"""
+Resume text extraction and the applicant search index.
+
+Text is pulled from PDF, DOCX and plain-text resumes and stored on the
+application, and its terms go into ``ResumeTerm``, a small inverted index
+that works the same on SQLite and PostgreSQL. A search is one grouped query
+over the index, ranked by a TF-IDF style score.
+
+PDFs are read with ``pypdf`` when it is installed; otherwise a built-in
+reader decodes Flate streams and collects the text-showing operators, which
+covers resumes exported from word processors. DOCX files are plain zip
+archives and need no extra dependency.
+
+Saving an application with a new resume marks it as pending and indexes it
+in-process once the transaction commits (set ``RESUME_INDEX_ON_SAVE = False``
+to leave that to the command). Bulk extraction is CPU bound and runs in a
+process pool from the ``index_resumes`` command, which also picks up any
+resume whose indexing failed.
+"""
+import math
+import re
+import zipfile
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.utils import timezone
+
+from .models import JobApplication, ResumeTerm
+
+MAX_TEXT = 200_000
+MAX_TERM = 64
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*')
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his i in is it its me my of on or our she
+so than that the their them they this to was we were with you your will can also all any into not
+""".split())
+
+_DOCX_PARAGRAPH = re.compile(rb'</w:p>')
+_DOCX_TAG = re.compile(rb'<[^>]+>')
+_PDF_STREAM = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+_PDF_TEXT_BLOCK = re.compile(rb'BT(.*?)ET', re.S)
+_PDF_STRING = re.compile(rb'\((?:\\.|[^\\)])*\)', re.S)
+_PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+
+def tokenize(text):
+    """Lower-cased search terms; keeps tokens like ``c++``, ``c#`` and ``node.js``"""
+    return [
+        token[:MAX_TERM]
+        for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def extract_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        xml = archive.read('word/document.xml')
+    xml = _DOCX_PARAGRAPH.sub(b'\n', xml)
+    return unescape(_DOCX_TAG.sub(b'', xml).decode('utf-8', 'ignore'))
+
+
+def _pdf_unescape(raw):
+    out = bytearray()
+    i = 0
+    while i < len(raw):
+        char = raw[i:i + 1]
+        if char != b'\\':
+            out += char
+            i += 1
+            continue
+        following = raw[i + 1:i + 2]
+        if following in _PDF_ESCAPES:
+            out += _PDF_ESCAPES[following]
+            i += 2
+        elif following.isdigit():
+            octal = re.match(rb'[0-7]{1,3}', raw[i + 1:i + 4]).group()
+            out.append(int(octal, 8) & 0xFF)
+            i += 1 + len(octal)
+        else:
+            out += following
+            i += 2
+    return bytes(out)
+
+
+def extract_pdf_fallback(path):
+    """Best-effort text from uncompressed or Flate-compressed content streams"""
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    chunks = []
+    for stream in _PDF_STREAM.findall(data):
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for block in _PDF_TEXT_BLOCK.findall(stream):
+            parts = [_pdf_unescape(match[1:-1]) for match in _PDF_STRING.findall(block)]
+            if parts:
+                chunks.append(b' '.join(parts).decode('latin-1'))
+    return '\n'.join(chunks)
+
+
+def extract_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return extract_pdf_fallback(path)
+    return '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+
+
+def extract_text(path):
+    """Text of a resume file by extension; empty for unsupported formats or unreadable files"""
+    lower = path.lower()
+    try:
+        if lower.endswith('.pdf'):
+            text = extract_pdf(path)
+        elif lower.endswith('.docx'):
+            text = extract_docx(path)
+        elif lower.endswith('.txt'):
+            with open(path, encoding='utf-8', errors='ignore') as handle:
+                text = handle.read()
+        else:
+            text = ''
+    except Exception:
+        text = ''
+    return ' '.join(text.split())[:MAX_TEXT]
+
+
+def _extract(job):
+    """Process-pool worker: ``(application_id, path)`` -> ``(application_id, text, term counts)``"""
+    application_id, path = job
+    text = extract_text(path)
+    return application_id, text, Counter(tokenize(text))
+
+
+def store(application_id, text, terms):
+    """Replace one application's indexed text and terms"""
+    with transaction.atomic():
+        ResumeTerm.objects.filter(application_id=application_id).delete()
+        ResumeTerm.objects.bulk_create(
+            [ResumeTerm(application_id=application_id, term=term, frequency=n) for term, n in terms.items()],
+            batch_size=1000,
+        )
+        JobApplication.objects.filter(pk=application_id).update(
+            resume_text=text, resume_indexed_at=timezone.now(),
+        )
+
+
+def index_applications(queryset, processes=None, chunksize=8):
+    """
+    Extract and index the resumes of ``queryset``; returns the number indexed.
+
+    Files are read in worker processes and results are written from this
+    process as they arrive, so memory holds one resume's terms at a time.
+    """
+    jobs = []
+    for pk, resume in queryset.exclude(resume='').values_list('pk', 'resume').iterator():
+        try:
+            jobs.append((pk, JobApplication._meta.get_field('resume').storage.path(resume)))
+        except NotImplementedError:
+            continue
+    if not jobs:
+        return 0
+    if processes == 1:
+        results = map(_extract, jobs)
+        for result in results:
+            store(*result)
+        return len(jobs)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for result in pool.map(_extract, jobs, chunksize=chunksize):
+            store(*result)
+    return len(jobs)
+
+
+def search(query, queryset=None, limit=50):
+    """
+    Applications ranked by how well their resumes match ``query``.
+
+    Scores add ``frequency * idf`` over matched terms; applications matching
+    more distinct terms always rank first. Returns ``[(application, score, matched)]``.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+    documents = JobApplication.objects.filter(resume_indexed_at__isnull=False).count() or 1
+    frequencies = dict(
+        ResumeTerm.objects.filter(term__in=terms).values('term').annotate(n=Count('pk')).values_list('term', 'n')
+    )
+    if not frequencies:
+        return []
+    weights = {term: math.log(1 + documents / n) for term, n in frequencies.items()}
+
+    matches = ResumeTerm.objects.filter(term__in=list(weights))
+    if queryset is not None:
+        matches = matches.filter(application__in=queryset)
+    ranked = list(
+        matches
+        .values('application_id')
+        .annotate(
+            matched=Count('term'),
+            score=Sum(F('frequency') * Case(
+                *[When(term=term, then=Value(weight)) for term, weight in weights.items()],
+                default=Value(0.0),
+                output_field=FloatField(),
+            ), output_field=FloatField()),
+        )
+        .order_by('-matched', '-score')[:limit]
+    )
+    applications = JobApplication.objects.select_related('job').in_bulk([row['application_id'] for row in ranked])
+    return [
+        (applications[row['application_id']], round(row['score'], 3), row['matched'])
+        for row in ranked
+        if row['application_id'] in applications
+    ]
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from .models import JobPosting
+
+
+class JobPostingListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobPosting
+        fields = [
+            'id', 'title', 'slug', 'department', 'position', 'job_type',
+            'salary_min', 'salary_max', 'currency', 'deadline', 'posted_date',
+        ]
+
+
+class JobPostingSerializer(JobPostingListSerializer):
+    class Meta(JobPostingListSerializer.Meta):
+        fields = JobPostingListSerializer.Meta.fields + ['description', 'requirements']
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import board, resumes, stats
+from .models import JobApplication, JobPosting
+
+
+@receiver([pre_save, pre_delete], sender=JobApplication)
+def remember_stored_state(sender, instance, **kwargs):
+    # Read what is stored, so bulk updates made behind this instance's back are respected
+    instance._stored = JobApplication.objects.filter(pk=instance.pk).values('job_id', 'status', 'resume').first() if instance.pk else None
+
+
+@receiver(post_save, sender=JobApplication)
+def count_application(sender, instance, created, **kwargs):
+    stored = getattr(instance, '_stored', None)
+    deltas = {}
+    if stored and not created:
+        if (stored['job_id'], stored['status']) == (instance.job_id, instance.status):
+            return
+        deltas.setdefault(stored['job_id'], {})[stored['status']] = -1
+    changes = deltas.setdefault(instance.job_id, {})
+    changes[instance.status] = changes.get(instance.status, 0) + 1
+    stats.adjust(deltas)
+
+
+@receiver(post_delete, sender=JobApplication)
+def uncount_application(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, JobPosting) or getattr(origin, 'model', None) is JobPosting:
+        # The posting and its counters are being deleted along with it
+        return
+    stored = getattr(instance, '_stored', None) or {'job_id': instance.job_id, 'status': instance.status}
+    stats.adjust({stored['job_id']: {stored['status']: -1}})
+
+
+@receiver(post_save, sender=JobApplication)
+def queue_resume_indexing(sender, instance, created, **kwargs):
+    stored = getattr(instance, '_stored', None)
+    if not created and not (stored and stored['resume'] != instance.resume.name):
+        return
+    if not created:
+        JobApplication.objects.filter(pk=instance.pk).update(resume_indexed_at=None)
+    if getattr(settings, 'RESUME_INDEX_ON_SAVE', True):
+        # One resume is cheap enough to index once the upload is committed; if it
+        # fails the application stays pending for the index_resumes command
+        pk = instance.pk
+        transaction.on_commit(
+            lambda: resumes.index_applications(JobApplication.objects.filter(pk=pk), processes=1), robust=True,
+        )
+
+
+@receiver([post_save, post_delete], sender=JobPosting)
+def invalidate_board(sender, **kwargs):
+    board.invalidate()
@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import JobApplication, JobPosting, JobPostingStats
+
+STATUSES = [status for status, _ in JobApplication.STATUS_CHOICES]
+
+
+def adjust(deltas):
+    """
+    Apply ``{job_id: {status: delta}}`` to the posting counters.
+
+    ``total`` follows the sum of the status deltas. Each posting is one
+    ``F()`` update, so concurrent applications never lose counts.
+    """
+    deltas = {job_id: {s: d for s, d in changes.items() if d} for job_id, changes in deltas.items()}
+    deltas = {job_id: changes for job_id, changes in deltas.items() if changes}
+    if not deltas:
+        return
+    JobPostingStats.objects.bulk_create(
+        [JobPostingStats(job_id=job_id) for job_id in deltas],
+        ignore_conflicts=True,
+    )
+    now = timezone.now()
+    for job_id, changes in deltas.items():
+        updates = {status: F(status) + delta for status, delta in changes.items() if status in STATUSES}
+        total = sum(delta for status, delta in changes.items() if status in STATUSES)
+        if total:
+            updates['total'] = F('total') + total
+        JobPostingStats.objects.filter(job_id=job_id).update(updated_at=now, **updates)
+
+
+def rebuild(job_ids=None):
+    """Recount the counters from the applications table with one grouped query"""
+    applications = JobApplication.objects.all()
+    postings = JobPosting.objects.all()
+    if job_ids is not None:
+        applications = applications.filter(job_id__in=list(job_ids))
+        postings = postings.filter(pk__in=list(job_ids))
+
+    counts = {}
+    for row in applications.values('job_id', 'status').annotate(n=Count('pk')).order_by():
+        counts.setdefault(row['job_id'], {})[row['status']] = row['n']
+
+    job_ids = list(postings.values_list('pk', flat=True))
+    with transaction.atomic():
+        JobPostingStats.objects.bulk_create(
+            [JobPostingStats(job_id=job_id) for job_id in job_ids],
+            ignore_conflicts=True,
+            batch_size=500,
+        )
+        rows = list(JobPostingStats.objects.select_for_update().filter(job_id__in=job_ids))
+        for row in rows:
+            by_status = counts.get(row.job_id, {})
+            for status in STATUSES:
+                setattr(row, status, by_status.get(status, 0))
+            row.total = sum(by_status.get(status, 0) for status in STATUSES)
+        JobPostingStats.objects.bulk_update(rows, ['total', *STATUSES], batch_size=500)
+    return len(rows)
+
+
+def pipeline_totals(stats=None):
+    """Totals per status across postings, summed from the counters table"""
+    stats = stats if stats is not None else JobPostingStats.objects.all()
+    totals = stats.aggregate(total=Sum('total'), **{status: Sum(status) for status in STATUSES})
+    return {key: value or 0 for key, value in totals.items()}
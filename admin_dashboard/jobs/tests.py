@@ -0,0 +1,116 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import resumes, transitions
+from .models import CandidateNotification, JobApplication, JobPosting
+
+
+class UnreachableBackend(BaseEmailBackend):
+    """An SMTP server that is down"""
+
+    def open(self):
+        raise ConnectionRefusedError('Connection refused')
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('Connection refused')
+
+
+class ResumeIndexingTests(TestCase):
+    """Uploaded resumes become searchable once the upload is committed"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.job = JobPosting.objects.create(
+            title='Lab Technician', slug='lab-technician', department='Chemistry', description='Run the lab',
+            deadline=timezone.localdate() + timedelta(days=30),
+        )
+
+    def apply(self, email, text):
+        return JobApplication.objects.create(
+            job=self.job, first_name='Ama', last_name='Mensah', email=email,
+            resume=SimpleUploadedFile('resume.txt', text.encode()),
+        )
+
+    def test_uploaded_resume_is_searchable(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            application = self.apply('ama@example.org', 'Chromatography and spectroscopy, five years')
+
+        application.refresh_from_db()
+        self.assertIsNotNone(application.resume_indexed_at)
+        self.assertEqual([result.pk for result, _, _ in resumes.search('chromatography')], [application.pk])
+
+    def test_replaced_resume_is_reindexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            application = self.apply('ama@example.org', 'Chromatography')
+        with self.captureOnCommitCallbacks(execute=True):
+            application.resume = SimpleUploadedFile('resume.txt', b'Microscopy')
+            application.save()
+
+        self.assertEqual(resumes.search('chromatography'), [])
+        self.assertEqual([result.pk for result, _, _ in resumes.search('microscopy')], [application.pk])
+
+    @override_settings(RESUME_INDEX_ON_SAVE=False)
+    def test_indexing_can_be_left_to_the_command(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            application = self.apply('ama@example.org', 'Chromatography')
+
+        self.assertIsNone(JobApplication.objects.get(pk=application.pk).resume_indexed_at)
+        pending = JobApplication.objects.filter(resume_indexed_at__isnull=True)
+        self.assertEqual(resumes.index_applications(pending, processes=1), 1)
+        self.assertEqual([result.pk for result, _, _ in resumes.search('chromatography')], [application.pk])
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class CandidateNotificationTests(TestCase):
+
+    def setUp(self):
+        job = JobPosting.objects.create(
+            title='Lab Technician', slug='lab-technician', department='Chemistry', description='Run the lab',
+            deadline=timezone.localdate() + timedelta(days=30),
+        )
+        for index in range(25):
+            JobApplication.objects.create(
+                job=job, first_name='Ama', last_name=f'Mensah {index}', email=f'ama{index}@example.org',
+                resume='jobs/resumes/resume.txt',
+            )
+        transitions.transition_queryset(JobApplication.objects.all(), 'rejected')
+
+    def send(self):
+        out = StringIO()
+        call_command('send_candidate_notifications', limit=10, stdout=out)
+        return out.getvalue().strip()
+
+    @override_settings(EMAIL_BACKEND='jobs.tests.UnreachableBackend')
+    def test_failed_sends_wait_before_retrying(self):
+        self.assertEqual(self.send(), '0 sent, 25 failed')
+
+        self.assertEqual(CandidateNotification.objects.filter(status='pending', attempts=1).count(), 25)
+        self.assertFalse(CandidateNotification.objects.filter(next_attempt_at__lte=timezone.now()).exists())
+        self.assertEqual(self.send(), '')
+
+    def test_due_retries_are_sent(self):
+        CandidateNotification.objects.update(attempts=1, next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(self.send(), '25 sent, 0 failed')
+        self.assertEqual(len(mail.outbox), 25)
+
+    def test_notifications_of_a_crashed_worker_are_requeued(self):
+        claimed = transitions.claim(limit=10)
+        CandidateNotification.objects.filter(status='sending').update(claimed_at=timezone.now() - timedelta(hours=1))
+        CandidateNotification.objects.filter(pk=claimed[0].pk).update(attempts=transitions.MAX_ATTEMPTS)
+
+        self.assertEqual(transitions.requeue_stale(), (9, 1))
+        self.assertEqual(self.send(), '24 sent, 0 failed')
@@ -0,0 +1,202 @@
+"""
+Application status transitions and the candidate notification queue.
+
+``transition_queryset`` moves any number of applications to a new status with a
+fixed number of queries: one read of the affected rows, one ``update()``,
+bulk history and notification inserts, and one counter update per posting.
+Emails are only queued here; ``send_pending`` delivers them from the
+``send_candidate_notifications`` worker, so admin requests never wait on SMTP.
+
+A failed send is retried after ``CANDIDATE_NOTIFICATION_BACKOFF`` seconds
+(default 60), doubled on each attempt, and given up after ``MAX_ATTEMPTS``.
+Notifications left in ``sending`` for ``CANDIDATE_NOTIFICATION_CLAIM_TIMEOUT``
+seconds (default 900) belong to a worker that died and are queued again.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import stats
+from .models import CandidateNotification, JobApplication, JobApplicationHistory
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+# Statuses candidates are told about, with the email sent for each
+MESSAGES = {
+    'under_review': (
+        'Your application for {job} is under review',
+        'Dear {name},\n\nThank you for applying for {job}. Your application is now being reviewed '
+        'and we will be in touch about the next steps.\n',
+    ),
+    'shortlisted': (
+        'You have been shortlisted for {job}',
+        'Dear {name},\n\nWe are pleased to let you know that you have been shortlisted for {job}. '
+        'We will contact you shortly to arrange an interview.\n',
+    ),
+    'offered': (
+        'Offer for {job}',
+        'Dear {name},\n\nWe are delighted to offer you the position of {job}. '
+        'Details of the offer will follow separately.\n',
+    ),
+    'rejected': (
+        'Your application for {job}',
+        'Dear {name},\n\nThank you for your interest in {job}. After careful consideration we will '
+        'not be taking your application further. We wish you every success.\n',
+    ),
+}
+
+
+def _record(changes, user, note, notify):
+    """History rows, and queued notifications, for ``[(application_id, from_status, to_status)]``"""
+    changed_by = user if user is not None and user.is_authenticated else None
+    JobApplicationHistory.objects.bulk_create([
+        JobApplicationHistory(
+            application_id=pk, from_status=old, to_status=new, changed_by=changed_by, note=note,
+        )
+        for pk, old, new in changes
+    ], batch_size=1000)
+    if notify:
+        CandidateNotification.objects.bulk_create([
+            CandidateNotification(application_id=pk, to_status=new)
+            for pk, _, new in changes
+            if new in MESSAGES
+        ], batch_size=1000)
+
+
+def transition_queryset(queryset, to_status, user=None, note='', notify=True):
+    """
+    Move every application of ``queryset`` to ``to_status``; returns how many changed.
+
+    Applications already in that status are left alone. This is a bulk
+    ``update()`` that sends no signals, so the posting counters, history and
+    notification queue are maintained here instead.
+    """
+    if to_status not in dict(JobApplication.STATUS_CHOICES):
+        raise ValueError(f'Unknown application status: {to_status}')
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            JobApplication.objects
+            .select_for_update()
+            .filter(pk__in=queryset.order_by().values('pk'))
+            .exclude(status=to_status)
+            .values_list('pk', 'job_id', 'status')
+        )
+        if not rows:
+            return 0
+        JobApplication.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(status=to_status, updated_at=now)
+        deltas = defaultdict(lambda: defaultdict(int))
+        for _, job_id, status in rows:
+            deltas[job_id][status] -= 1
+            deltas[job_id][to_status] += 1
+        stats.adjust(deltas)
+        _record([(pk, status, to_status) for pk, _, status in rows], user, note, notify)
+    return len(rows)
+
+
+def record_transition(application, from_status, user=None, note='', notify=True):
+    """Log (and notify about) a status change made through a regular ``save()``"""
+    if from_status != application.status:
+        _record([(application.pk, from_status, application.status)], user, note, notify)
+
+
+def build_message(application, to_status):
+    subject, body = MESSAGES[to_status]
+    values = {'name': application.full_name, 'job': application.job.title}
+    return EmailMessage(
+        subject=subject.format(**values),
+        body=body.format(**values),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[application.email],
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try of a notification that has failed ``attempts`` times"""
+    return getattr(settings, 'CANDIDATE_NOTIFICATION_BACKOFF', 60) * 2 ** (attempts - 1)
+
+
+def requeue_stale(now=None):
+    """Return notifications abandoned in ``sending`` by a crashed worker; returns ``(requeued, failed)``"""
+    now = now or timezone.now()
+    timeout = getattr(settings, 'CANDIDATE_NOTIFICATION_CLAIM_TIMEOUT', 15 * 60)
+    stale = CandidateNotification.objects.filter(
+        Q(claimed_at__lt=now - timedelta(seconds=timeout)) | Q(claimed_at__isnull=True),
+        status='sending',
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed', last_error='Worker stopped while sending',
+    )
+    requeued = stale.update(status='pending', next_attempt_at=None)
+    if requeued or failed:
+        logger.warning('Recovered stale candidate notifications: %s requeued, %s failed', requeued, failed)
+    return requeued, failed
+
+
+def claim(limit=200, now=None):
+    """Mark up to ``limit`` due pending notifications as sending and return them"""
+    now = now or timezone.now()
+    requeue_stale(now)
+    with transaction.atomic():
+        ids = list(
+            CandidateNotification.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+            .order_by('pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        CandidateNotification.objects.filter(pk__in=ids).update(
+            status='sending', attempts=F('attempts') + 1, claimed_at=now,
+        )
+    return list(CandidateNotification.objects.filter(pk__in=ids).select_related('application__job'))
+
+
+def send_pending(limit=200):
+    """
+    Send one batch of due notifications over a single SMTP connection.
+
+    Failures go back to pending with a growing delay until they have been
+    tried ``MAX_ATTEMPTS`` times. Returns ``(sent, failed)``.
+    """
+    notifications = claim(limit)
+    if not notifications:
+        return 0, 0
+    sent, errors = [], {}
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for notification in notifications:
+                if notification.to_status not in MESSAGES:
+                    errors[notification.pk] = f'No message for status {notification.to_status}'
+                    continue
+                try:
+                    connection.send_messages([build_message(notification.application, notification.to_status)])
+                    sent.append(notification.pk)
+                except Exception as exc:
+                    errors[notification.pk] = str(exc)
+    except Exception as exc:
+        errors.update({n.pk: str(exc) for n in notifications if n.pk not in sent})
+
+    now = timezone.now()
+    CandidateNotification.objects.filter(pk__in=sent).update(status='sent', sent_at=now, last_error='')
+    for notification in notifications:
+        if notification.pk in errors:
+            if notification.attempts >= MAX_ATTEMPTS:
+                changes = {'status': 'failed'}
+            else:
+                changes = {
+                    'status': 'pending',
+                    'next_attempt_at': now + timedelta(seconds=retry_delay(notification.attempts)),
+                }
+            CandidateNotification.objects.filter(pk=notification.pk).update(
+                last_error=errors[notification.pk][:1000], **changes,
+            )
+    return len(sent), len(errors)
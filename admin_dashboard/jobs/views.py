@@ -0,0 +1,32 @@
+from rest_framework import viewsets
+from rest_framework.response import Response
+
+from . import board
+from .serializers import JobPostingListSerializer, JobPostingSerializer
+
+
+class JobPostingViewSet(viewsets.ReadOnlyModelViewSet):
+    """Public listing and detail of open job postings (``?department=``, ``?job_type=``)"""
+    lookup_field = 'slug'
+
+    def get_queryset(self):
+        queryset = board.open_postings().order_by('deadline', 'title')
+        params = self.request.query_params
+        if params.get('department'):
+            queryset = queryset.filter(department=params['department'])
+        if params.get('job_type'):
+            queryset = queryset.filter(job_type=params['job_type'])
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return JobPostingSerializer
+        return JobPostingListSerializer
+
+    def list(self, request, *args, **kwargs):
+        params = request.GET.urlencode()
+        return Response(board.cached('list', params, lambda: super(JobPostingViewSet, self).list(request).data))
+
+    def retrieve(self, request, *args, **kwargs):
+        data = board.cached('detail', kwargs['slug'], lambda: self.get_serializer(self.get_object()).data)
+        return Response(data)
@@ -1,12 +1,70 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.template.response import TemplateResponse
+from django.utils import timezone
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path, reverse
 from django.db.models import Count, Q
 from .models import (
     MaintenanceTeam, Technician, MaintenanceRequest, MaintenanceWorkOrder,
     MaintenanceCompletion, MaintenanceSignature, MaintenanceSchedule,
-    MaintenanceMetrics, MaintenanceHistory
+    MaintenanceMetrics, MaintenanceHistory, MaintenanceStatusLog,
+    MaintenanceSLABreach, MaintenancePartUsage
 )
+from .inventory import consume_parts
+from .reliability import category_reports
+from .sla import requests_needing_attention, team_summary
+from .transitions import can_transition, record_transition, transition_queryset
+
+
+class StatusTransitionForm(forms.ModelForm):
+    """Reject status edits that skip the allowed workflow"""
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        previous = self.instance.status
+        if self.instance.pk and status != previous and not can_transition(self._meta.model, previous, status):
+            raise forms.ValidationError(
+                f'Cannot change status from "{previous}" to "{status}".'
+            )
+        return status
+
+
+class StatusTransitionAdminMixin:
+    """Bulk status actions and audit logging shared by request/work order admins"""
+
+    def _transition(self, request, queryset, to_status):
+        applied, rejected = transition_queryset(queryset, to_status, user=request.user)
+        self.message_user(request, f'{applied} item(s) moved to {to_status}.')
+        if rejected:
+            self.message_user(
+                request,
+                f'{len(rejected)} item(s) skipped: transition to {to_status} not allowed from their current status.',
+                level=messages.WARNING,
+            )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            record_transition(obj, form.initial.get('status'), user=request.user, note='Edited in admin')
+
+
+class MaintenanceStatusLogInline(admin.TabularInline):
+    model = MaintenanceStatusLog
+    fk_name = 'maintenance_request'
+    fields = ['from_status', 'to_status', 'changed_by', 'changed_at', 'note']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    ordering = ['-changed_at']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class WorkOrderStatusLogInline(MaintenanceStatusLogInline):
+    fk_name = 'work_order'
 
 
 @admin.register(MaintenanceTeam)
@@ -51,11 +109,12 @@ class TechnicianAdmin(admin.ModelAdmin):
 
 
 @admin.register(MaintenanceRequest)
-class MaintenanceRequestAdmin(admin.ModelAdmin):
-    list_display = ['request_id', 'title', 'priority_badge', 'status_badge', 'requester', 'assigned_to', 'requested_date']
+class MaintenanceRequestAdmin(StatusTransitionAdminMixin, admin.ModelAdmin):
+    form = StatusTransitionForm
+    list_display = ['request_id', 'title', 'priority_badge', 'status_badge', 'sla_badge', 'requester', 'assigned_to', 'requested_date']
     list_filter = ['status', 'priority', 'requested_date', 'assigned_to__team']
     search_fields = ['request_id', 'title', 'description', 'requester__first_name', 'requester__last_name']
-    readonly_fields = ['request_id', 'created_at', 'updated_at', 'requested_date']
+    readonly_fields = ['request_id', 'created_at', 'updated_at', 'requested_date', 'sla_due_at', 'sla_breached_at']
     
     fieldsets = (
         ('Request Information', {
@@ -65,7 +124,7 @@ class MaintenanceRequestAdmin(admin.ModelAdmin):
             'fields': ('asset', 'location_description')
         }),
         ('Priority & Status', {
-            'fields': ('priority', 'status', 'target_completion_date')
+            'fields': ('priority', 'status', 'target_completion_date', 'sla_due_at', 'sla_breached_at')
         }),
         ('Assignment', {
             'fields': ('assigned_to', 'assigned_date')
@@ -79,6 +138,7 @@ class MaintenanceRequestAdmin(admin.ModelAdmin):
         }),
     )
     
+    inlines = [MaintenanceStatusLogInline]
     date_hierarchy = 'requested_date'
     ordering = ['-requested_date']
     actions = ['mark_submitted', 'mark_acknowledged', 'mark_scheduled', 'mark_completed', 'mark_cancelled']
@@ -118,29 +178,70 @@ class MaintenanceRequestAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Status'
 
+    def sla_badge(self, obj):
+        if not obj.sla_due_at or obj.status not in MaintenanceRequest.OPEN_STATUSES:
+            return format_html('<span style="color: #999;">-</span>')
+        if obj.sla_due_at < timezone.now():
+            return format_html('<span style="background-color: #dc3545; color: white; padding: 3px 8px; border-radius: 3px; font-weight: bold;">BREACHED</span>')
+        return format_html('<span style="color: #333;">Due {}</span>', obj.sla_due_at.strftime('%Y-%m-%d %H:%M'))
+    sla_badge.short_description = 'SLA'
+    sla_badge.admin_order_field = 'sla_due_at'
+
+    def get_urls(self):
+        urls = [
+            path('sla-dashboard/', self.admin_site.admin_view(self.sla_dashboard_view), name='maintenance_sla_dashboard'),
+        ]
+        return urls + super().get_urls()
+
+    def sla_dashboard_view(self, request):
+        now = timezone.now()
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'SLA Dashboard',
+            'opts': self.model._meta,
+            'now': now,
+            'teams': team_summary(now),
+            'attention': requests_needing_attention(now),
+        }
+        return TemplateResponse(request, 'admin/maintenance/sla_dashboard.html', context)
+
     def mark_submitted(self, request, queryset):
-        queryset.update(status='submitted')
+        self._transition(request, queryset, 'submitted')
     mark_submitted.short_description = 'Mark as Submitted'
 
     def mark_acknowledged(self, request, queryset):
-        queryset.update(status='acknowledged')
+        self._transition(request, queryset, 'acknowledged')
     mark_acknowledged.short_description = 'Mark as Acknowledged'
 
     def mark_scheduled(self, request, queryset):
-        queryset.update(status='scheduled')
+        self._transition(request, queryset, 'scheduled')
     mark_scheduled.short_description = 'Mark as Scheduled'
 
     def mark_completed(self, request, queryset):
-        queryset.update(status='completed')
+        self._transition(request, queryset, 'completed')
     mark_completed.short_description = 'Mark as Completed'
 
     def mark_cancelled(self, request, queryset):
-        queryset.update(status='cancelled')
+        self._transition(request, queryset, 'cancelled')
     mark_cancelled.short_description = 'Mark as Cancelled'
 
 
+@admin.register(MaintenanceSLABreach)
+class MaintenanceSLABreachAdmin(admin.ModelAdmin):
+    list_display = ['maintenance_request', 'team', 'priority', 'due_at', 'detected_at']
+    list_filter = ['team', 'priority', 'detected_at']
+    search_fields = ['maintenance_request__request_id', 'maintenance_request__title']
+    list_select_related = ['maintenance_request', 'team']
+    date_hierarchy = 'detected_at'
+    ordering = ['-detected_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(MaintenanceWorkOrder)
-class MaintenanceWorkOrderAdmin(admin.ModelAdmin):
+class MaintenanceWorkOrderAdmin(StatusTransitionAdminMixin, admin.ModelAdmin):
+    form = StatusTransitionForm
     list_display = [
         'work_order_id', 'maintenance_request', 'technician', 'status_badge',
         'scheduled_date', 'estimated_cost', 'actual_cost'
@@ -171,8 +272,10 @@ class MaintenanceWorkOrderAdmin(admin.ModelAdmin):
         }),
     )
     
+    inlines = [WorkOrderStatusLogInline]
     date_hierarchy = 'scheduled_date'
     ordering = ['-scheduled_date']
+    actions = ['mark_scheduled', 'mark_in_progress', 'mark_completed', 'mark_on_hold', 'mark_cancelled']
 
     def status_badge(self, obj):
         colors = {
@@ -191,6 +294,67 @@ class MaintenanceWorkOrderAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Status'
 
+    def mark_scheduled(self, request, queryset):
+        self._transition(request, queryset, 'scheduled')
+    mark_scheduled.short_description = 'Mark as Scheduled'
+
+    def mark_in_progress(self, request, queryset):
+        self._transition(request, queryset, 'in_progress')
+    mark_in_progress.short_description = 'Mark as In Progress'
+
+    def mark_completed(self, request, queryset):
+        self._transition(request, queryset, 'completed')
+    mark_completed.short_description = 'Mark as Completed'
+
+    def mark_on_hold(self, request, queryset):
+        self._transition(request, queryset, 'on_hold')
+    mark_on_hold.short_description = 'Put On Hold'
+
+    def mark_cancelled(self, request, queryset):
+        self._transition(request, queryset, 'cancelled')
+    mark_cancelled.short_description = 'Mark as Cancelled'
+
+
+class PartUsageForm(forms.ModelForm):
+    class Meta:
+        model = MaintenancePartUsage
+        fields = ['item', 'quantity']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.is_issued:
+            for field in self.fields.values():
+                field.disabled = True
+
+
+class PartUsageFormSet(forms.BaseInlineFormSet):
+    """Check stock for new lines before the completion is saved"""
+
+    def clean(self):
+        super().clean()
+        needed = {}
+        for form in self.forms:
+            data = getattr(form, 'cleaned_data', None)
+            if not data or data.get('DELETE') or form.instance.is_issued or not data.get('item'):
+                continue
+            item = data['item']
+            needed[item] = needed.get(item, 0) + (data.get('quantity') or 0)
+        short = [f'{item.item_code} (have {item.quantity_on_hand})' for item, qty in needed.items() if item.quantity_on_hand < qty]
+        if short:
+            raise forms.ValidationError(f"Insufficient stock: {', '.join(short)}")
+
+
+class MaintenancePartUsageInline(admin.TabularInline):
+    model = MaintenancePartUsage
+    form = PartUsageForm
+    formset = PartUsageFormSet
+    fields = ['item', 'quantity', 'unit_cost', 'inventory_transaction']
+    readonly_fields = ['unit_cost', 'inventory_transaction']
+    extra = 1
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(MaintenanceCompletion)
 class MaintenanceCompletionAdmin(admin.ModelAdmin):
@@ -207,7 +371,8 @@ class MaintenanceCompletionAdmin(admin.ModelAdmin):
             'fields': ('work_performed', 'materials_used', 'parts_replaced')
         }),
         ('Time & Cost', {
-            'fields': ('hours_worked', 'labor_cost', 'parts_cost', 'total_cost', 'currency')
+            'fields': ('hours_worked', 'labor_cost', 'parts_cost', 'total_cost', 'currency'),
+            'description': 'Parts cost is calculated from the part lines below once stock is issued.'
         }),
         ('Asset Condition', {
             'fields': ('asset_condition_after',)
@@ -224,9 +389,20 @@ class MaintenanceCompletionAdmin(admin.ModelAdmin):
         }),
     )
     
+    inlines = [MaintenancePartUsageInline]
     date_hierarchy = 'completion_date'
     ordering = ['-completion_date']
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        try:
+            issued = consume_parts(form.instance, user=request.user)
+        except ValidationError as exc:
+            self.message_user(request, '; '.join(exc.messages), level=messages.ERROR)
+            return
+        if issued:
+            self.message_user(request, f'{issued} part line(s) issued from inventory.')
+
 
 @admin.register(MaintenanceSignature)
 class MaintenanceSignatureAdmin(admin.ModelAdmin):
@@ -376,3 +552,37 @@ class MaintenanceHistoryAdmin(admin.ModelAdmin):
     
     date_hierarchy = 'maintenance_date'
     ordering = ['-maintenance_date']
+
+    def get_urls(self):
+        urls = [
+            path('reliability/', self.admin_site.admin_view(self.reliability_view), name='maintenance_reliability_report'),
+        ]
+        return urls + super().get_urls()
+
+    def reliability_view(self, request):
+        reports = sorted(category_reports().values(), key=lambda r: r['category'])
+        selected = request.GET.get('category')
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Reliability Report (MTBF / MTTR)',
+            'opts': self.model._meta,
+            'reports': reports,
+            'selected': next((r for r in reports if str(r['category_id']) == selected), None),
+        }
+        return TemplateResponse(request, 'admin/maintenance/reliability_report.html', context)
+
+
+@admin.register(MaintenanceStatusLog)
+class MaintenanceStatusLogAdmin(admin.ModelAdmin):
+    list_display = ['changed_at', 'maintenance_request', 'work_order', 'from_status', 'to_status', 'changed_by']
+    list_filter = ['to_status', 'changed_at']
+    search_fields = ['maintenance_request__request_id', 'work_order__work_order_id', 'note']
+    list_select_related = ['maintenance_request', 'work_order', 'changed_by']
+    date_hierarchy = 'changed_at'
+    ordering = ['-changed_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,6 @@ class MaintenanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'maintenance'
     verbose_name = 'Maintenance Management System'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, IntegerField, Sum, Value, When
+
+from assets.costs import refresh_asset_costs
+from assets.models import InventoryItem, InventoryTransaction
+from .models import MaintenanceCompletion, MaintenancePartUsage
+
+
+def consume_parts(completion, user=None):
+    """
+    Issue stock for every part line of a completion that has not been issued yet.
+
+    In one transaction this locks the affected inventory items, bulk inserts
+    the outbound InventoryTransaction rows, decrements ``quantity_on_hand``
+    with a single conditional ``update()`` and recomputes ``parts_cost`` and
+    ``total_cost`` from the line unit costs. Returns the number of lines issued.
+
+    Saving a completion does not issue stock; callers run this once the part
+    lines are saved and handle the ``ValidationError`` raised when stock is
+    short, in which case nothing is issued.
+    """
+    if completion.pk is None:
+        return 0
+
+    with transaction.atomic():
+        pending = list(
+            MaintenancePartUsage.objects
+            .filter(completion=completion, inventory_transaction__isnull=True)
+            .select_for_update()
+        )
+        if not pending:
+            return 0
+
+        needed = {}
+        for line in pending:
+            needed[line.item_id] = needed.get(line.item_id, 0) + line.quantity
+        items = InventoryItem.objects.select_for_update().in_bulk(list(needed))
+
+        short = [
+            f"{items[item_id].item_code} (need {qty}, have {items[item_id].quantity_on_hand})"
+            for item_id, qty in needed.items()
+            if items[item_id].quantity_on_hand < qty
+        ]
+        if short:
+            raise ValidationError(f"Insufficient stock: {', '.join(short)}")
+
+        reference = completion.work_order.work_order_id
+        transactions = InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(
+                item_id=line.item_id,
+                transaction_type='outbound',
+                quantity=line.quantity,
+                reference_document=reference,
+                issued_to=completion.completed_by,
+                issued_by=user,
+                notes=f'Used on maintenance work order {reference}',
+            )
+            for line in pending
+        ])
+        for line, stock_move in zip(pending, transactions):
+            line.inventory_transaction = stock_move
+            line.unit_cost = items[line.item_id].unit_cost
+        MaintenancePartUsage.objects.bulk_update(pending, ['inventory_transaction', 'unit_cost'])
+
+        InventoryItem.objects.filter(pk__in=list(needed)).update(
+            quantity_on_hand=F('quantity_on_hand') - Case(
+                *[When(pk=item_id, then=Value(qty)) for item_id, qty in needed.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+        parts_cost = MaintenancePartUsage.objects.filter(
+            completion=completion, unit_cost__isnull=False,
+        ).aggregate(
+            total=Sum(F('quantity') * F('unit_cost'), output_field=DecimalField(max_digits=10, decimal_places=2))
+        )['total'] or Decimal('0')
+        completion.parts_cost = parts_cost
+        if completion.labor_cost is not None:
+            completion.total_cost = completion.labor_cost + parts_cost
+        MaintenanceCompletion.objects.filter(pk=completion.pk).update(
+            parts_cost=completion.parts_cost,
+            total_cost=completion.total_cost,
+        )
+        refresh_asset_costs([completion.work_order.maintenance_request.asset_id])
+    return len(pending)
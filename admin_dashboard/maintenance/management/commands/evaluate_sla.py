@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from maintenance.sla import evaluate_breaches
+
+
+class Command(BaseCommand):
+    help = 'Record SLA breaches for open maintenance requests (run periodically, e.g. every 15 minutes)'
+
+    def handle(self, *args, **options):
+        breached = evaluate_breaches()
+        self.stdout.write(self.style.SUCCESS(f'{breached} new SLA breach(es) recorded'))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceStatusLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='maintenance_status_changes', to=settings.AUTH_USER_MODEL)),
+                ('maintenance_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='status_logs', to='maintenance.maintenancerequest')),
+                ('work_order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='status_logs', to='maintenance.maintenanceworkorder')),
+            ],
+            options={
+                'verbose_name': 'Maintenance Status Log',
+                'verbose_name_plural': 'Maintenance Status Logs',
+                'ordering': ['-changed_at'],
+                'indexes': [models.Index(fields=['maintenance_request', 'changed_at'], name='maintenance_mainten_bf0b62_idx'), models.Index(fields=['work_order', 'changed_at'], name='maintenance_work_or_d87dd1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from datetime import timedelta
+from django.conf import settings
+from django.db import migrations, models
+
+SLA_HOURS = {'urgent': 24, 'high': 72, 'medium': 168}
+
+
+def backfill_sla_due_at(apps, schema_editor):
+    """Give already-submitted requests a deadline based on their request date"""
+    MaintenanceRequest = apps.get_model('maintenance', 'MaintenanceRequest')
+    pending = MaintenanceRequest.objects.exclude(status='draft').filter(
+        sla_due_at__isnull=True, priority__in=list(SLA_HOURS),
+    )
+    batch = []
+    for request in pending.only('pk', 'priority', 'requested_date').iterator():
+        request.sla_due_at = request.requested_date + timedelta(hours=SLA_HOURS[request.priority])
+        batch.append(request)
+    MaintenanceRequest.objects.bulk_update(batch, ['sla_due_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0001_initial'),
+        ('maintenance', '0002_maintenancestatuslog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceSLABreach',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.CharField(choices=[('urgent', 'Urgent - 24 hours'), ('high', 'High - 3 days'), ('medium', 'Medium - 1 week'), ('low', 'Low - As available')], max_length=20)),
+                ('due_at', models.DateTimeField()),
+                ('detected_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'SLA Breach',
+                'verbose_name_plural': 'SLA Breaches',
+                'ordering': ['-detected_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='sla_breached_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='sla_due_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Resolution deadline set on submission', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['status', 'sla_due_at'], name='maintenance_status_774593_idx'),
+        ),
+        migrations.AddField(
+            model_name='maintenanceslabreach',
+            name='maintenance_request',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sla_breach', to='maintenance.maintenancerequest'),
+        ),
+        migrations.AddField(
+            model_name='maintenanceslabreach',
+            name='team',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sla_breaches', to='maintenance.maintenanceteam'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenanceslabreach',
+            index=models.Index(fields=['team', 'detected_at'], name='maintenance_team_id_a65820_idx'),
+        ),
+        migrations.RunPython(backfill_sla_due_at, migrations.RunPython.noop),
+    ]
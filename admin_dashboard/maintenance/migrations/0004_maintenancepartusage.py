@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:51
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0001_initial'),
+        ('maintenance', '0003_sla_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenancePartUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('unit_cost', models.DecimalField(blank=True, decimal_places=2, help_text='Copied from the item when stock is issued', max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='part_usages', to='maintenance.maintenancecompletion')),
+                ('inventory_transaction', models.OneToOneField(blank=True, help_text='Outbound stock movement, set once issued', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='maintenance_usage', to='assets.inventorytransaction')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='maintenance_usages', to='assets.inventoryitem')),
+            ],
+            options={
+                'verbose_name': 'Part Usage',
+                'verbose_name_plural': 'Part Usages',
+                'ordering': ['completion', 'pk'],
+            },
+        ),
+    ]
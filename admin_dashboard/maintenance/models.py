@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from datetime import timedelta
 from decimal import Decimal
 
 
@@ -63,6 +64,16 @@ class MaintenanceRequest(models.Model):
         ('low', 'Low - As available'),
     ]
 
+    # Resolution deadlines matching PRIORITY_CHOICES; low priority has no SLA
+    SLA_HOURS = {
+        'urgent': 24,
+        'high': 72,
+        'medium': 168,
+        'low': None,
+    }
+
+    OPEN_STATUSES = ['submitted', 'acknowledged', 'scheduled', 'in_progress', 'on_hold']
+
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('submitted', 'Submitted'),
@@ -91,6 +102,9 @@ class MaintenanceRequest(models.Model):
     assigned_to = models.ForeignKey(Technician, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_requests')
     assigned_date = models.DateTimeField(null=True, blank=True)
     
+    sla_due_at = models.DateTimeField(null=True, blank=True, editable=False, help_text='Resolution deadline set on submission')
+    sla_breached_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
     notes = models.TextField(blank=True, help_text='Staff notes/additional info')
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -104,18 +118,50 @@ class MaintenanceRequest(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['priority']),
             models.Index(fields=['assigned_to']),
+            models.Index(fields=['status', 'sla_due_at']),
         ]
 
+    @classmethod
+    def sla_due_for(cls, priority, start):
+        """Deadline for a request of the given priority submitted at ``start``"""
+        hours = cls.SLA_HOURS.get(priority)
+        if hours is None:
+            return None
+        return start + timedelta(hours=hours)
+
     def save(self, *args, **kwargs):
         if not self.request_id:
             import uuid
             self.request_id = f"MR-{timezone.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+        if self.status != 'draft' and self.sla_due_at is None:
+            self.sla_due_at = self.sla_due_for(self.priority, timezone.now())
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.request_id} - {self.title}"
 
 
+class MaintenanceSLABreach(models.Model):
+    """Recorded when an open request passes its SLA deadline"""
+    maintenance_request = models.OneToOneField(MaintenanceRequest, on_delete=models.CASCADE, related_name='sla_breach')
+    team = models.ForeignKey(MaintenanceTeam, on_delete=models.SET_NULL, null=True, blank=True, related_name='sla_breaches')
+    priority = models.CharField(max_length=20, choices=MaintenanceRequest.PRIORITY_CHOICES)
+    
+    due_at = models.DateTimeField()
+    detected_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'SLA Breach'
+        verbose_name_plural = 'SLA Breaches'
+        ordering = ['-detected_at']
+        indexes = [
+            models.Index(fields=['team', 'detected_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.maintenance_request.request_id} - breached {self.due_at:%Y-%m-%d %H:%M}"
+
+
 class MaintenanceWorkOrder(models.Model):
     """Work orders created from maintenance requests"""
     STATUS_CHOICES = [
@@ -212,6 +258,39 @@ class MaintenanceCompletion(models.Model):
         return f"{self.work_order.work_order_id} - Completed"
 
 
+class MaintenancePartUsage(models.Model):
+    """Inventory items consumed by a completed maintenance job"""
+    completion = models.ForeignKey(MaintenanceCompletion, on_delete=models.CASCADE, related_name='part_usages')
+    item = models.ForeignKey('assets.InventoryItem', on_delete=models.PROTECT, related_name='maintenance_usages')
+    
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text='Copied from the item when stock is issued')
+    
+    inventory_transaction = models.OneToOneField(
+        'assets.InventoryTransaction', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='maintenance_usage', help_text='Outbound stock movement, set once issued'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Part Usage'
+        verbose_name_plural = 'Part Usages'
+        ordering = ['completion', 'pk']
+
+    def __str__(self):
+        return f"{self.quantity} x {self.item.name}"
+
+    @property
+    def is_issued(self):
+        return self.inventory_transaction_id is not None
+
+    def line_cost(self):
+        if self.unit_cost is None:
+            return None
+        return self.unit_cost * self.quantity
+
+
 class MaintenanceSignature(models.Model):
     """Digital signatures for maintenance work acceptance/completion"""
     SIGNATURE_TYPE_CHOICES = [
@@ -354,3 +433,29 @@ class MaintenanceHistory(models.Model):
 
     def __str__(self):
         return f"{self.asset.asset_tag} - {self.maintenance_date}"
+
+
+class MaintenanceStatusLog(models.Model):
+    """Audit trail of status changes on requests and work orders"""
+    maintenance_request = models.ForeignKey(MaintenanceRequest, on_delete=models.CASCADE, null=True, blank=True, related_name='status_logs')
+    work_order = models.ForeignKey(MaintenanceWorkOrder, on_delete=models.CASCADE, null=True, blank=True, related_name='status_logs')
+    
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='maintenance_status_changes')
+    changed_at = models.DateTimeField(default=timezone.now)
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = 'Maintenance Status Log'
+        verbose_name_plural = 'Maintenance Status Logs'
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['maintenance_request', 'changed_at']),
+            models.Index(fields=['work_order', 'changed_at']),
+        ]
+
+    def __str__(self):
+        target = self.maintenance_request or self.work_order
+        return f"{target}: {self.from_status} -> {self.to_status}"
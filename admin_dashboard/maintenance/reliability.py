@@ -0,0 +1,162 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum, Window
+from django.db.models.functions import Lag
+
+from assets.models import Asset, AssetCategory
+from .models import MaintenanceHistory, MaintenanceWorkOrder
+
+CACHE_TIMEOUT = 6 * 60 * 60
+VERSION_KEY = 'maintenance:reliability:version'
+
+
+def _cache_key(version, category_id):
+    return f'maintenance:reliability:v{version}:category:{category_id}'
+
+
+def invalidate():
+    """Drop every cached category report (called when maintenance data changes)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def _failure_gaps(category_ids):
+    """
+    Days between consecutive maintenance events per asset.
+
+    ``LAG(maintenance_date) OVER (PARTITION BY asset ORDER BY maintenance_date)``
+    pairs each event with the previous one in the database, so only the
+    per-asset running sums are kept in Python.
+    """
+    rows = (
+        MaintenanceHistory.objects
+        .filter(asset__category_id__in=category_ids)
+        .annotate(previous_date=Window(
+            Lag('maintenance_date'),
+            partition_by=[F('asset_id')],
+            order_by=F('maintenance_date').asc(),
+        ))
+        .order_by()
+        .values_list('asset_id', 'maintenance_date', 'previous_date')
+    )
+    totals = defaultdict(lambda: [0, 0])
+    for asset_id, current, previous in rows.iterator():
+        entry = totals[asset_id]
+        entry[1] += 1
+        if previous is not None:
+            entry[0] += (current - previous).days
+    return totals
+
+
+def _repair_durations(category_ids):
+    """Total restore and hands-on repair time per asset for finished work orders"""
+    return {
+        row['maintenance_request__asset_id']: row
+        for row in (
+            MaintenanceWorkOrder.objects
+            .filter(
+                maintenance_request__asset__category_id__in=category_ids,
+                actual_start_time__isnull=False,
+                actual_end_time__isnull=False,
+            )
+            .values('maintenance_request__asset_id')
+            .annotate(
+                repairs=Count('pk'),
+                restore_time=Sum(ExpressionWrapper(
+                    F('actual_end_time') - F('maintenance_request__requested_date'),
+                    output_field=DurationField(),
+                )),
+                wrench_time=Sum(ExpressionWrapper(
+                    F('actual_end_time') - F('actual_start_time'),
+                    output_field=DurationField(),
+                )),
+            )
+            .order_by()
+        )
+    }
+
+
+def _hours(duration, count):
+    if not duration or not count:
+        return None
+    return round(duration.total_seconds() / 3600 / count, 1)
+
+
+def _days(total, count):
+    if not count:
+        return None
+    return round(total / count, 1)
+
+
+def compute(category_ids):
+    """
+    Build reliability figures for the given categories.
+
+    MTBF is the mean gap between maintenance events of an asset; MTTR is the
+    mean time from request to completed work order. Category figures pool
+    the underlying gaps and repairs rather than averaging asset averages.
+    """
+    gaps = _failure_gaps(category_ids)
+    repairs = _repair_durations(category_ids)
+    asset_ids = set(gaps) | set(repairs)
+    assets = Asset.objects.filter(pk__in=asset_ids).values('pk', 'asset_tag', 'name', 'category_id')
+
+    reports = {
+        category.pk: {
+            'category_id': category.pk,
+            'category': category.name,
+            'assets': [],
+            '_gap_days': 0, '_gaps': 0, '_restore': timedelta(0), '_wrench': timedelta(0), '_repairs': 0,
+        }
+        for category in AssetCategory.objects.filter(pk__in=category_ids)
+    }
+    for asset in assets:
+        gap_days, events = gaps.get(asset['pk'], (0, 0))
+        intervals = max(events - 1, 0)
+        repair = repairs.get(asset['pk'], {})
+        report = reports[asset['category_id']]
+        report['assets'].append({
+            'asset_id': asset['pk'],
+            'asset_tag': asset['asset_tag'],
+            'name': asset['name'],
+            'events': events,
+            'mtbf_days': _days(gap_days, intervals),
+            'repairs': repair.get('repairs', 0),
+            'mttr_hours': _hours(repair.get('restore_time'), repair.get('repairs')),
+            'mean_repair_hours': _hours(repair.get('wrench_time'), repair.get('repairs')),
+        })
+        report['_gap_days'] += gap_days
+        report['_gaps'] += intervals
+        report['_repairs'] += repair.get('repairs', 0)
+        report['_restore'] += repair.get('restore_time') or timedelta(0)
+        report['_wrench'] += repair.get('wrench_time') or timedelta(0)
+
+    for report in reports.values():
+        report['mtbf_days'] = _days(report.pop('_gap_days'), report.pop('_gaps'))
+        repair_count = report.pop('_repairs')
+        report['repairs'] = repair_count
+        report['mttr_hours'] = _hours(report.pop('_restore'), repair_count)
+        report['mean_repair_hours'] = _hours(report.pop('_wrench'), repair_count)
+        report['assets'].sort(key=lambda a: (a['mtbf_days'] is None, a['mtbf_days'] or 0))
+    return reports
+
+
+def category_reports(category_ids=None):
+    """Cached reliability reports keyed by category id; misses are computed together"""
+    if category_ids is None:
+        category_ids = list(AssetCategory.objects.values_list('pk', flat=True))
+    version = cache.get_or_set(VERSION_KEY, 1, None)
+    keys = {category_id: _cache_key(version, category_id) for category_id in category_ids}
+    cached = cache.get_many(keys.values())
+    reports = {cid: cached[key] for cid, key in keys.items() if key in cached}
+
+    missing = [cid for cid in category_ids if cid not in reports]
+    if missing:
+        fresh = compute(missing)
+        cache.set_many({keys[cid]: report for cid, report in fresh.items()}, CACHE_TIMEOUT)
+        reports.update(fresh)
+    return reports
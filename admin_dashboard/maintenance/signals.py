@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from assets.costs import refresh_asset_costs
+from . import reliability
+from .models import MaintenanceCompletion, MaintenanceHistory, MaintenanceWorkOrder
+
+
+@receiver([post_save, post_delete], sender=MaintenanceHistory)
+@receiver([post_save, post_delete], sender=MaintenanceWorkOrder)
+def invalidate_reliability_cache(sender, **kwargs):
+    reliability.invalidate()
+
+
+@receiver([post_save, post_delete], sender=MaintenanceHistory)
+def refresh_costs_for_history(sender, instance, **kwargs):
+    refresh_asset_costs([instance.asset_id])
+
+
+@receiver([post_save, post_delete], sender=MaintenanceCompletion)
+def refresh_costs_for_completion(sender, instance, **kwargs):
+    asset_id = (
+        MaintenanceWorkOrder.objects
+        .filter(pk=instance.work_order_id)
+        .values_list('maintenance_request__asset_id', flat=True)
+        .first()
+    )
+    refresh_asset_costs([asset_id])
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, DateTimeField, Q, Value, When
+from django.utils import timezone
+
+from .models import MaintenanceRequest, MaintenanceSLABreach
+
+
+def sla_due_expression(now):
+    """Per-priority deadline as a SQL expression, for use in bulk ``update()`` calls"""
+    whens = [
+        When(priority=priority, then=Value(now + timedelta(hours=hours)))
+        for priority, hours in MaintenanceRequest.SLA_HOURS.items()
+        if hours is not None
+    ]
+    return Case(*whens, default=Value(None), output_field=DateTimeField())
+
+
+def open_with_sla():
+    """Open requests that carry a deadline; served by the (status, sla_due_at) index"""
+    return MaintenanceRequest.objects.filter(
+        status__in=MaintenanceRequest.OPEN_STATUSES,
+        sla_due_at__isnull=False,
+    )
+
+
+def evaluate_breaches(now=None):
+    """
+    Record a breach for every open request whose deadline has passed.
+
+    Candidates come from one range query on ``sla_due_at``; breach rows are
+    bulk inserted and the requests flagged so the next run skips them.
+    Returns the number of new breaches.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        overdue = list(
+            open_with_sla()
+            .filter(sla_due_at__lt=now, sla_breached_at__isnull=True)
+            # Lock only the requests: FOR UPDATE may not touch the nullable side of the technician join
+            .select_for_update(of=('self',))
+            .values_list('pk', 'priority', 'sla_due_at', 'assigned_to__team_id')
+        )
+        if not overdue:
+            return 0
+
+        MaintenanceSLABreach.objects.bulk_create(
+            [
+                MaintenanceSLABreach(
+                    maintenance_request_id=pk,
+                    priority=priority,
+                    due_at=due_at,
+                    team_id=team_id,
+                    detected_at=now,
+                )
+                for pk, priority, due_at, team_id in overdue
+            ],
+            ignore_conflicts=True,
+        )
+        MaintenanceRequest.objects.filter(pk__in=[row[0] for row in overdue]).update(sla_breached_at=now)
+    return len(overdue)
+
+
+def team_summary(now=None, at_risk_hours=24):
+    """Open, at-risk and breached request counts per team in one grouped query"""
+    now = now or timezone.now()
+    horizon = now + timedelta(hours=at_risk_hours)
+    return (
+        open_with_sla()
+        .values('assigned_to__team__id', 'assigned_to__team__name')
+        .annotate(
+            open=Count('pk'),
+            at_risk=Count('pk', filter=Q(sla_due_at__gte=now, sla_due_at__lt=horizon)),
+            breached=Count('pk', filter=Q(sla_due_at__lt=now)),
+        )
+        .order_by('-breached', '-at_risk', 'assigned_to__team__name')
+    )
+
+
+def requests_needing_attention(now=None, at_risk_hours=24, limit=50):
+    """Breached and soon-due open requests, most urgent first"""
+    now = now or timezone.now()
+    return (
+        open_with_sla()
+        .filter(sla_due_at__lt=now + timedelta(hours=at_risk_hours))
+        .select_related('assigned_to__user', 'assigned_to__team')
+        .order_by('sla_due_at')[:limit]
+    )
@@ -0,0 +1,131 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import reliability
+from .models import MaintenanceRequest, MaintenanceWorkOrder, MaintenanceStatusLog
+from .sla import sla_due_expression
+
+
+# Allowed status changes: current status -> statuses it may move to
+REQUEST_TRANSITIONS = {
+    'draft': {'submitted', 'cancelled'},
+    'submitted': {'acknowledged', 'on_hold', 'cancelled'},
+    'acknowledged': {'scheduled', 'on_hold', 'cancelled'},
+    'scheduled': {'in_progress', 'completed', 'on_hold', 'cancelled'},
+    'in_progress': {'completed', 'on_hold', 'cancelled'},
+    'on_hold': {'acknowledged', 'scheduled', 'in_progress', 'cancelled'},
+    'completed': set(),
+    'cancelled': set(),
+}
+
+WORK_ORDER_TRANSITIONS = {
+    'pending': {'scheduled', 'on_hold', 'cancelled'},
+    'scheduled': {'in_progress', 'on_hold', 'cancelled'},
+    'in_progress': {'completed', 'on_hold', 'cancelled'},
+    'on_hold': {'scheduled', 'in_progress', 'cancelled'},
+    'completed': set(),
+    'cancelled': set(),
+}
+
+TRANSITIONS = {
+    MaintenanceRequest: REQUEST_TRANSITIONS,
+    MaintenanceWorkOrder: WORK_ORDER_TRANSITIONS,
+}
+
+# Log FK that points at each model
+LOG_FIELDS = {
+    MaintenanceRequest: 'maintenance_request',
+    MaintenanceWorkOrder: 'work_order',
+}
+
+
+def can_transition(model, from_status, to_status):
+    """Check whether a single status change is allowed for the model"""
+    return to_status in TRANSITIONS[model].get(from_status, set())
+
+
+def _extra_updates(model, to_status, now):
+    """Additional columns stamped alongside the status for a target state"""
+    if model is MaintenanceRequest and to_status == 'submitted':
+        return {'sla_due_at': Coalesce(F('sla_due_at'), sla_due_expression(now))}
+    if model is MaintenanceWorkOrder:
+        if to_status == 'in_progress':
+            return {'actual_start_time': Coalesce(F('actual_start_time'), Value(now))}
+        if to_status == 'completed':
+            return {'actual_end_time': Coalesce(F('actual_end_time'), Value(now))}
+    return {}
+
+
+def _apply(model, rows, target_of, user, note):
+    rules = TRANSITIONS[model]
+    log_field = LOG_FIELDS[model]
+    now = timezone.now()
+
+    with transaction.atomic():
+        current = dict(rows.select_for_update().values_list('pk', 'status'))
+
+        by_target = defaultdict(list)
+        rejected = {}
+        logs = []
+        for pk, from_status in current.items():
+            to_status = target_of(pk)
+            if to_status not in rules.get(from_status, set()):
+                rejected[pk] = from_status
+                continue
+            by_target[to_status].append(pk)
+            logs.append(MaintenanceStatusLog(**{
+                f'{log_field}_id': pk,
+                'from_status': from_status,
+                'to_status': to_status,
+                'changed_by': user,
+                'changed_at': now,
+                'note': note,
+            }))
+
+        for to_status, pks in by_target.items():
+            model.objects.filter(pk__in=pks).update(
+                status=to_status,
+                updated_at=now,
+                **_extra_updates(model, to_status, now),
+            )
+        MaintenanceStatusLog.objects.bulk_create(logs)
+        if logs and model is MaintenanceWorkOrder:
+            # update() sends no signals, so the cached reliability reports are dropped here
+            transaction.on_commit(reliability.invalidate)
+
+    return len(logs), rejected
+
+
+def apply_transitions(model, changes, user=None, note=''):
+    """
+    Validate and apply a batch of status changes.
+
+    ``changes`` maps primary keys to target statuses. Current statuses are
+    read in one locked query, each target state is written with a single
+    ``update()`` and the audit rows are inserted with one ``bulk_create``.
+    Returns ``(applied, rejected)`` where ``rejected`` maps pk to the status
+    the row was left in.
+    """
+    rows = model.objects.filter(pk__in=list(changes))
+    return _apply(model, rows, changes.get, user, note)
+
+
+def transition_queryset(queryset, to_status, user=None, note=''):
+    """Move every row of a queryset to ``to_status`` where the move is allowed"""
+    rows = queryset.order_by()
+    return _apply(queryset.model, rows, lambda pk: to_status, user, note)
+
+
+def record_transition(obj, from_status, user=None, note=''):
+    """Log a status change made through a regular ``save()``"""
+    return MaintenanceStatusLog.objects.create(**{
+        LOG_FIELDS[type(obj)]: obj,
+        'from_status': from_status,
+        'to_status': obj.status,
+        'changed_by': user,
+        'note': note,
+    })
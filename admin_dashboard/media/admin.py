@@ -1,7 +1,31 @@
 from django.contrib import admin
-from .models import MediaFile
+from .models import DownloadStat, MediaFile, UploadSession
 
 
 @admin.register(MediaFile)
 class MediaFileAdmin(admin.ModelAdmin):
     list_display = ('title', 'file_type', 'uploaded_at')
+
+
+@admin.register(DownloadStat)
+class DownloadStatAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'download_count', 'last_downloaded_at')
+    list_filter = ('kind',)
+    readonly_fields = ('kind', 'object_id', 'download_count', 'last_downloaded_at')
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'target', 'status', 'received', 'size', 'created_by', 'updated_at')
+    list_filter = ('status', 'target')
+    search_fields = ('filename',)
+    readonly_fields = (
+        'id', 'target', 'filename', 'path', 'size', 'received', 'sha256', 'metadata', 'status',
+        'object_id', 'error', 'created_by', 'created_at', 'updated_at',
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,216 @@
+"""
+File serving for uploaded documents.
+
+Files are looked up through ``SOURCES`` (``kind`` -> model, file field and
+visibility filter) and served with ETag/Last-Modified validation and single
+byte-range support. With ``DOWNLOAD_OFFLOAD`` set the body is not streamed
+by Django at all: the response only carries an ``X-Accel-Redirect`` (nginx)
+or ``X-Sendfile`` (Apache/lighttpd) header and the front proxy does the
+transfer, ranges included, so large files never hold an app worker.
+
+Downloads are counted in memory and written in batches, like announcement
+views (see ``announcements.counters``).
+"""
+import atexit
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+from urllib.parse import quote
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+from announcements import counters
+from announcements.counters import CounterBuffer
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# kind -> (model label, file field, filter for publicly downloadable rows)
+SOURCES = {
+    'attachment': ('announcements.AnnouncementAttachment', 'file', Q(announcement__status='published')),
+    'policy': ('policies.UniversityPolicy', 'document', Q(is_active=True)),
+    'strategic-plan': ('policies.StrategicPlan', 'document', Q()),
+    'media': ('media.MediaFile', 'file', Q()),
+}
+
+stats = CounterBuffer()
+_flush_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def get_file(kind, pk):
+    """The stored file for a downloadable object, or ``None`` if it is missing or not public"""
+    label, field, visible = SOURCES[kind]
+    obj = apps.get_model(label).objects.filter(visible, pk=pk).only('pk', field).first()
+    if obj is None:
+        return None
+    file = getattr(obj, field)
+    return file or None
+
+
+def file_validators(file):
+    """``(etag, last_modified timestamp, size)`` from storage metadata, without opening the file"""
+    size = file.size
+    modified = file.storage.get_modified_time(file.name)
+    mtime = int(modified.timestamp())
+    return quote_etag(f'{size:x}-{mtime:x}'), mtime, size
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` inclusive for a single ``bytes=`` range.
+
+    Returns ``None`` when there is no usable range (serve the whole file) and
+    ``False`` when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def read_range(file, start, end):
+    with file.open('rb') as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def offload_response(file):
+    """Empty response telling the front proxy to send the file itself, or ``None`` when not configured"""
+    mode = getattr(settings, 'DOWNLOAD_OFFLOAD', '')
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'DOWNLOAD_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + file.name)
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = file.path
+        return response
+    return None
+
+
+def serve(request, file, validators, as_attachment=True):
+    """Build the response for ``file`` (caller has already done conditional GET checks)"""
+    etag, mtime, size = validators
+    filename = os.path.basename(file.name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    response = offload_response(file)
+    if response is None:
+        byte_range = parse_range(request.headers.get('Range'), size)
+        if_range = request.headers.get('If-Range')
+        if byte_range and if_range and if_range not in (etag, http_date(mtime)):
+            byte_range = None
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(read_range(file, start, end), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(file.open('rb'))
+            response['Content-Length'] = str(size)
+        response['Accept-Ranges'] = 'bytes'
+
+    response['Content-Type'] = content_type
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def counts_as_download(request):
+    """Only whole-file requests and the first chunk of ranged ones are counted"""
+    if request.method != 'GET':
+        return False
+    byte_range = RANGE_RE.match(request.headers.get('Range', '').strip())
+    return byte_range is None or byte_range.group(1) == '0'
+
+
+def record_download(kind, pk):
+    if kind == 'attachment':
+        # Attachments keep their own counter and feed announcement analytics
+        counters.record_download(pk)
+        return
+    stats.add((kind, pk))
+    maybe_flush()
+
+
+def apply_download_stats(counts):
+    from .models import DownloadStat
+
+    if not counts:
+        return
+    DownloadStat.objects.bulk_create(
+        [DownloadStat(kind=kind, object_id=pk) for kind, pk in counts],
+        ignore_conflicts=True,
+    )
+    match = Q(pk__in=[])
+    for kind, pk in counts:
+        match |= Q(kind=kind, object_id=pk)
+    DownloadStat.objects.filter(match).update(
+        download_count=F('download_count') + Case(
+            *[When(kind=kind, object_id=pk, then=Value(amount)) for (kind, pk), amount in counts.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        last_downloaded_at=timezone.now(),
+    )
+
+
+def flush():
+    global _last_flush
+    _last_flush = time.monotonic()
+    pending = stats.drain()
+    if not pending:
+        return
+    try:
+        with transaction.atomic():
+            apply_download_stats(pending)
+    except Exception:
+        stats.merge(pending)
+        logger.exception('Could not flush download counters; will retry')
+
+
+def maybe_flush():
+    if time.monotonic() - _last_flush < counters.flush_interval():
+        return
+    if _flush_lock.acquire(blocking=False):
+        try:
+            flush()
+        finally:
+            _flush_lock.release()
+
+
+atexit.register(flush)
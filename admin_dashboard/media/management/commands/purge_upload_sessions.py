@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from media import uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete unfinished chunked uploads (and their partial files) that have been idle too long'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=None,
+                            help='Idle hours before an upload is purged (default: UPLOAD_SESSION_HOURS)')
+
+    def handle(self, *args, **options):
+        purged = uploads.purge(options['hours'])
+        self.stdout.write(f'{purged} upload sessions purged')
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DownloadStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('download_count', models.IntegerField(default=0)),
+                ('last_downloaded_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ('-download_count',),
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 
 
@@ -15,3 +17,51 @@ class MediaFile(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class DownloadStat(models.Model):
+    """Download totals for files served through the download view"""
+    kind = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    download_count = models.IntegerField(default=0)
+    last_downloaded_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+        ordering = ('-download_count',)
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.download_count}"
+
+
+class UploadSession(models.Model):
+    """A chunked upload in progress; chunks are written straight into ``path`` until ``received == size``"""
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target = models.CharField(max_length=50)
+    filename = models.CharField(max_length=255)
+    path = models.CharField(max_length=500, help_text='Storage name the file is being written to')
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64)
+    metadata = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    object_id = models.PositiveBigIntegerField(null=True, blank=True, help_text='Object the finished file was attached to')
+    error = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
@@ -0,0 +1,15 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import UploadSession
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'target', 'filename', 'size', 'received', 'status', 'object_id', 'chunk_size', 'created_at']
+
+    def get_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_SIZE
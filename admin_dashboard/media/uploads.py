@@ -0,0 +1,315 @@
+"""
+Chunked, resumable uploads.
+
+A client starts a session with the file's name, size and SHA-256, then sends
+the bytes as ``PUT`` requests carrying ``Content-Range: bytes start-end/size``.
+Each chunk is copied from the request stream in small pieces straight into
+the file's final storage location, so memory per upload is bounded by
+``CHUNK_SIZE`` whatever the file size, and nothing is spooled to temp files.
+A dropped connection loses at most the chunk in flight: the session's
+``received`` offset says where to resume.
+
+When the last byte arrives the file is hashed from disk, compared with the
+declared checksum, checked against the target's allowed file types and
+attached to its target model (``TARGETS``) without being copied again. An
+upload that fails any of these steps is marked failed and its file deleted.
+Writing in place needs a storage with local paths (``FileSystemStorage``).
+"""
+import hashlib
+import logging
+import os
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadError(Exception):
+    """A request that does not fit the session; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Target:
+    """Where a finished upload goes: the model, its file field, and who may upload"""
+    model = None
+    field = None
+    # {extension: leading bytes of such a file}; None accepts any file
+    file_types = None
+
+    def file_field(self):
+        return apps.get_model(self.model)._meta.get_field(self.field)
+
+    def max_size(self):
+        return settings.UPLOAD_MAX_SIZE
+
+    def check_filename(self, filename):
+        extension = os.path.splitext(filename)[1].lower()
+        if self.file_types is not None and extension not in self.file_types:
+            raise UploadError('Only these file types are accepted: ' + ', '.join(sorted(self.file_types)), status=415)
+
+    def check_content(self, storage, name):
+        """Raise ``UploadError`` unless the stored file starts like its extension says"""
+        if self.file_types is None:
+            return
+        signature = self.file_types[os.path.splitext(name)[1].lower()]
+        with storage.open(name, 'rb') as handle:
+            if handle.read(len(signature)) != signature:
+                raise UploadError('The file content does not match its type.', status=415)
+
+    def validate(self, request, metadata):
+        """Raise ``UploadError`` unless ``request`` may upload with ``metadata``; returns cleaned metadata"""
+        raise NotImplementedError
+
+    def attach(self, session):
+        """Create the object for a finished upload and return its primary key"""
+        raise NotImplementedError
+
+
+class ApplicantDocumentTarget(Target):
+    """Applicant documents; the applicant proves who they are with their id and email"""
+    model = 'admissions.UploadedDocument'
+    field = 'document_file'
+    file_types = {'.pdf': b'%PDF-', '.jpg': b'\xff\xd8\xff', '.jpeg': b'\xff\xd8\xff', '.png': b'\x89PNG\r\n\x1a\n'}
+
+    def max_size(self):
+        return min(settings.APPLICANT_UPLOAD_MAX_SIZE, settings.UPLOAD_MAX_SIZE)
+
+    def validate(self, request, metadata):
+        Applicant = apps.get_model('admissions.Applicant')
+        Requirement = apps.get_model('admissions.Requirement')
+        applicant = Applicant.objects.filter(
+            pk=_int(metadata.get('applicant')), email__iexact=str(metadata.get('email', '')).strip(),
+        ).first()
+        if applicant is None:
+            raise UploadError('Unknown applicant.', status=403)
+        active = UploadSession.objects.filter(
+            target='applicant-document', status='active', metadata__applicant=applicant.pk,
+        ).count()
+        if active >= settings.APPLICANT_UPLOAD_MAX_ACTIVE:
+            raise UploadError('Too many unfinished uploads; finish or cancel one first.', status=429)
+        cleaned = {'applicant': applicant.pk}
+        if metadata.get('requirement'):
+            requirement = Requirement.objects.filter(pk=_int(metadata['requirement'])).first()
+            if requirement is None:
+                raise UploadError('Unknown requirement.')
+            cleaned['requirement'] = requirement.pk
+        return cleaned
+
+    def attach(self, session):
+        UploadedDocument = apps.get_model(self.model)
+        document = UploadedDocument(
+            applicant_id=session.metadata['applicant'],
+            requirement_id=session.metadata.get('requirement'),
+        )
+        document.document_file.name = session.path
+        document.save()
+        return document.pk
+
+
+class MediaFileTarget(Target):
+    """Media library files (videos included); staff only"""
+    model = 'media.MediaFile'
+    field = 'file'
+
+    def validate(self, request, metadata):
+        if not request.user.is_staff:
+            raise UploadError('Only staff can upload media files.', status=403)
+        MediaFile = apps.get_model(self.model)
+        file_type = metadata.get('file_type')
+        if file_type not in dict(MediaFile.FILE_TYPES):
+            raise UploadError('file_type must be one of: ' + ', '.join(dict(MediaFile.FILE_TYPES)))
+        return {'title': str(metadata.get('title') or '')[:255], 'file_type': file_type}
+
+    def attach(self, session):
+        MediaFile = apps.get_model(self.model)
+        media = MediaFile(
+            title=session.metadata['title'] or session.filename,
+            file_type=session.metadata['file_type'],
+        )
+        media.file.name = session.path
+        media.save()
+        return media.pk
+
+
+TARGETS = {
+    'applicant-document': ApplicantDocumentTarget(),
+    'media': MediaFileTarget(),
+}
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def start(request, target, filename, size, sha256, metadata=None):
+    """Validate an upload request and reserve its final storage name; returns the new session"""
+    if target not in TARGETS:
+        raise UploadError('Unknown upload target.')
+    handler = TARGETS[target]
+    size = _int(size)
+    if size is None or size <= 0:
+        raise UploadError('size must be a positive number of bytes.')
+    if size > handler.max_size():
+        raise UploadError(f'Files larger than {handler.max_size()} bytes are not accepted.', status=413)
+    sha256 = str(sha256 or '').lower()
+    if not SHA256_RE.match(sha256):
+        raise UploadError('sha256 must be the hex SHA-256 of the whole file.')
+    filename = os.path.basename(str(filename or '')).strip()
+    if not filename:
+        raise UploadError('filename is required.')
+    handler.check_filename(filename)
+
+    cleaned = handler.validate(request, metadata or {})
+    field = handler.file_field()
+    try:
+        field.storage.path('')
+    except NotImplementedError:
+        raise UploadError('Chunked uploads need a storage with local paths.', status=501)
+    # Saving an empty file reserves a unique name in the final location
+    name = field.storage.save(field.generate_filename(None, filename), ContentFile(b''))
+    return UploadSession.objects.create(
+        target=target,
+        filename=filename,
+        path=name,
+        size=size,
+        sha256=sha256,
+        metadata=cleaned,
+        created_by=request.user if request.user.is_authenticated else None,
+    )
+
+
+def parse_content_range(header, size):
+    """``(start, end)`` (inclusive) from a ``Content-Range`` header for a file of ``size`` bytes"""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError('Content-Range: bytes start-end/size is required.')
+    first, last, total = (int(value) for value in match.groups())
+    if total != size or first > last or last >= size:
+        raise UploadError('Content-Range does not fit this upload.', status=416)
+    return first, last
+
+
+def _storage(session):
+    return TARGETS[session.target].file_field().storage
+
+
+def write_chunk(session_id, content_range, stream):
+    """
+    Append one chunk to a session and return the refreshed session.
+
+    The chunk must start at the current offset (a ``409`` tells the client
+    where to resume). The session row is locked while the chunk is written,
+    so concurrent retries of the same chunk cannot interleave. The upload is
+    finished when the last byte arrives.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().filter(pk=session_id).first()
+        if session is None:
+            raise UploadError('Unknown upload.', status=404)
+        if session.status != 'active':
+            raise UploadError(f'Upload is {session.status}.', status=409)
+        first, last = parse_content_range(content_range, session.size)
+        if first != session.received:
+            raise UploadError(f'Expected a chunk starting at byte {session.received}.', status=409)
+        length = last - first + 1
+        if length > settings.UPLOAD_CHUNK_SIZE:
+            raise UploadError(f'Chunks may be at most {settings.UPLOAD_CHUNK_SIZE} bytes.', status=413)
+
+        written = 0
+        with open(_storage(session).path(session.path), 'r+b') as handle:
+            handle.seek(first)
+            handle.truncate()
+            while written < length:
+                piece = stream.read(min(CHUNK_SIZE, length - written))
+                if not piece:
+                    break
+                handle.write(piece)
+                written += len(piece)
+        if written != length:
+            # Keep what arrived intact at the old offset; the client resends the chunk
+            raise UploadError('Chunk body is shorter than its Content-Range.')
+        session.received = last + 1
+        session.save(update_fields=['received', 'updated_at'])
+    if session.received == session.size:
+        finish(session)
+    return session
+
+
+def file_sha256(storage, name):
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as handle:
+        for piece in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def _fail(session, storage, error):
+    storage.delete(session.path)
+    session.status = 'failed'
+    session.error = error
+    session.save(update_fields=['status', 'error', 'updated_at'])
+
+
+def finish(session):
+    """Verify the checksum and type and attach the file to its target; failed uploads are deleted"""
+    storage = _storage(session)
+    handler = TARGETS[session.target]
+    if file_sha256(storage, session.path) != session.sha256:
+        _fail(session, storage, 'Checksum mismatch')
+        raise UploadError('The uploaded file does not match its sha256; start a new upload.', status=422)
+    try:
+        handler.check_content(storage, session.path)
+    except UploadError as exc:
+        _fail(session, storage, str(exc))
+        raise
+    try:
+        with transaction.atomic():
+            session.object_id = handler.attach(session)
+            session.status = 'complete'
+            session.save(update_fields=['object_id', 'status', 'updated_at'])
+    except Exception:
+        logger.exception('Could not attach upload %s to %s', session.pk, session.target)
+        _fail(session, storage, 'Could not attach the file')
+        raise UploadError('The file could not be stored; start a new upload.', status=500)
+    return session
+
+
+def abort(session):
+    """Cancel an unfinished upload and delete what has been written"""
+    if session.status == 'complete':
+        raise UploadError('Finished uploads cannot be cancelled.', status=409)
+    _storage(session).delete(session.path)
+    session.delete()
+
+
+def purge(hours=None):
+    """Delete unfinished sessions (and their partial files) idle for longer than ``hours``"""
+    hours = settings.UPLOAD_SESSION_HOURS if hours is None else hours
+    stale = UploadSession.objects.exclude(status='complete').filter(
+        updated_at__lt=timezone.now() - timedelta(hours=hours),
+    )
+    count = 0
+    for session in stale.iterator():
+        if session.status == 'active':
+            _storage(session).delete(session.path)
+        session.delete()
+        count += 1
+    return count
@@ -1,3 +1,83 @@
-from django.shortcuts import render
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework import viewsets
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
 
-# Create your views here.
+from . import downloads, uploads
+from .models import UploadSession
+from .serializers import UploadSessionSerializer
+
+
+@require_safe
+def download(request, kind, pk):
+    """Serve an uploaded document with conditional GET and byte-range support"""
+    if kind not in downloads.SOURCES:
+        raise Http404
+    file = downloads.get_file(kind, pk)
+    if file is None or not file.storage.exists(file.name):
+        raise Http404
+
+    validators = downloads.file_validators(file)
+    etag, mtime, _ = validators
+    response = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if response is None:
+        response = downloads.serve(request, file, validators, as_attachment=request.GET.get('inline') != '1')
+        if response.status_code in (200, 206) and downloads.counts_as_download(request):
+            downloads.record_download(kind, pk)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return response
+
+
+class UploadSessionViewSet(viewsets.ViewSet):
+    """
+    Chunked, resumable uploads.
+
+    ``POST`` ``{target, filename, size, sha256, metadata}`` starts an upload;
+    ``PUT`` sends the bytes of one chunk with ``Content-Range: bytes start-end/size``;
+    ``GET`` returns the offset to resume from; ``DELETE`` cancels.
+    """
+    lookup_value_regex = '[0-9a-f-]{36}'
+    parser_classes = [JSONParser]
+
+    def _session(self, pk):
+        return get_object_or_404(UploadSession, pk=pk)
+
+    def _error(self, exc):
+        return Response({'detail': str(exc)}, status=exc.status)
+
+    def create(self, request):
+        data = request.data
+        try:
+            session = uploads.start(
+                request, data.get('target'), data.get('filename'), data.get('size'), data.get('sha256'),
+                data.get('metadata') if isinstance(data.get('metadata'), dict) else {},
+            )
+        except uploads.UploadError as exc:
+            return self._error(exc)
+        return Response(UploadSessionSerializer(session).data, status=201)
+
+    def retrieve(self, request, pk=None):
+        return Response(UploadSessionSerializer(self._session(pk)).data)
+
+    def update(self, request, pk=None):
+        stream = request.stream
+        if stream is None:
+            return Response({'detail': 'Empty chunk.'}, status=400)
+        try:
+            session = uploads.write_chunk(pk, request.META.get('HTTP_CONTENT_RANGE'), stream)
+        except uploads.UploadError as exc:
+            return self._error(exc)
+        return Response(UploadSessionSerializer(session).data, status=201 if session.status == 'complete' else 200)
+
+    def destroy(self, request, pk=None):
+        try:
+            uploads.abort(self._session(pk))
+        except uploads.UploadError as exc:
+            return self._error(exc)
+        return Response(status=204)